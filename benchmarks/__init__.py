@@ -0,0 +1,3 @@
+"""
+Benchmarks for the multi-agent system.
+"""
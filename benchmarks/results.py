@@ -0,0 +1,133 @@
+"""
+Result model benchmark: memory per result and encode/decode throughput.
+
+Builds synthetic combined task results shaped like ``TaskManagerAgent``
+output and compares the plain dicts agents return with the slotted models
+in ``src.agents.results``: memory held per result (tracemalloc), encoded
+size, and encodes/decodes per second for the current ``json.dump(indent=2)``
+format, compact JSON, and the MessagePack codec on dicts and on models.
+
+The codec line names the implementation in use: the ``msgpack`` C
+extension when installed, else the pure-Python fallback.
+
+Usage:
+    python -m benchmarks.results
+    python -m benchmarks.results --results 20000 --insight-lines 40
+"""
+import argparse
+import json
+import random
+import string
+import sys
+import os
+import time
+import tracemalloc
+from typing import Dict, Any, List, Callable
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from src.agents.results import TaskResult
+from src.storage import codec
+
+def make_result(i: int, insight_lines: int, rng: random.Random) -> Dict[str, Any]:
+    """A combined result with research, plan and two subtasks, built from fresh strings"""
+    def sentence() -> str:
+        return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(rng.randint(6, 14)))
+
+    insights = [f"{n + 1}. {sentence()}" for n in range(insight_lines)]
+    steps = [f"{n + 1}. {sentence()}" for n in range(insight_lines)]
+    section = {"title": sentence(), "level": 2, "number": 1, "paragraphs": [],
+               "items": [{"text": step[3:], "kind": "step", "number": n + 1, "children": []} for n, step in enumerate(steps)],
+               "children": []}
+    subtasks = [
+        {"id": f"{kind}-{i}", "type": kind, "agent": f"{kind}_agent", "description": sentence(),
+         "depends_on": [] if kind == "research" else [f"research-{i}"], "status": "completed", "elapsed": rng.random() * 10}
+        for kind in ("research", "planning")
+    ]
+    return {
+        "status": "completed",
+        "research_results": {
+            "status": "completed",
+            "research_query": f"Research and analyze: {sentence()}",
+            "raw_results": [{"source": "LLM", "content": "\n".join(insights), "confidence": 0.8}],
+            "analysis": {"key_insights": insights, "sections": [section], "confidence_score": 0.8,
+                         "analysis_method": "LLM-based semantic analysis"},
+            "strategy": "two-pass"
+        },
+        "plan": {"steps": steps, "sections": [section], "generated_at": "now", "confidence": 0.8, "format_version": "2.1"},
+        "subtask_results": subtasks,
+        "agent_status": {subtask["agent"]: {"status": "completed", "elapsed": subtask["elapsed"]} for subtask in subtasks},
+        "summary": "Combined results from 2/2 subtasks",
+        "timing": {"critical_path": [subtask["id"] for subtask in subtasks], "wall_seconds": rng.random() * 20},
+        "task_id": f"{i:032x}",
+        "start_time": "2024-01-01T00:00:00",
+        "end_time": "2024-01-01T00:00:12"
+    }
+
+def held_bytes(build: Callable[[], List[Any]]) -> int:
+    """Bytes still allocated after ``build`` returns (temporaries excluded)"""
+    tracemalloc.start()
+    kept = build()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return held
+
+def rate(func: Callable[[Any], Any], items: List[Any], min_seconds: float = 0.5) -> float:
+    """Calls per second of ``func`` over ``items``"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for item in items:
+            func(item)
+        calls += len(items)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls / elapsed
+
+def run(count: int, insight_lines: int) -> Dict[str, Any]:
+    # Build both forms from the same seed so they hold identical data
+    dict_bytes = held_bytes(lambda: [make_result(i, insight_lines, random.Random(i)) for i in range(count)])
+    model_bytes = held_bytes(lambda: [TaskResult.from_dict(make_result(i, insight_lines, random.Random(i))) for i in range(count)])
+
+    sample = [make_result(i, insight_lines, random.Random(i)) for i in range(min(count, 200))]
+    models = [TaskResult.from_dict(result) for result in sample]
+    formats = {
+        "json indent=2": (lambda r: json.dumps(r, indent=2), json.loads, sample),
+        "json compact": (lambda r: json.dumps(r, separators=(",", ":")), json.loads, sample),
+        "codec dict": (codec.encode, codec.decode, sample),
+        "codec model": (codec.encode, codec.decode, models)
+    }
+    rows = {}
+    for name, (encode, decode, items) in formats.items():
+        encoded = [encode(item) for item in items]
+        rows[name] = {
+            "bytes": sum(len(data) for data in encoded) / len(encoded),
+            "encode_per_s": rate(encode, items),
+            "decode_per_s": rate(decode, encoded)
+        }
+    return {
+        "results": count,
+        "dict_bytes": dict_bytes / count,
+        "model_bytes": model_bytes / count,
+        "formats": rows
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark result models and serialization")
+    parser.add_argument("--results", type=int, default=5000, help="results to build for the memory measurement")
+    parser.add_argument("--insight-lines", type=int, default=20, help="insight lines and plan steps per result")
+    args = parser.parse_args()
+
+    result = run(args.results, args.insight_lines)
+    print(f"memory per result: dict {result['dict_bytes'] / 1024:.1f} KiB, "
+          f"model {result['model_bytes'] / 1024:.1f} KiB ({result['results']} results)")
+    print(f"codec implementation: {codec.implementation()}")
+    for name, row in result["formats"].items():
+        print(f"{name:>14}: {row['bytes'] / 1024:6.1f} KiB, "
+              f"encode {row['encode_per_s']:9.0f}/s, decode {row['decode_per_s']:9.0f}/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Semantic index benchmark: lookup latency and near-duplicate recall by index size.
+
+Builds a ``SemanticIndex`` of synthetic task descriptions, then times
+``lookup`` for paraphrases of indexed descriptions (one word replaced,
+similarity at or above the threshold). Reports p50/p99 lookup latency,
+recall and the average number of LSH candidates scored per lookup.
+
+Usage:
+    python -m benchmarks.semantic
+    python -m benchmarks.semantic --sizes 1000,100000 --budget-ms 1
+"""
+import argparse
+import random
+import string
+import sys
+import os
+import time
+from typing import Dict, Any, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from src.memory.semantic import SemanticIndex, embed
+
+def make_texts(count: int, rng: random.Random) -> List[str]:
+    """Synthetic descriptions of 6-14 words over a 5000-word vocabulary"""
+    vocab = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(5000)]
+    return [" ".join(rng.choices(vocab, k=rng.randint(6, 14))) for _ in range(count)]
+
+def paraphrases(texts: List[str], count: int, threshold: float, rng: random.Random) -> List[Tuple[int, str]]:
+    """Descriptions with one word replaced that still score above the threshold"""
+    queries: List[Tuple[int, str]] = []
+    while len(queries) < count:
+        i = rng.randrange(len(texts))
+        words = texts[i].split()
+        words[rng.randrange(len(words))] = rng.choice(texts[rng.randrange(len(texts))].split())
+        query = " ".join(words)
+        if float(embed(query) @ embed(texts[i])) >= threshold:
+            queries.append((i, query))
+    return queries
+
+def run(size: int, queries: int, threshold: float) -> Dict[str, Any]:
+    rng = random.Random(size)
+    texts = make_texts(size, rng)
+    index = SemanticIndex(threshold=threshold)
+    start = time.perf_counter()
+    for i, text in enumerate(texts):
+        index.add(text, i)
+    build_seconds = time.perf_counter() - start
+
+    latencies: List[float] = []
+    found = 0
+    for i, query in paraphrases(texts, queries, threshold, rng):
+        start = time.perf_counter()
+        match = index.lookup(query)
+        latencies.append(time.perf_counter() - start)
+        found += match is not None and match[1]["value"] == i
+
+    latencies.sort()
+    return {
+        "size": size,
+        "build_seconds": round(build_seconds, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+        "recall": round(found / queries, 3),
+        "candidates": round(index.get_stats()["candidates"] / queries)
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark semantic index lookups")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated index sizes")
+    parser.add_argument("--queries", type=int, default=1000, help="lookups per size")
+    parser.add_argument("--threshold", type=float, default=0.85, help="reuse threshold")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if p50 lookup latency exceeds this")
+    args = parser.parse_args()
+
+    over_budget = False
+    for size in (int(size) for size in args.sizes.split(",")):
+        result = run(size, args.queries, args.threshold)
+        print(f"{result['size']:>7} entries: p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms, "
+              f"recall {result['recall']:.1%}, {result['candidates']} candidates (built in {result['build_seconds']}s)")
+        if args.budget_ms is not None and result["p50_ms"] > args.budget_ms:
+            over_budget = True
+    return 1 if over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
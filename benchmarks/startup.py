@@ -0,0 +1,91 @@
+"""
+Cold-start benchmark: import time of the system's entry-point modules.
+
+Each module is imported in a fresh interpreter with ``python -X importtime``;
+the cumulative import time of the module itself and its heaviest
+dependencies are reported. With ``--budget-ms`` the script exits non-zero
+when any module exceeds the budget, so it can guard CI against regressions.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --budget-ms 250
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["src.main", "src.agents", "src.utils.helpers"]
+
+# Imports that should never happen at startup; they are loaded on first use
+HEAVY_MODULES = ["langchain", "langchain_google_genai", "pydantic", "dotenv"]
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us) rows"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def measure_import(module: str) -> Dict[str, Any]:
+    """Import a module in a fresh interpreter and collect import timings"""
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    rows = parse_importtime(completed.stderr)
+    total_us = next((cumulative for name, _, cumulative in rows if name == module), 0)
+    heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:5]
+    return {
+        "module": module,
+        "total_ms": total_us / 1000,
+        "heaviest": [(name, self_us / 1000) for name, self_us, _ in heaviest],
+        "heavy_imports": [name for name in completed.stdout.strip().split(",") if name]
+    }
+
+def run(modules: List[str], repeat: int) -> List[Dict[str, Any]]:
+    """Measure every module ``repeat`` times and keep the median run"""
+    reports = []
+    for module in modules:
+        runs = sorted((measure_import(module) for _ in range(repeat)), key=lambda r: r["total_ms"])
+        report = runs[len(runs) // 2]
+        report["runs_ms"] = [r["total_ms"] for r in runs]
+        reports.append(report)
+    return reports
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if a module exceeds this")
+    args = parser.parse_args()
+
+    failed = False
+    for report in run(args.modules, args.repeat):
+        spread = statistics.pstdev(report["runs_ms"]) if len(report["runs_ms"]) > 1 else 0.0
+        print(f"{report['module']}: {report['total_ms']:.1f} ms (median of {args.repeat}, ±{spread:.1f} ms)")
+        for name, self_ms in report["heaviest"]:
+            print(f"    {self_ms:8.1f} ms  {name}")
+        if report["heavy_imports"]:
+            print(f"    ⚠️ eagerly imported: {', '.join(report['heavy_imports'])}")
+        if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+            print(f"    ❌ over budget ({args.budget_ms:.0f} ms)")
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Throughput benchmark: TaskManagerAgent.process on the offline fake LLM.
+
+For each concurrency level, that many tasks are submitted to
+``TaskManagerAgent.process`` at once and the run reports tasks/sec,
+p50/p95/p99 task latency and the process's peak RSS. No network access or
+API key is needed. The response cache is disabled and the rate limiter is
+opened up, so the numbers measure orchestration overhead on top of the
+configured fake latency.
+
+Save a run with ``--output`` and compare later runs against it with
+``--baseline``; the script exits non-zero when throughput drops or p95
+latency grows by more than ``--tolerance``.
+
+With ``--hedge`` each level runs a second time with request hedging on
+(one ``Hedger`` shared across levels, so it learns latency as it goes) and
+reports the hedged p99, its change against the unhedged run, and the
+hedge and backup-win rates. Use a long-tailed latency to see an effect.
+
+Usage:
+    python -m benchmarks.throughput
+    python -m benchmarks.throughput --levels 1,100,10000 --latency lognormal --latency-mean 0.2
+    python -m benchmarks.throughput --output baseline.json
+    python -m benchmarks.throughput --baseline baseline.json --tolerance 0.2
+    python -m benchmarks.throughput --levels 100,1000 --latency lognormal --latency-sigma 1.5 --hedge
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import sys
+import time
+from typing import Dict, Any, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from src.agents.task_manager import TaskManagerAgent
+from src.agents.research_agent import ResearchAgent
+from src.agents.planning_agent import PlanningAgent
+from src.llm.cache import set_default_cache
+from src.llm.clients import ClientRegistry, set_default_registry
+from src.llm.fake import make_fake_factory
+from src.llm.hedging import Hedger, set_default_hedger
+from src.llm.rate_limiter import AdaptiveRateLimiter, set_default_limiter
+
+DEFAULT_LEVELS = [1, 10, 100, 1000, 10000]
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def configure(args: argparse.Namespace) -> None:
+    """Point every agent at the fake backend with no cache and no rate limits"""
+    set_default_cache(None)
+    set_default_limiter(AdaptiveRateLimiter(
+        requests_per_minute=10**9,
+        tokens_per_minute=10**12,
+        max_concurrency=args.llm_concurrency,
+        min_concurrency=args.llm_concurrency,
+        max_retries=args.max_retries,
+        base_delay=0
+    ))
+    set_default_registry(ClientRegistry(factory=make_fake_factory(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate
+    )))
+
+def build_manager() -> TaskManagerAgent:
+    """Create a TaskManager with research and planning agents"""
+    manager = TaskManagerAgent()
+    manager.register_agent(ResearchAgent(google_api_key="fake"))
+    manager.register_agent(PlanningAgent(google_api_key="fake"))
+    return manager
+
+async def run_level(manager: TaskManagerAgent, concurrency: int, timeout: float) -> Dict[str, Any]:
+    """Submit ``concurrency`` tasks at once and measure the run"""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def run_task(i: int) -> None:
+        task = {"description": f"Benchmark task {i} at concurrency {concurrency}", "priority": "medium"}
+        start = time.perf_counter()
+        result = await manager.process(task, timeout=timeout) # type: ignore [arg-type]
+        latencies.append(time.perf_counter() - start)
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+
+    start = time.perf_counter()
+    # The manager prints progress per task; keep it out of the measurement
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        await asyncio.gather(*(run_task(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "tasks_per_sec": round(concurrency / elapsed, 2),
+        "p50": round(percentile(latencies, 0.50), 4),
+        "p95": round(percentile(latencies, 0.95), 4),
+        "p99": round(percentile(latencies, 0.99), 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "statuses": statuses
+    }
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """List regressions against a baseline run, matched by concurrency level"""
+    previous = {row["concurrency"]: row for row in baseline}
+    regressions = []
+    for row in results:
+        old = previous.get(row["concurrency"])
+        if old is None:
+            continue
+        if row["tasks_per_sec"] < old["tasks_per_sec"] * (1 - tolerance):
+            regressions.append(f"{row['concurrency']} tasks: {row['tasks_per_sec']} tasks/s (was {old['tasks_per_sec']})")
+        if row["p95"] > old["p95"] * (1 + tolerance):
+            regressions.append(f"{row['concurrency']} tasks: p95 {row['p95']}s (was {old['p95']}s)")
+    return regressions
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Run every level on a fresh manager"""
+    configure(args)
+    unhedged = Hedger(enabled=False)
+    hedger = Hedger(percentile=args.hedge_percentile, budget=args.hedge_budget)
+    set_default_hedger(unhedged)
+    # One unmeasured task pays for first-use imports (LangChain message types)
+    await run_level(build_manager(), 1, args.timeout)
+    results = []
+    for concurrency in args.levels:
+        row = await run_level(build_manager(), concurrency, args.timeout)
+        print(
+            f"{row['concurrency']:>6} tasks  {row['tasks_per_sec']:>9.1f} tasks/s  "
+            f"p50 {row['p50']:.3f}s  p95 {row['p95']:.3f}s  p99 {row['p99']:.3f}s  "
+            f"peak RSS {row['peak_rss_mb']:.0f} MB  {row['statuses']}"
+        )
+        if args.hedge:
+            before = hedger.get_stats()
+            set_default_hedger(hedger)
+            hedged = await run_level(build_manager(), concurrency, args.timeout)
+            set_default_hedger(unhedged)
+            after = hedger.get_stats()
+            calls = after["calls"] - before["calls"]
+            fired = after["hedged"] - before["hedged"]
+            row["hedged"] = {
+                "p95": hedged["p95"],
+                "p99": hedged["p99"],
+                "p99_change": round(hedged["p99"] / row["p99"] - 1, 4) if row["p99"] else 0.0,
+                "hedge_rate": round(fired / calls, 4) if calls else 0.0,
+                "win_rate": round(after["win_rate"], 4)
+            }
+            print(
+                f"{'':>6} hedged {hedged['tasks_per_sec']:>9.1f} tasks/s  "
+                f"p99 {hedged['p99']:.3f}s ({row['hedged']['p99_change']:+.1%})  "
+                f"hedge rate {row['hedged']['hedge_rate']:.1%}  backup wins {row['hedged']['win_rate']:.0%}"
+            )
+        results.append(row)
+    return results
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark TaskManagerAgent throughput on the fake LLM")
+    parser.add_argument("--levels", type=lambda s: [int(n) for n in s.split(",")], default=DEFAULT_LEVELS,
+                        help="comma-separated numbers of concurrent tasks")
+    parser.add_argument("--latency", default="fixed", help="fixed | uniform | exponential | lognormal")
+    parser.add_argument("--latency-mean", type=float, default=0.05, help="seconds to first token")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal shape (larger: longer tail)")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-concurrency", type=int, default=10_000, help="in-flight LLM call cap")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--hedge", action="store_true", help="also run each level with request hedging")
+    parser.add_argument("--hedge-percentile", type=float, default=0.95, help="hedge calls slower than this percentile")
+    parser.add_argument("--hedge-budget", type=float, default=0.05, help="max fraction of calls hedged")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    return parser.parse_args(argv)
+
+def main() -> int:
+    args = parse_args()
+    results = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,23 @@
 import os
 from typing import Dict, Any
-from dotenv import load_dotenv # type: ignore
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _load_env() -> None:
+    """Load .env from the working directory or project root
+
+    python-dotenv is only imported when a .env file actually exists, so
+    short-lived CLI/worker processes without one skip the import entirely.
+    """
+    for directory in (os.getcwd(), PROJECT_ROOT):
+        env_path = os.path.join(directory, ".env")
+        if os.path.isfile(env_path):
+            from dotenv import load_dotenv # type: ignore
+            load_dotenv(env_path)
+            return
 
 # Load environment variables
-load_dotenv()
+_load_env()
 
 # Google AI Configuration
 GOOGLE_CONFIG = {
@@ -12,6 +26,28 @@ GOOGLE_CONFIG = {
     "temperature": 0.7
 }
 
+# LLM Client Pool Configuration (clients are shared per model/temperature/api_key)
+CLIENT_CONFIG = {
+    "pool_size": 2,  # keep-alive gRPC connections per (model, temperature, api_key)
+    "keepalive_seconds": 30,  # HTTP/2 ping interval on idle connections
+    "keepalive_timeout_seconds": 10,  # drop the connection if a ping goes unanswered
+    "warmup_timeout": 10,  # seconds to wait for connections to become ready at startup
+    "warmup_on_start": os.getenv("LLM_WARMUP", "true").lower() != "false",
+    "backend": os.getenv("LLM_BACKEND", "gemini")  # gemini | fake (offline, see FAKE_LLM_CONFIG)
+}
+
+# Offline fake LLM backend (LLM_BACKEND=fake), used by tests and benchmarks
+FAKE_LLM_CONFIG = {
+    "latency": os.getenv("FAKE_LLM_LATENCY", "fixed"),  # fixed | uniform | exponential | lognormal
+    "latency_mean": float(os.getenv("FAKE_LLM_LATENCY_MEAN", "0.05")),  # seconds to first token (median for lognormal)
+    "latency_sigma": 0.5,  # lognormal shape
+    "tokens_per_second": None,  # output pacing; None emits the response at once
+    "response_tokens": 200,
+    "error_rate": float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+    "error_kind": "throttled",  # throttled (429) | server (503) | fatal (400)
+    "seed": 0
+}
+
 # Agent Configuration
 AGENT_CONFIG = {
     "task_manager": {
@@ -20,7 +56,9 @@ AGENT_CONFIG = {
     },
     "research": {
         "name": "ResearchAgent",
-        "description": "Gathers and analyzes information"
+        "description": "Gathers and analyzes information",
+        "strategy": os.getenv("RESEARCH_STRATEGY", "two-pass"),  # two-pass | single-pass | map-reduce
+        "chunk_chars": 6000  # map-reduce chunk size for the analysis stage
     },
     "planning": {
         "name": "PlanningAgent",
@@ -39,8 +77,150 @@ AGENT_CONFIG = {
 # System Configuration
 SYSTEM_CONFIG = {
     "max_retries": 3,
-    "timeout": 30,  # seconds
-    "debug_mode": True
+    "timeout": 60,  # seconds, per LLM call attempt
+    "debug_mode": True,
+    "batch_size": 8,  # tasks per batched agenerate call in process_many
+    "max_concurrency": 4,  # batches in flight at once in process_many
+    "coalesce_tasks": os.getenv("COALESCE_TASKS", "true").lower() != "false"  # identical concurrent tasks share one run
+}
+
+# LLM Rate Limiting Configuration (shared by all agents in a process)
+RATE_LIMIT_CONFIG = {
+    "requests_per_minute": 150,
+    "tokens_per_minute": 2_000_000,
+    "max_concurrency": 16,  # AIMD upper bound on in-flight calls
+    "min_concurrency": 1,  # AIMD lower bound after repeated 429/5xx
+    "backoff_base": 1.0,  # seconds, first retry delay cap
+    "backoff_max": 30.0  # seconds, largest retry delay cap
+}
+
+# LLM Scheduling Configuration (order of calls waiting for rate-limiter slots)
+SCHEDULER_CONFIG = {
+    "enabled": os.getenv("LLM_SCHEDULING", "true").lower() != "false",  # false: FIFO
+    "aging": 30.0,  # seconds of waiting worth one priority level (high/medium/low)
+    "preempt": True,  # urgent calls may take slots from queued calls still waiting on rate buckets
+    "default_priority": "medium"
+}
+
+# Request Hedging Configuration (backup requests for slow LLM calls, see src/llm/hedging.py)
+HEDGING_CONFIG = {
+    "enabled": os.getenv("LLM_HEDGING", "false").lower() == "true",
+    "percentile": float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),  # hedge calls slower than this share of recent calls
+    "window": 200,  # recent latencies kept per model and stage
+    "min_samples": 20,  # no hedging for a model/stage until this many calls have finished
+    "min_delay": 0.05,  # seconds; never hedge sooner than this
+    "budget": float(os.getenv("LLM_HEDGE_BUDGET", "0.05")),  # at most this fraction of calls get a backup request
+    "burst": 10  # hedges that may be saved up while calls are fast
+}
+
+# Model Routing Configuration (model tier per LLM call, see src/llm/router.py)
+ROUTING_CONFIG = {
+    "enabled": os.getenv("LLM_ROUTING", "true").lower() != "false",
+    "tiers": {
+        "fast": os.getenv("FAST_MODEL", "models/gemini-2.5-flash"),
+        "strong": None  # None: the agent's own model (GOOGLE_CONFIG["model_name"] by default)
+    },
+    "default_tier": "strong",
+    # First matching rule wins; conditions left out match anything
+    "rules": [
+        {"stages": ["research.gather", "research.summarize"], "priorities": ["low"], "tier": "fast"},
+        {"stages": ["research.gather", "research.summarize"], "tier": "fast", "cascade_only": True}
+    ],
+    # Retry answers from a cheaper tier on the default tier when they fail the quality check
+    "cascade": os.getenv("LLM_CASCADE", "false").lower() == "true",
+    "quality": {
+        "min_tokens": 40,
+        "refusals": [r"\bI (?:can(?:no|')t|am unable to|'m unable to)\b", r"\bAs an AI\b"],
+        "required": {"planning.plan": r"^\s*1\."}  # stage -> pattern the answer must contain
+    },
+    # USD per million tokens, for the cost estimates in the router stats
+    "prices": {
+        "fast": {"input": 0.30, "output": 2.50},
+        "strong": {"input": 1.25, "output": 10.00}
+    }
+}
+
+# LLM Response Cache Configuration
+CACHE_CONFIG = {
+    "enabled": os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false",
+    "max_entries": 1024,  # in-process LRU size
+    "ttl": 3600,  # seconds, applies to both tiers
+    "db_path": os.getenv("LLM_CACHE_DB", ".cache/llm_cache.sqlite3")  # empty disables the disk tier
+}
+
+# Prompt Budget Configuration (token budgets for the variable parts of prompts)
+BUDGET_CONFIG = {
+    "stages": {
+        "research.query": 500,  # task description in the research prompts
+        "research.analyze": 6000,  # gathered content sent for analysis
+        "planning.task": 1000,  # task description in the planning prompt
+        "planning.findings": 1500  # upstream research insights in the planning prompt
+    },
+    "truncation": "head-tail",  # head | tail | head-tail
+    "overflow": os.getenv("PROMPT_OVERFLOW", "truncate"),  # truncate | summarize (extra LLM pass first)
+    "dedup": True  # drop repeated lines before counting
+}
+
+# Agent Memory Configuration
+MEMORY_CONFIG = {
+    "max_entries": 1000,  # per agent
+    "max_bytes": 16 * 1024 * 1024,  # per agent, by pickled size
+    "ttl": None,  # seconds, None keeps entries until evicted
+    "spill_path": os.getenv("AGENT_MEMORY_SPILL", "")  # SQLite file for evicted entries; empty drops them
+}
+
+# Semantic Reuse Configuration (near-duplicate task descriptions)
+SEMANTIC_CONFIG = {
+    "enabled": os.getenv("SEMANTIC_REUSE", "false").lower() == "true",
+    "threshold": float(os.getenv("SEMANTIC_THRESHOLD", "0.85")),  # cosine similarity needed to reuse a result
+    "dim": 256,  # hashed feature dimensions
+    "path": os.getenv("SEMANTIC_INDEX_PATH", ".cache/semantic")  # saved on shutdown; empty keeps it in memory only
+}
+
+# Result Store Configuration
+RESULT_STORE_CONFIG = {
+    "enabled": os.getenv("RESULT_STORE", "false").lower() == "true",  # store every finished task result
+    "path": os.getenv("RESULT_STORE_PATH", ".results"),  # directory holding segments and the index
+    "json_dir": os.getenv("RESULT_JSON_DIR", ""),  # also write each result (with its task) as <task_id>.json here
+    "segment_bytes": 64 * 1024 * 1024,  # roll over to a new segment file past this size
+    "compression_level": 6  # zlib level per record (1 fastest, 9 smallest)
+}
+
+# Step Journal Configuration (resume failed tasks without repeating finished stages)
+JOURNAL_CONFIG = {
+    "enabled": os.getenv("STEP_JOURNAL", "false").lower() == "true",
+    "path": os.getenv("STEP_JOURNAL_PATH", ".journal"),  # directory holding the journal; empty keeps it in memory only
+    "ttl": 7 * 24 * 3600  # seconds; steps of tasks never retried are pruned after this
+}
+
+# HTTP Service Configuration (python -m src.server)
+SERVER_CONFIG = {
+    "host": os.getenv("SERVER_HOST", "127.0.0.1"),
+    "port": int(os.getenv("SERVER_PORT", "8080")),
+    "max_active": 64,  # tasks processed at once on the event loop
+    "max_queue": 256,  # admitted tasks waiting for a slot; beyond this requests get 429
+    "retry_after": 1,  # seconds, Retry-After header on 429
+    "task_timeout": 120,  # seconds, default and upper bound for ?timeout=
+    "drain_timeout": 30  # seconds to let in-flight tasks finish on shutdown
+}
+
+# Queue Runner Configuration (python -m src.runner)
+RUNNER_CONFIG = {
+    "workers": int(os.getenv("RUNNER_WORKERS", "0")) or os.cpu_count() or 1,  # worker processes
+    "concurrency": 32,  # tasks in flight per worker event loop
+    "task_timeout": 120,  # seconds, passed to TaskManagerAgent.process
+    "output_dir": "runs/latest",  # checkpoint and result files
+    "fsync": False,  # fsync every checkpoint line (survives power loss, not just process crashes)
+    "start_method": "spawn",  # fresh interpreters; gRPC and SQLite handles are not fork-safe
+    "setup": "src.main:setup_agents"  # module:function returning a TaskManagerAgent
+}
+
+# Tracing and Metrics Configuration
+TRACING_CONFIG = {
+    "enabled": os.getenv("TRACING_ENABLED", "true").lower() != "false",
+    "jsonl_path": os.getenv("TRACE_JSONL_PATH", ""),  # one JSON span per line; empty disables
+    "metrics_path": os.getenv("METRICS_PATH", ""),  # Prometheus text file written on shutdown; empty disables
+    "metrics_port": int(os.getenv("METRICS_PORT", "0"))  # serves /metrics; 0 disables
 }
 
 def get_agent_config(agent_type: str) -> Dict[str, Any]:
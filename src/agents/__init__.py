@@ -1,3 +1,29 @@
 """
 Agent implementations for the multi-agent system.
-""" 
\ No newline at end of file
+
+Agent classes are loaded lazily on first attribute access so importing the
+package stays cheap.
+"""
+from importlib import import_module
+from typing import Any
+
+_LAZY_EXPORTS = {
+    "BaseAgent": ".base_agent",
+    "AgentState": ".base_agent",
+    "TaskContext": ".context",
+    "TaskManagerAgent": ".task_manager",
+    "ResearchAgent": ".research_agent",
+    "PlanningAgent": ".planning_agent",
+    "TaskResult": ".results",
+    "ResearchResult": ".results",
+    "Plan": ".results",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
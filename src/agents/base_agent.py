@@ -1,35 +1,556 @@
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field # type: ignore
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Union, AsyncIterator, Awaitable, Callable, TYPE_CHECKING
 from abc import ABC, abstractmethod
+from config.settings import JOURNAL_CONFIG
+from ..llm.budget import PromptBudget, get_default_budget
+from ..llm.cache import LLMCache, get_default_cache
+from ..llm.hedging import Hedger, get_default_hedger
+from ..memory.store import MemoryStore, create_memory_store
+from ..llm.rate_limiter import AdaptiveRateLimiter, get_default_limiter, classify_error, estimate_tokens
+from ..llm.router import ModelRouter, Route, get_default_router
+from ..llm.scheduler import _current_schedule, current_schedule, most_urgent, schedule_for
+from ..utils.singleflight import SingleFlight, get_default_single_flight
+from ..utils.tracing import Tracer, get_default_tracer
+from .context import TaskContext, _current_context, current_context
 
-class AgentState(BaseModel):
+if TYPE_CHECKING:
+    from ..storage.journal import StepJournal
+
+@dataclass(slots=True)
+class AgentState:
     """State model for agents"""
     name: str
     status: str = "idle"
     current_task: Optional[Dict[str, Any]] = None
-    memory: Dict[str, Any] = Field(default_factory=dict)
+    memory: MemoryStore = field(default_factory=create_memory_store)
+
+def human_message(content: str) -> Any:
+    """Build a LangChain human message (LangChain is imported on first use)"""
+    from langchain.schema import HumanMessage # type: ignore [import-untyped]
+    return HumanMessage(content=content)
 
 class BaseAgent(ABC):
     """Base class for all agents in the system"""
     
-    def __init__(self, name: str, tools: List[Any] = None): # type: ignore
-        self.state = AgentState(name=name)
+    # Kind of subtask this agent handles (see TaskManagerAgent._break_down_task)
+    agent_type = "generic"
+    
+    def __init__(
+        self,
+        name: str,
+        tools: List[Any] = None, # type: ignore
+        cache: Optional[LLMCache] = None,
+        max_concurrency: Optional[int] = None,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        tracer: Optional[Tracer] = None,
+        memory: Optional[MemoryStore] = None,
+        budget: Optional[PromptBudget] = None,
+        router: Optional[ModelRouter] = None,
+        journal: Optional["StepJournal"] = None,
+        hedger: Optional[Hedger] = None
+    ):
+        self.state = AgentState(name=name, memory=memory if memory is not None else create_memory_store(name))
         self.tools = tools or []
+        self._llm: Any = None
+        self.cache = cache if cache is not None else get_default_cache()
+        self.limiter = limiter or get_default_limiter()
+        self.tracer = tracer or get_default_tracer()
+        self.budget = budget or get_default_budget()
+        # Picks a model tier per call; an explicitly assigned llm pins the agent to it
+        self.router = router or get_default_router()
+        self._routed_llms: Dict[str, Any] = {}
+        self._pinned = False
+        # Identical prompts in flight at once share one LLM call
+        self.single_flight: Optional[SingleFlight] = get_default_single_flight()
+        # Slow calls get a backup request (opt-in, see HEDGING_CONFIG)
+        self.hedger = hedger or get_default_hedger()
+        # Completed stages of a task are journaled so a retry resumes after them
+        if journal is None and JOURNAL_CONFIG["enabled"]:
+            # Imported here so SQLite only loads when journaling is switched on
+            from ..storage.journal import get_default_journal
+            journal = get_default_journal()
+        self.journal = journal
+        
+        # Concurrent invocations: each gets its own TaskContext, and an
+        # optional cap queues invocations beyond max_concurrency
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._in_flight: Dict[int, TaskContext] = {}
+        self._queue_depth = 0
+        self._completed = 0
+        self._failed = 0
         
+    @property
+    def llm(self) -> Any:
+        """The agent's chat model, created on first use"""
+        if self._llm is None:
+            self._llm = self._create_llm()
+        return self._llm
+    
+    @llm.setter
+    def llm(self, llm: Any) -> None:
+        self._llm = llm
+        self._pinned = llm is not None
+    
+    def _create_llm(self) -> Any:
+        """Create the chat model; agents that call an LLM override this"""
+        raise NotImplementedError(f"{self.__class__.__name__} has no LLM configured")
+    
+    def _create_llm_for(self, model: str) -> Any:
+        """Create a chat model for a routed model; agents that support routing override this"""
+        raise NotImplementedError(f"{self.__class__.__name__} cannot switch models")
+    
+    def _route(self, stage: Optional[str], prompt_tokens: int) -> Optional[Route]:
+        """Choose the model tier for a call (None: the agent's own model, untracked)"""
+        if stage is None or self._pinned:
+            return None
+        return self.router.route(stage, prompt_tokens, current_schedule())
+    
+    def _llm_for(self, route: Optional[Route]) -> Any:
+        """The chat model a route calls"""
+        if route is None or route.model is None:
+            return self.llm
+        llm = self._routed_llms.get(route.model)
+        if llm is None:
+            try:
+                llm = self._routed_llms[route.model] = self._create_llm_for(route.model)
+            except NotImplementedError:
+                return self.llm
+        return llm
+    
     @abstractmethod
     async def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Process a task and return results"""
         pass
     
+    @asynccontextmanager
+    async def task_context(self, task: Dict[str, Any]) -> AsyncIterator[TaskContext]:
+        """Run one invocation under its own TaskContext
+        
+        Waits for a concurrency slot when the agent is capped, registers the
+        context as in flight for aggregate status, and records the outcome.
+        """
+        async with self.batch_context([task]) as contexts:
+            yield contexts[0]
+    
+    @asynccontextmanager
+    async def batch_context(self, tasks: List[Dict[str, Any]]) -> AsyncIterator[List[TaskContext]]:
+        """Run a batch of tasks under one concurrency slot, one TaskContext per task
+        
+        The invocation is traced as an ``agent`` span; LLM calls made inside
+        it become child spans, and the span records the slot wait and the
+        post-processing time after the last LLM response.
+        """
+        contexts = [TaskContext(task=task, agent_name=self.state.name) for task in tasks]
+        for ctx in contexts:
+            if "id" in ctx.task:
+                ctx.task_id = str(ctx.task["id"])
+        
+        with self.tracer.span(
+            "agent",
+            trace_id=contexts[0].task_id if contexts else None,
+            agent=self.state.name,
+            agent_type=self.agent_type
+        ) as span:
+            if len(contexts) == 1:
+                span.set(task_id=contexts[0].task_id)
+            else:
+                span.set(task_ids=[ctx.task_id for ctx in contexts], batch_size=len(contexts))
+            for ctx in contexts:
+                ctx.trace_id = span.trace_id
+                ctx.span = span
+            
+            self._queue_depth += 1
+            try:
+                if self._slots is not None:
+                    await self._slots.acquire()
+            finally:
+                self._queue_depth -= 1
+            span.set(queue_wait=span.elapsed())
+            
+            now = time.time()
+            for ctx in contexts:
+                ctx.status = "working"
+                ctx.started_at = now
+                self._in_flight[id(ctx)] = ctx
+            self._refresh_state()
+            token = _current_context.set(contexts[0] if len(contexts) == 1 else None)
+            # LLM calls wait in line by the task's priority and deadline (a batch's most urgent)
+            schedule_token = _current_schedule.set(most_urgent(schedule_for(ctx.task) for ctx in contexts))
+            
+            try:
+                yield contexts
+                for ctx in contexts:
+                    if ctx.status == "working":
+                        ctx.status = "completed"
+            except BaseException as e:
+                for ctx in contexts:
+                    ctx.status = "error"
+                    ctx.error = str(e) or e.__class__.__name__
+                raise
+            finally:
+                # Release the slot before touching the context variables: a
+                # stream abandoned mid-task is closed from another context
+                finished_at = time.time()
+                for ctx in contexts:
+                    ctx.finished_at = finished_at
+                    self._in_flight.pop(id(ctx), None)
+                    if ctx.status == "completed":
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+                if self._slots is not None:
+                    self._slots.release()
+                failed = any(ctx.status != "completed" for ctx in contexts)
+                self._refresh_state(failed=failed)
+                
+                span.set(status="error" if failed else "completed")
+                post_processing = span.since_last_llm_call()
+                if post_processing is not None:
+                    span.set(post_processing=post_processing)
+                
+                try:
+                    _current_schedule.reset(schedule_token)
+                    _current_context.reset(token)
+                except ValueError:
+                    # Async generators closed from another task run in a different context
+                    _current_schedule.set(None)
+                    _current_context.set(None)
+    
+    def _refresh_state(self, failed: bool = False) -> None:
+        """Derive the aggregate agent state from the invocations in flight"""
+        if self._in_flight:
+            latest = next(reversed(self._in_flight.values()))
+            self.update_state(status="working", current_task=latest.task)
+        else:
+            self.update_state(status="error" if failed else "idle", current_task=None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregate status across all concurrent invocations"""
+        return {
+            "name": self.state.name,
+            "status": self.state.status,
+            "in_flight": len(self._in_flight),
+            "queue_depth": self._queue_depth,
+            "completed": self._completed,
+            "failed": self._failed,
+            "max_concurrency": self.max_concurrency,
+            "memory": self.state.memory.get_stats()
+        }
+    
+    async def process_batch(self, tasks: List[Dict[str, Any]]) -> List[Union[Dict[str, Any], Exception]]:
+        """Process several tasks, returning a result or exception per task in input order"""
+        return await asyncio.gather(*(self.process(task) for task in tasks), return_exceptions=True)
+    
+    async def stream(self, task: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream incremental events for a task, ending with an ``agent_done`` event
+        
+        Agents that can produce partial output override this; the default
+        runs ``process`` and emits its result as a single event.
+        """
+        result = await self.process(task)
+        yield self._event("agent_done", result=result)
+    
+    async def step(self, stage: str, run: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one stage of the current task, or return its journaled output from an earlier attempt
+        
+        The output is recorded in the step journal once the stage completes,
+        keyed by the task's journal key and ``stage``. Without a journal,
+        outside a task context, or for a task with no journal key, the stage
+        simply runs.
+        """
+        output = self._resume(stage)
+        if output is None:
+            output = await run()
+            self._record_step(stage, output)
+        return output
+    
+    def _resume(self, stage: str) -> Optional[Any]:
+        """The current task's journaled output for a stage, or None if it has not completed"""
+        ctx = current_context()
+        key = self._journal_key(ctx.task) if self.journal is not None and ctx is not None else None
+        if key is None:
+            return None
+        output = self.journal.get(key, stage) # type: ignore [union-attr]
+        if output is not None:
+            resumed = (ctx.get_from_memory("resumed_steps") or []) + [stage]
+            ctx.add_to_memory("resumed_steps", resumed)
+            if ctx.span is not None:
+                ctx.span.set(resumed=resumed)
+        return output
+    
+    def _record_step(self, stage: str, output: Any) -> None:
+        """Journal a completed stage of the current task"""
+        ctx = current_context()
+        key = self._journal_key(ctx.task) if self.journal is not None and ctx is not None else None
+        if key is not None:
+            self.journal.record(key, stage, output) # type: ignore [union-attr]
+    
+    def _journal_key(self, task: Dict[str, Any]) -> Optional[str]:
+        """The key a task's stages are journaled under, or None to not journal them
+        
+        Only tasks handed over with a ``journal_key`` are journaled: whoever
+        sets it (the task manager) clears the steps once the task completes,
+        so a direct call never leaves steps behind.
+        """
+        key = task.get("journal_key")
+        return str(key) if key else None
+    
+    def _event(self, event_type: str, **payload: Any) -> Dict[str, Any]:
+        """Build a streaming event tagged with this agent's name"""
+        return {"type": event_type, "agent": self.state.name, **payload}
+    
+    async def generate(self, prompt: str, stage: Optional[str] = None) -> str:
+        """Generate a completion for a prompt, serving repeats from the shared cache
+        
+        ``stage`` (e.g. ``research.gather``) lets the router pick a model
+        tier for the call; with the cascade enabled, an answer from a cheaper
+        tier that fails the quality check is regenerated on the default tier.
+        With hedging enabled, a call slower than the recent latency
+        percentile for its model and stage gets a backup request.
+        """
+        route = self._route(stage, estimate_tokens(prompt))
+        text, accepted = await self._generate(prompt, route, stage)
+        if accepted:
+            return text
+        text, _ = await self._generate(prompt, self.router.escalate(route), stage) # type: ignore [arg-type]
+        return text
+
+    async def _generate(self, prompt: str, route: Optional[Route], stage: Optional[str] = None) -> Tuple[str, bool]:
+        """One (cached, coalesced) completion on a route's model
+        
+        Returns the text and whether it stands: False when the route cascades
+        and the text fails the router's quality check.
+        """
+        model, temperature = self._llm_identity(route)
+        prompt_tokens = estimate_tokens(prompt)
+        with self.tracer.span("llm.generate", agent=self.state.name, model=model,
+                              prompt_tokens=prompt_tokens) as span:
+            if route is not None:
+                span.set(stage=route.stage, tier=route.tier)
+            if self.cache is not None:
+                cached = self.cache.get(model, temperature, prompt)
+                if cached is not None:
+                    accepted = self._accepted(route, cached)
+                    span.set(cached=True, completion_tokens=estimate_tokens(cached))
+                    if route is not None:
+                        self.router.record(route, 0.0, prompt_tokens, estimate_tokens(cached),
+                                           cached=True, rejected=not accepted)
+                    return cached, accepted
+
+            llm = self._llm_for(route)
+            hedge_key = f"{model}/{stage or ''}"
+            start = time.perf_counter()
+            if self.single_flight is not None:
+                # Only coalesce calls on the same client (pooled per API key) and
+                # priority class, so a joiner never borrows another caller's
+                # credentials or waits at a lower priority than its own
+                schedule = current_schedule()
+                flight_key = (model, temperature, prompt, id(llm), schedule.level if schedule is not None else None)
+                text, joined = await self.single_flight.do(
+                    flight_key, lambda: self._call_llm(prompt, llm, hedge_key)
+                )
+            else:
+                text, joined = await self._call_llm(prompt, llm, hedge_key), False
+            latency = time.perf_counter() - start
+
+            if joined:
+                # Another task's identical call produced this text
+                span.set(coalesced=True, wait=latency, completion_tokens=estimate_tokens(text))
+                return text, self._accepted(route, text)
+
+            ctx = current_context()
+            if ctx is not None:
+                ctx.llm_calls += 1
+
+            # Without streaming the first token arrives with the whole response
+            llm_latency = latency - span.attributes.get("queue_wait", 0.0)
+            span.set(llm_latency=llm_latency, ttft=llm_latency, completion_tokens=estimate_tokens(text))
+            accepted = self._accepted(route, text)
+            if route is not None:
+                self.router.record(route, llm_latency, prompt_tokens, estimate_tokens(text), rejected=not accepted)
+                if not accepted:
+                    span.set(escalated=True)
+
+            if self.cache is not None:
+                self.cache.set(model, temperature, prompt, text, latency=latency)
+            return text, accepted
+
+    def _accepted(self, route: Optional[Route], text: str) -> bool:
+        """Whether a cascading route's answer passes the quality check (always True otherwise)"""
+        if route is None or route.escalate_to is None:
+            return True
+        return self.router.accept(route.stage, text, estimate_tokens(text))
+
+    async def _call_llm(self, prompt: str, llm: Any = None, hedge_key: Optional[str] = None) -> str:
+        """One rate-limited LLM request for a prompt, hedged under ``hedge_key`` (model/stage)
+        
+        The hedge delay is measured inside the request's limiter slot, so it
+        tracks the model's latency rather than the queue's. A backup request
+        takes its own slot and rate capacity, with the limiter's retries, and
+        is only sent when the limiter can start it right away.
+        """
+        llm = llm if llm is not None else self.llm
+        tokens = estimate_tokens(prompt)
+        
+        def send() -> Awaitable[Any]:
+            return llm.agenerate([[human_message(prompt)]])
+        
+        response = await self.limiter.call(
+            lambda: self.hedger.run(
+                hedge_key or "", send,
+                backup=lambda: self.limiter.call(send, tokens=tokens),
+                ready=lambda: self.limiter.has_capacity(tokens=tokens)
+            ),
+            tokens=tokens
+        )
+        return response.generations[0][0].text
+
+    async def stream_generate(self, prompt: str, stage: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream a completion token chunk by token chunk, caching the full text
+        
+        Streams are routed like ``generate`` but never cascaded: chunks
+        already yielded cannot be taken back.
+        """
+        route = self._route(stage, estimate_tokens(prompt))
+        model, temperature = self._llm_identity(route)
+        prompt_tokens = estimate_tokens(prompt)
+        with self.tracer.span("llm.stream", agent=self.state.name, model=model,
+                              prompt_tokens=prompt_tokens) as span:
+            if route is not None:
+                span.set(stage=route.stage, tier=route.tier)
+            if self.cache is not None:
+                cached = self.cache.get(model, temperature, prompt)
+                if cached is not None:
+                    span.set(cached=True, completion_tokens=estimate_tokens(cached))
+                    if route is not None:
+                        self.router.record(route, 0.0, prompt_tokens, estimate_tokens(cached), cached=True)
+                    yield cached
+                    return
+            llm = self._llm_for(route)
+
+            ctx = current_context()
+            if ctx is not None:
+                ctx.llm_calls += 1
+
+            start = time.perf_counter()
+            parts: List[str] = []
+            for attempt in range(self.limiter.max_retries + 1):
+                try:
+                    async with self.limiter.slot(tokens=estimate_tokens(prompt)):
+                        async for chunk in llm.astream([human_message(prompt)]):
+                            text = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+                            if text:
+                                if not parts:
+                                    span.set(ttft=time.perf_counter() - start - span.attributes.get("queue_wait", 0.0))
+                                parts.append(text)
+                                yield text
+                    self.limiter.record_success()
+                    break
+                except Exception as e:
+                    kind = classify_error(e)
+                    self.limiter.record_failure(kind)
+                    # Chunks already yielded cannot be taken back, so only a
+                    # stream that failed before its first chunk is retried
+                    if parts or kind is None or attempt >= self.limiter.max_retries:
+                        raise
+                await asyncio.sleep(self.limiter.backoff_delay(attempt))
+
+            latency = time.perf_counter() - start
+            text = "".join(parts)
+            llm_latency = latency - span.attributes.get("queue_wait", 0.0)
+            span.set(llm_latency=llm_latency, completion_tokens=estimate_tokens(text))
+            if route is not None:
+                self.router.record(route, llm_latency, prompt_tokens, estimate_tokens(text))
+            if self.cache is not None:
+                self.cache.set(model, temperature, prompt, text, latency=latency)
+
+    async def generate_many(self, prompts: List[str], stage: Optional[str] = None) -> List[Union[str, Exception]]:
+        """Generate completions for many prompts with a single batched agenerate call
+        
+        The batch is routed as one call sized by its largest prompt, without
+        the cascade.
+        """
+        route = self._route(stage, max((estimate_tokens(prompt) for prompt in prompts), default=0))
+        model, temperature = self._llm_identity(route)
+        results: List[Union[str, Exception, None]] = [None] * len(prompts)
+
+        with self.tracer.span("llm.batch", agent=self.state.name, model=model, prompts=len(prompts)) as span:
+            if route is not None:
+                span.set(stage=route.stage, tier=route.tier)
+            # Serve cached prompts and collapse duplicates within the batch
+            pending: Dict[str, List[int]] = {}
+            for i, prompt in enumerate(prompts):
+                cached = self.cache.get(model, temperature, prompt) if self.cache is not None else None
+                if cached is not None:
+                    results[i] = cached
+                else:
+                    pending.setdefault(prompt, []).append(i)
+            span.set(cache_hits=len(prompts) - sum(len(indices) for indices in pending.values()),
+                     cached=not pending)
+
+            if pending:
+                unique_prompts = list(pending)
+                span.set(prompt_tokens=sum(estimate_tokens(prompt) for prompt in unique_prompts))
+                start = time.perf_counter()
+                try:
+                    llm = self._llm_for(route)
+                    response = await self.limiter.call(
+                        lambda: llm.agenerate(
+                            [[human_message(prompt)] for prompt in unique_prompts]
+                        ),
+                        tokens=span.attributes["prompt_tokens"],
+                        requests=len(unique_prompts)
+                    )
+                    texts: List[Union[str, Exception]] = [gen[0].text for gen in response.generations]
+                    elapsed = time.perf_counter() - start
+                    llm_latency = elapsed - span.attributes.get("queue_wait", 0.0)
+                    span.set(llm_latency=llm_latency, ttft=llm_latency,
+                             completion_tokens=sum(estimate_tokens(text) for text in texts)) # type: ignore [arg-type]
+                    if route is not None:
+                        self.router.record(route, llm_latency, span.attributes["prompt_tokens"],
+                                           span.attributes["completion_tokens"])
+                    if self.cache is not None:
+                        for prompt, text in zip(unique_prompts, texts):
+                            self.cache.set(model, temperature, prompt, text, latency=elapsed / len(unique_prompts))
+                except Exception as e:
+                    span.set(llm_latency=time.perf_counter() - start - span.attributes.get("queue_wait", 0.0),
+                             fallback=str(e) or e.__class__.__name__)
+                    # One failed prompt fails the whole batch; retry individually
+                    # so the error is attributed to the task that caused it
+                    texts = await asyncio.gather(
+                        *(self.generate(prompt, stage) for prompt in unique_prompts),
+                        return_exceptions=True
+                    )
+
+                for prompt, text in zip(unique_prompts, texts):
+                    for i in pending[prompt]:
+                        results[i] = text
+
+        return results # type: ignore [return-value]
+
+    def _llm_identity(self, route: Optional[Route] = None) -> Tuple[str, float]:
+        """Get the (model, temperature) pair that identifies this agent's LLM (or a route's)"""
+        # Agents declare their model up front so cache hits never build a client
+        llm = self._llm if self._llm is not None else self
+        model = getattr(llm, "model", None) or getattr(llm, "model_name", None)
+        temperature = getattr(llm, "temperature", None)
+        if route is not None and route.model is not None:
+            model = route.model
+        return str(model or llm.__class__.__name__), float(temperature or 0.0)
+
     def update_state(self, **kwargs) -> None:
         """Update agent state"""
         for key, value in kwargs.items():
             if hasattr(self.state, key):
                 setattr(self.state, key, value)
                 
-    def add_to_memory(self, key: str, value: Any) -> None:
-        """Add information to agent's memory"""
-        self.state.memory[key] = value
+    def add_to_memory(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Add information to agent's memory (bounded; see MEMORY_CONFIG)"""
+        self.state.memory.set(key, value, ttl=ttl)
         
     def get_from_memory(self, key: str) -> Optional[Any]:
         """Retrieve information from agent's memory"""
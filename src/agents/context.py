@@ -0,0 +1,40 @@
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+
+@dataclass
+class TaskContext:
+    """Task-scoped execution state for a single agent invocation
+
+    One agent instance can serve many tasks concurrently; everything that
+    belongs to one task (its status, intermediate results, timings) lives
+    here instead of on the shared agent.
+    """
+    task: Dict[str, Any]
+    agent_name: str
+    task_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"
+    memory: Dict[str, Any] = field(default_factory=dict)
+    llm_calls: int = 0
+    queued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    trace_id: Optional[str] = None
+    span: Any = field(default=None, repr=False)
+
+    def add_to_memory(self, key: str, value: Any) -> None:
+        """Add information to the task-scoped memory"""
+        self.memory[key] = value
+
+    def get_from_memory(self, key: str) -> Optional[Any]:
+        """Retrieve information from the task-scoped memory"""
+        return self.memory.get(key)
+
+_current_context: ContextVar[Optional[TaskContext]] = ContextVar("current_task_context", default=None)
+
+def current_context() -> Optional[TaskContext]:
+    """Get the task context of the invocation running in the current coroutine"""
+    return _current_context.get()
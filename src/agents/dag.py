@@ -0,0 +1,198 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+
+# Terminal node states
+COMPLETED = "completed"
+TIMED_OUT = "timed_out"
+FAILED = "failed"
+CANCELLED = "cancelled"
+SKIPPED = "skipped"
+
+NodeRunner = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+@dataclass
+class DAGNode:
+    """A subtask in the execution graph and the outcome of running it"""
+    id: str
+    subtask: Dict[str, Any]
+    depends_on: List[str] = field(default_factory=list)
+    status: str = "pending"
+    result: Any = None
+    error: Optional[str] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ("pending", "running")
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+class DAGScheduler:
+    """Runs subtasks as a dependency graph
+
+    Nodes whose dependencies have all finished are launched immediately, so
+    independent nodes run in parallel and wall-clock time follows the
+    critical path. Dependencies are soft: a node still runs when an upstream
+    node failed, and receives only the outputs of upstream nodes that
+    completed.
+    """
+
+    def __init__(self, subtasks: List[Dict[str, Any]]):
+        self.nodes: Dict[str, DAGNode] = {}
+        for subtask in subtasks:
+            node_id = subtask["id"]
+            if node_id in self.nodes:
+                raise ValueError(f"Duplicate subtask id: {node_id}")
+            self.nodes[node_id] = DAGNode(id=node_id, subtask=subtask, depends_on=list(subtask.get("depends_on", [])))
+
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                if dependency not in self.nodes:
+                    raise ValueError(f"Subtask {node.id} depends on unknown subtask {dependency}")
+        self._order = self._topological_order()
+        self._started_at = 0.0
+
+    def _topological_order(self) -> List[str]:
+        """Order nodes so every node follows its dependencies (Kahn's algorithm)"""
+        remaining = {node_id: len(node.depends_on) for node_id, node in self.nodes.items()}
+        ready = [node_id for node_id, count in remaining.items() if count == 0]
+        order: List[str] = []
+        while ready:
+            node_id = ready.pop(0)
+            order.append(node_id)
+            for other in self.nodes.values():
+                if node_id in other.depends_on:
+                    remaining[other.id] -= 1
+                    if remaining[other.id] == 0:
+                        ready.append(other.id)
+        if len(order) != len(self.nodes):
+            raise ValueError("Subtask dependencies contain a cycle")
+        return order
+
+    def levels(self) -> List[List[DAGNode]]:
+        """Group nodes into waves that can run together once earlier waves finish"""
+        depth: Dict[str, int] = {}
+        for node_id in self._order:
+            node = self.nodes[node_id]
+            depth[node_id] = 1 + max((depth[d] for d in node.depends_on), default=-1)
+        waves: List[List[DAGNode]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for node_id in self._order:
+            waves[depth[node_id]].append(self.nodes[node_id])
+        return waves
+
+    def upstream_results(self, node: DAGNode) -> Dict[str, Any]:
+        """Outputs of the completed dependencies of a node"""
+        return {
+            dependency: self.nodes[dependency].result
+            for dependency in node.depends_on
+            if self.nodes[dependency].status == COMPLETED
+        }
+
+    async def run(
+        self,
+        runner: NodeRunner,
+        timeout: float,
+        node_timeouts: Optional[Dict[str, float]] = None,
+        first_k: Optional[int] = None
+    ) -> List[DAGNode]:
+        """Run the graph; returns nodes in topological order with their outcomes"""
+        node_timeouts = node_timeouts or {}
+        loop = asyncio.get_running_loop()
+        self._started_at = started = loop.time()
+        running: Dict["asyncio.Task[Any]", DAGNode] = {}
+        completed = 0
+
+        def launch_ready() -> None:
+            for node_id in self._order:
+                node = self.nodes[node_id]
+                if node.status != "pending" or not all(self.nodes[d].done for d in node.depends_on):
+                    continue
+                node.status = "running"
+                node.started = loop.time()
+                remaining = max(started + timeout - node.started, 0)
+                deadline = min(node_timeouts.get(node_id, remaining), remaining)
+                coroutine = runner(node.subtask, self.upstream_results(node))
+                running[asyncio.create_task(asyncio.wait_for(coroutine, timeout=deadline))] = node
+
+        try:
+            launch_ready()
+            while running:
+                # Per-node deadlines are capped by the global timeout, so this
+                # wait only guards against nodes ignoring cancellation
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=max(started + timeout - loop.time(), 0) + 1,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+
+                for finished in done:
+                    node = running.pop(finished)
+                    node.finished = loop.time()
+                    try:
+                        node.result = finished.result()
+                        node.status = COMPLETED
+                        completed += 1
+                    except asyncio.TimeoutError:
+                        node.status = TIMED_OUT
+                        node.error = "Timed out"
+                    except Exception as e:
+                        node.status = FAILED
+                        node.error = str(e)
+
+                if first_k is not None and completed >= first_k:
+                    break
+                launch_ready()
+        finally:
+            # Cancel stragglers and wait for them to unwind cleanly
+            for straggler in running:
+                straggler.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            for node in running.values():
+                node.status = CANCELLED
+                node.finished = loop.time()
+            for node in self.nodes.values():
+                if node.status == "pending":
+                    node.status = SKIPPED
+
+        return [self.nodes[node_id] for node_id in self._order]
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """The dependency chain that determined when the graph finished"""
+        finished = [node for node in self.nodes.values() if node.finished is not None]
+        if not finished:
+            return [], 0.0
+
+        node: Optional[DAGNode] = max(finished, key=lambda n: n.finished) # type: ignore [arg-type, return-value]
+        path: List[str] = []
+        end = node.finished # type: ignore [union-attr]
+        while node is not None:
+            path.append(node.id)
+            upstream = [self.nodes[d] for d in node.depends_on if self.nodes[d].finished is not None]
+            node = max(upstream, key=lambda n: n.finished) if upstream else None # type: ignore [arg-type, return-value]
+        path.reverse()
+        return path, end - self._started_at # type: ignore [operator]
+
+    def timing(self) -> Dict[str, Any]:
+        """Critical-path and aggregate timing for the last run"""
+        path, critical_seconds = self.critical_path()
+        durations = [node.elapsed for node in self.nodes.values() if node.elapsed is not None]
+        return {
+            "critical_path": path,
+            "critical_path_seconds": round(critical_seconds, 3),
+            "sum_of_steps_seconds": round(sum(durations), 3), # type: ignore [arg-type]
+            "nodes": {
+                node.id: {
+                    "start": round(node.started - self._started_at, 3) if node.started is not None else None,
+                    "end": round(node.finished - self._started_at, 3) if node.finished is not None else None
+                }
+                for node in self.nodes.values()
+            }
+        }
@@ -1,36 +1,120 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union, AsyncIterator
 from .base_agent import BaseAgent
-from langchain_google_genai import ChatGoogleGenerativeAI # type: ignore [import-untyped]
-from langchain.schema import HumanMessage, SystemMessage # type: ignore [import-untyped]
+from ..llm.cache import LLMCache
+from ..llm.clients import get_default_registry
+from ..utils.markdown import Section, SectionParser, parse_sections
+from config.settings import GOOGLE_CONFIG
 
 class PlanningAgent(BaseAgent):
     """Agent responsible for creating execution plans"""
     
-    def __init__(self, name: str = "PlanningAgent", google_api_key: str = None): # type: ignore
-        super().__init__(name)
-        self.llm = ChatGoogleGenerativeAI(
-            model="models/gemini-2.5-pro",
-            google_api_key=google_api_key,
-            temperature=0.7
-        )
+    agent_type = "planning"
+    
+    def __init__(
+        self,
+        name: str = "PlanningAgent",
+        google_api_key: str = None, # type: ignore
+        model_name: Optional[str] = None,
+        temperature: Optional[float] = None,
+        cache: Optional[LLMCache] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        super().__init__(name, cache=cache, max_concurrency=max_concurrency)
+        self.google_api_key = google_api_key
+        self.model_name = model_name or GOOGLE_CONFIG["model_name"]
+        self.temperature = GOOGLE_CONFIG["temperature"] if temperature is None else temperature
+        
+    def _create_llm(self) -> Any:
+        """Get a pooled Gemini client from the shared registry"""
+        return self._create_llm_for(self.model_name)
+        
+    def _create_llm_for(self, model: str) -> Any:
+        """Get a pooled client for a routed model, with this agent's temperature and key"""
+        return get_default_registry().get(model, self.temperature, self.google_api_key)
         
     async def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Process a planning task"""
-        self.update_state(status="working", current_task=task)
+        async with self.task_context(task) as ctx:
+            # Create planning prompt
+            planning_prompt = self._build_planning_prompt(task)
+            
+            # Generate plan (journaled, so a retried task reuses a finished plan)
+            raw_plan = await self.step("planning.plan", lambda: self.generate(planning_prompt, "planning.plan"))
+            ctx.add_to_memory("raw_plan", raw_plan)
+            
+            # Process and structure the response
+            plan = self._structure_plan(raw_plan)
+            
+            return {
+                "status": "completed",
+                "plan": plan
+            }
+            
+    async def stream(self, task: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the plan section by section as the model generates it"""
+        async with self.task_context(task) as ctx:
+            raw_parts: List[str] = []
+            parser = SectionParser()
+            
+            # A plan journaled by an earlier attempt is replayed instead of regenerated
+            resumed = self._resume("planning.plan")
+            chunks = self._replay(resumed) if resumed is not None else self.stream_generate(
+                self._build_planning_prompt(task), "planning.plan"
+            )
+            async for text in chunks:
+                raw_parts.append(text)
+                for section in parser.feed(text):
+                    yield self._section_event(section)
+            for section in parser.close():
+                yield self._section_event(section)
+            
+            raw_plan = "".join(raw_parts)
+            if resumed is None:
+                self._record_step("planning.plan", raw_plan)
+            ctx.add_to_memory("raw_plan", raw_plan)
+            result = {
+                "status": "completed",
+                "plan": self._structure_plan(raw_plan, parser.sections)
+            }
         
-        try:
-            # Extract task details
-            description = task.get("description", "")
-            priority = task.get("priority", "medium")
-            deadline = task.get("deadline", "not specified")
+        yield self._event("agent_done", result=result)
             
-            # Create planning prompt
-            planning_prompt = f"""You are a technical project planning expert. Create a detailed implementation plan for the following task:
+    async def _replay(self, text: str) -> AsyncIterator[str]:
+        """Yield already-generated text as a single chunk"""
+        yield text
+            
+    async def process_batch(self, tasks: List[Dict[str, Any]]) -> List[Union[Dict[str, Any], Exception]]:
+        """Process several planning tasks with one batched LLM call"""
+        async with self.batch_context(tasks) as contexts:
+            raw_plans = await self.generate_many([self._build_planning_prompt(task) for task in tasks], "planning.plan")
+            
+            results: List[Union[Dict[str, Any], Exception]] = []
+            for ctx, raw_plan in zip(contexts, raw_plans):
+                if isinstance(raw_plan, Exception):
+                    ctx.status = "error"
+                    ctx.error = str(raw_plan)
+                    results.append(raw_plan)
+                else:
+                    results.append({
+                        "status": "completed",
+                        "plan": self._structure_plan(raw_plan)
+                    })
+            return results
+            
+    def _build_planning_prompt(self, task: Dict[str, Any]) -> str:
+        """Build the planning prompt for a task"""
+        # Extract task details; free-text inputs are compacted to their budgets
+        description = self.budget.fit("planning.task", task.get("description", ""))
+        priority = task.get("priority", "medium")
+        deadline = task.get("deadline", "not specified")
+        findings = self._format_research_findings(task.get("upstream_results", {}))
+        
+        return f"""You are a technical project planning expert. Create a detailed implementation plan for the following task:
 
 Task Description: {description}
 Priority: {priority}
 Deadline: {deadline}
-
+{findings}
 Please provide a comprehensive implementation plan that includes:
 
 1. Technical Requirements:
@@ -60,34 +144,39 @@ Please provide a comprehensive implementation plan that includes:
 
 Format the response in a clear, structured way with markdown formatting. Use bullet points and numbered lists for clarity."""
             
-            # Generate plan
-            messages = [HumanMessage(content=planning_prompt)]
-            response = await self.llm.agenerate([messages])
-            
-            # Process and structure the response
-            plan = self._structure_plan(response.generations[0][0].text)
-            
-            result = {
-                "status": "completed",
-                "plan": plan
-            }
-            
-            self.update_state(status="idle", current_task=None)
-            return result
+    def _format_research_findings(self, upstream_results: Dict[str, Any]) -> str:
+        """Format research output from upstream subtasks for the planning prompt"""
+        insights: List[str] = []
+        for result in upstream_results.values():
+            if isinstance(result, dict) and "analysis" in result:
+                insights.extend(
+                    line.strip() for line in result["analysis"].get("key_insights", []) if line.strip()
+                )
+        
+        if not insights:
+            return ""
+        findings = self.budget.fit("planning.findings", "\n".join(insights))
+        return "\nResearch Findings (use these to ground the plan):\n" + findings + "\n"
             
-        except Exception as e:
-            self.update_state(status="error", current_task=None)
-            raise
+    def _section_event(self, section: Section) -> Dict[str, Any]:
+        """A ``plan_section`` event for a section that just closed"""
+        return self._event("plan_section", text=section.text, section=section.to_dict())
             
-    def _structure_plan(self, raw_plan: str) -> Dict[str, Any]:
-        """Structure the raw plan into a formatted response"""
-        # Split the plan into sections and clean up
-        sections = raw_plan.split("\n")
-        cleaned_sections = [s.strip() for s in sections if s.strip()]
+    def _structure_plan(self, raw_plan: str, sections: Optional[List[Section]] = None) -> Dict[str, Any]:
+        """Structure the raw plan into a formatted response
+        
+        ``steps`` keeps every non-empty line; ``sections`` is the parsed
+        section tree (passed in when the plan was already parsed while
+        streaming).
+        """
+        lines = [line.strip() for line in raw_plan.split("\n") if line.strip()]
+        if sections is None:
+            sections = parse_sections(raw_plan)
         
         return {
-            "steps": cleaned_sections,
+            "steps": lines,
+            "sections": [section.to_dict() for section in sections],
             "generated_at": "now",
             "confidence": 0.8,
-            "format_version": "2.0"
+            "format_version": "2.1"
         } 
\ No newline at end of file
@@ -1,94 +1,415 @@
-from typing import Dict, Any, List
+import asyncio
+import re
+from typing import Dict, Any, List, Optional, Union, AsyncIterator, Tuple
 from .base_agent import BaseAgent
-from langchain_google_genai import ChatGoogleGenerativeAI # type: ignore [import-untyped]
-from langchain.schema import HumanMessage, SystemMessage # type: ignore [import-untyped]
+from ..llm.cache import LLMCache
+from ..llm.clients import get_default_registry
+from ..utils.markdown import Section, SectionParser, parse_sections
+from config.settings import AGENT_CONFIG, GOOGLE_CONFIG
+
+# Research strategies:
+#   two-pass    - gather, then analyze the gathered text (two sequential calls)
+#   single-pass - gather and analyze in one call
+#   map-reduce  - gather, then analyze chunks of the gathered text concurrently and merge
+STRATEGIES = ("two-pass", "single-pass", "map-reduce")
+
+# Section markers requested from the model in single-pass mode
+FINDINGS_MARKER = "## Findings"
+INSIGHTS_MARKER = "## Key Insights"
 
 class ResearchAgent(BaseAgent):
     """Agent responsible for gathering and analyzing information"""
     
-    def __init__(self, name: str = "ResearchAgent", google_api_key: str = None): # type: ignore
-        super().__init__(name)
-        self.llm = ChatGoogleGenerativeAI(
-            model="models/gemini-2.5-pro",
-            google_api_key=google_api_key,
-            temperature=0.7
-        )
+    agent_type = "research"
+    
+    def __init__(
+        self,
+        name: str = "ResearchAgent",
+        google_api_key: str = None, # type: ignore
+        model_name: Optional[str] = None,
+        temperature: Optional[float] = None,
+        cache: Optional[LLMCache] = None,
+        max_concurrency: Optional[int] = None,
+        strategy: Optional[str] = None,
+        chunk_chars: Optional[int] = None
+    ):
+        super().__init__(name, cache=cache, max_concurrency=max_concurrency)
+        self.google_api_key = google_api_key
+        self.model_name = model_name or GOOGLE_CONFIG["model_name"]
+        self.temperature = GOOGLE_CONFIG["temperature"] if temperature is None else temperature
+        research_config = AGENT_CONFIG["research"]
+        self.strategy = strategy or research_config["strategy"]
+        self.chunk_chars = chunk_chars or research_config["chunk_chars"]
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown research strategy: {self.strategy}")
+        
+    def _strategy_for(self, task: Dict[str, Any]) -> str:
+        """Get the research strategy for a task (a task may override the agent default)"""
+        strategy = task.get("research_strategy", self.strategy)
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown research strategy: {strategy}")
+        return strategy
+        
+    def _create_llm(self) -> Any:
+        """Get a pooled Gemini client from the shared registry"""
+        return self._create_llm_for(self.model_name)
+        
+    def _create_llm_for(self, model: str) -> Any:
+        """Get a pooled client for a routed model, with this agent's temperature and key"""
+        return get_default_registry().get(model, self.temperature, self.google_api_key)
         
     async def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Process a research task"""
-        self.update_state(status="working", current_task=task)
-        
-        try:
+        async with self.task_context(task) as ctx:
+            strategy = self._strategy_for(task)
+            
             # Extract relevant information from task
             description = task.get("description", "")
             
             # Prepare research query
             research_query = self._prepare_research_query(description)
+            ctx.add_to_memory("research_query", research_query)
             
-            # Gather information using LLM
-            research_results = await self._gather_information(research_query)
-            
-            # Analyze gathered information
-            analysis = await self._analyze_information(research_results)
+            # Each stage is journaled, so a retried task skips stages that already completed
+            if strategy == "single-pass":
+                # Gather and analyze in one round-trip
+                research_results, analysis = await self.step(
+                    "research.single_pass", lambda: self._research_single_pass(research_query)
+                )
+                ctx.add_to_memory("research_results", research_results)
+            else:
+                # Gather information using LLM
+                research_results = await self.step("research.gather", lambda: self._gather_information(research_query))
+                ctx.add_to_memory("research_results", research_results)
+                
+                # Analyze gathered information
+                analyze = self._analyze_map_reduce if strategy == "map-reduce" else self._analyze_information
+                analysis = await self.step("research.analyze", lambda: analyze(research_results))
             
             # Prepare final results
+            return {
+                "status": "completed",
+                "research_query": research_query,
+                "raw_results": research_results,
+                "analysis": analysis,
+                "strategy": strategy
+            }
+            
+    async def stream(self, task: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream research output as it is generated, stage by stage"""
+        async with self.task_context(task) as ctx:
+            strategy = self._strategy_for(task)
+            research_query = self._prepare_research_query(task.get("description", ""))
+            ctx.add_to_memory("research_query", research_query)
+            
+            # Stream the gather stage (gather + analyze in single-pass mode); a
+            # stage journaled by an earlier attempt is replayed as one chunk
+            gather_stage = "research.single_pass" if strategy == "single-pass" else "research.gather"
+            resumed = self._resume(gather_stage)
+            if resumed is not None:
+                research_results, analysis = resumed if strategy == "single-pass" else (resumed, None)
+                text = "\n".join(result["content"] for result in research_results)
+                yield self._event("research_chunk", stage="gather", text=text, resumed=True)
+            else:
+                parts: List[str] = []
+                gather_prompt = (
+                    self._build_single_pass_prompt(research_query) if strategy == "single-pass"
+                    else self._build_gather_prompt(research_query)
+                )
+                async for text in self.stream_generate(gather_prompt, gather_stage):
+                    parts.append(text)
+                    yield self._event("research_chunk", stage="gather", text=text)
+                
+                if strategy == "single-pass":
+                    research_results, analysis = self._split_single_pass("".join(parts))
+                    self._record_step(gather_stage, (research_results, analysis))
+                else:
+                    research_results = self._package_gathered("".join(parts))
+                    self._record_step(gather_stage, research_results)
+                
+            if strategy != "single-pass":
+                analysis = self._resume("research.analyze")
+                if analysis is not None:
+                    yield self._event("research_chunk", stage="analyze", text="\n".join(analysis["key_insights"]), resumed=True)
+                elif strategy == "map-reduce":
+                    # Emit each chunk's insights as soon as that chunk is analyzed
+                    prompts = await asyncio.gather(*(
+                        self._build_analysis_prompt(self._package_gathered(chunk))
+                        for chunk in self._split_content(research_results)
+                    ))
+                    chunk_insights: List[str] = [""] * len(prompts)
+                    
+                    async def analyze_chunk(index: int) -> Tuple[int, str]:
+                        return index, await self.generate(prompts[index], "research.analyze")
+                    
+                    # Own the chunk calls, so a consumer that stops reading cancels them
+                    chunk_tasks = [asyncio.create_task(analyze_chunk(i)) for i in range(len(prompts))]
+                    try:
+                        for finished in asyncio.as_completed(chunk_tasks):
+                            index, insights = await finished
+                            chunk_insights[index] = insights
+                            yield self._event("research_chunk", stage="analyze", chunk=index, text=insights)
+                    finally:
+                        for chunk_task in chunk_tasks:
+                            chunk_task.cancel()
+                        await asyncio.gather(*chunk_tasks, return_exceptions=True)
+                    analysis = self._merge_analyses(chunk_insights)
+                    self._record_step("research.analyze", analysis)
+                else:
+                    # Stream the analysis stage, emitting insight sections as they close
+                    parts = []
+                    parser = SectionParser()
+                    analysis_prompt = await self._build_analysis_prompt(research_results)
+                    async for text in self.stream_generate(analysis_prompt, "research.analyze"):
+                        parts.append(text)
+                        yield self._event("research_chunk", stage="analyze", text=text)
+                        for section in parser.feed(text):
+                            yield self._event("research_section", text=section.text, section=section.to_dict())
+                    for section in parser.close():
+                        yield self._event("research_section", text=section.text, section=section.to_dict())
+                    analysis = self._package_analysis("".join(parts), parser.sections)
+                    self._record_step("research.analyze", analysis)
+            ctx.add_to_memory("research_results", research_results)
+            
             result = {
                 "status": "completed",
                 "research_query": research_query,
                 "raw_results": research_results,
-                "analysis": analysis
+                "analysis": analysis,
+                "strategy": strategy
             }
+        
+        yield self._event("agent_done", result=result)
+            
+    async def process_batch(self, tasks: List[Dict[str, Any]]) -> List[Union[Dict[str, Any], Exception]]:
+        """Process several research tasks, batching each pipeline stage into one LLM call"""
+        async with self.batch_context(tasks) as contexts:
+            queries = [self._prepare_research_query(task.get("description", "")) for task in tasks]
+            
+            # Tasks may pick different strategies; each strategy group is batched on its own
+            groups: Dict[str, List[int]] = {}
+            for i, task in enumerate(tasks):
+                groups.setdefault(self._strategy_for(task), []).append(i)
+            
+            outcomes: List[Union[Tuple[List[Dict[str, Any]], Dict[str, Any]], Exception, None]] = [None] * len(tasks)
+            group_outcomes = await asyncio.gather(*(
+                self._research_batch(strategy, [queries[i] for i in indices])
+                for strategy, indices in groups.items()
+            ))
+            for indices, group in zip(groups.values(), group_outcomes):
+                for i, outcome in zip(indices, group):
+                    outcomes[i] = outcome
             
-            self.update_state(status="idle", current_task=None)
-            return result
+            results: List[Union[Dict[str, Any], Exception]] = []
+            for ctx, task, query, outcome in zip(contexts, tasks, queries, outcomes):
+                if isinstance(outcome, Exception):
+                    ctx.status = "error"
+                    ctx.error = str(outcome)
+                    results.append(outcome)
+                else:
+                    research_results, analysis = outcome # type: ignore [misc]
+                    results.append({
+                        "status": "completed",
+                        "research_query": query,
+                        "raw_results": research_results,
+                        "analysis": analysis,
+                        "strategy": self._strategy_for(task)
+                    })
+            return results
             
-        except Exception as e:
-            self.update_state(status="error", current_task=None)
-            raise
+    async def _research_batch(
+        self,
+        strategy: str,
+        queries: List[str]
+    ) -> List[Union[Tuple[List[Dict[str, Any]], Dict[str, Any]], Exception]]:
+        """Run one strategy for several queries with one batched call per stage"""
+        if strategy == "single-pass":
+            outputs = await self.generate_many(
+                [self._build_single_pass_prompt(query) for query in queries], "research.single_pass"
+            )
+            return [
+                output if isinstance(output, Exception) else self._split_single_pass(output)
+                for output in outputs
+            ]
+        
+        # Stage 1: gather information for every query at once
+        gathered = await self.generate_many([self._build_gather_prompt(query) for query in queries], "research.gather")
+        
+        # Stage 2: analyze only the queries whose gather stage succeeded; in
+        # map-reduce mode every chunk of every query goes into the same batch
+        owners: List[int] = []
+        chunks: List[str] = []
+        research_results: Dict[int, List[Dict[str, Any]]] = {}
+        for i, content in enumerate(gathered):
+            if isinstance(content, Exception):
+                continue
+            research_results[i] = self._package_gathered(content)
+            for chunk in self._split_content(research_results[i]) if strategy == "map-reduce" else [content]:
+                owners.append(i)
+                chunks.append(chunk)
+        prompts = await asyncio.gather(*(self._build_analysis_prompt(self._package_gathered(chunk)) for chunk in chunks))
+        analyses = await self.generate_many(list(prompts), "research.analyze")
+        
+        per_query: Dict[int, List[Union[str, Exception]]] = {}
+        for owner, analysis in zip(owners, analyses):
+            per_query.setdefault(owner, []).append(analysis)
+        
+        outcomes: List[Union[Tuple[List[Dict[str, Any]], Dict[str, Any]], Exception]] = []
+        for i, content in enumerate(gathered):
+            if isinstance(content, Exception):
+                outcomes.append(content)
+                continue
+            error = next((a for a in per_query[i] if isinstance(a, Exception)), None)
+            if error is not None:
+                outcomes.append(error)
+            elif strategy == "map-reduce":
+                outcomes.append((research_results[i], self._merge_analyses(per_query[i]))) # type: ignore [arg-type]
+            else:
+                outcomes.append((research_results[i], self._package_analysis(per_query[i][0]))) # type: ignore [arg-type]
+        return outcomes
             
     def _prepare_research_query(self, description: str) -> str:
         """Prepare a research query from task description"""
-        return f"Research and analyze: {description}"
+        return f"Research and analyze: {self.budget.fit('research.query', description)}"
         
-    async def _gather_information(self, query: str) -> List[Dict[str, Any]]:
-        """Gather information using LLM"""
+    def _build_gather_prompt(self, query: str) -> str:
+        """Build the information gathering prompt for a query"""
         # Combine system and human messages into a single human message
-        combined_prompt = f"""You are a research assistant tasked with gathering comprehensive information.
+        return f"""You are a research assistant tasked with gathering comprehensive information.
 
 Query: {query}
 
 Please provide detailed, well-structured information addressing all aspects of the query."""
 
-        messages = [HumanMessage(content=combined_prompt)]
-        
-        response = await self.llm.agenerate([messages])
-        
+    def _package_gathered(self, content: str) -> List[Dict[str, Any]]:
+        """Wrap gathered LLM output as research results"""
         return [{
             "source": "LLM",
-            "content": response.generations[0][0].text,
+            "content": content,
             "confidence": 0.8
         }]
         
-    async def _analyze_information(self, research_results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze gathered information"""
+    async def _gather_information(self, query: str) -> List[Dict[str, Any]]:
+        """Gather information using LLM"""
+        content = await self.generate(self._build_gather_prompt(query), "research.gather")
+        return self._package_gathered(content)
+        
+    async def _build_analysis_prompt(self, research_results: List[Dict[str, Any]]) -> str:
+        """Build the analysis prompt from gathered research results, compacted to the stage budget
+
+        Oversized input may be summarized first (see BUDGET_CONFIG), on every
+        path that analyzes: single, batched, streamed and map-reduce.
+        """
         combined_results = "\n".join(
             result["content"] for result in research_results
         )
+        compacted = await self.budget.fit_async("research.analyze", combined_results, summarize=self._summarize)
+        return self._analysis_prompt(compacted)
         
+    def _analysis_prompt(self, combined_results: str) -> str:
+        """Fill the analysis prompt template with already-compacted research text"""
         # Combine system and human messages into a single human message
-        combined_prompt = f"""You are an analyst tasked with extracting key insights from research data.
+        return f"""You are an analyst tasked with extracting key insights from research data.
 
 Research Results:
 {combined_results}
 
 Please analyze these results and provide key insights in a clear, structured format."""
 
-        messages = [HumanMessage(content=combined_prompt)]
-        
-        response = await self.llm.agenerate([messages])
-        
+    def _package_analysis(self, insights: str, sections: Optional[List[Section]] = None) -> Dict[str, Any]:
+        """Wrap analysis LLM output as structured insights (lines plus the parsed section tree)"""
+        if sections is None:
+            sections = parse_sections(insights)
         return {
-            "key_insights": response.generations[0][0].text.split("\n"),
+            "key_insights": insights.split("\n"),
+            "sections": [section.to_dict() for section in sections],
             "confidence_score": 0.8,
             "analysis_method": "LLM-based semantic analysis"
-        } 
\ No newline at end of file
+        }
+        
+    async def _analyze_information(self, research_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze gathered information"""
+        insights = await self.generate(await self._build_analysis_prompt(research_results), "research.analyze")
+        return self._package_analysis(insights)
+        
+    async def _summarize(self, text: str) -> str:
+        """Condense part of the gathered research for the summarize-first pass"""
+        return await self.generate(f"""Condense these research notes. Keep every fact, figure and name; drop repetition and filler.
+
+Notes:
+{text}""", "research.summarize")
+        
+    def _build_single_pass_prompt(self, query: str) -> str:
+        """Build a prompt that gathers and analyzes in one response"""
+        return f"""You are a research analyst. Gather comprehensive information and extract key insights in a single response.
+
+Query: {query}
+
+Structure your response in exactly two markdown sections:
+{FINDINGS_MARKER}
+Detailed, well-structured information addressing all aspects of the query.
+
+{INSIGHTS_MARKER}
+The key insights from these findings in a clear, structured format."""
+
+    async def _research_single_pass(self, query: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Gather and analyze information with a single LLM call"""
+        return self._split_single_pass(await self.generate(self._build_single_pass_prompt(query), "research.single_pass"))
+        
+    def _split_single_pass(self, text: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Split a single-pass response into research results and analysis"""
+        match = re.search(rf"^\s*{re.escape(INSIGHTS_MARKER)}\s*$", text, flags=re.MULTILINE | re.IGNORECASE)
+        if match is None:
+            # The model ignored the requested layout; use the whole response for both
+            return self._package_gathered(text), self._package_analysis(text)
+        
+        findings = re.sub(rf"^\s*{re.escape(FINDINGS_MARKER)}\s*$", "", text[:match.start()],
+                          count=1, flags=re.MULTILINE | re.IGNORECASE).strip()
+        insights = text[match.end():].strip()
+        return self._package_gathered(findings), self._package_analysis(insights)
+        
+    def _split_content(self, research_results: List[Dict[str, Any]]) -> List[str]:
+        """Split gathered content into chunks of at most ``chunk_chars`` on paragraph boundaries"""
+        content = "\n".join(result["content"] for result in research_results)
+        chunks: List[str] = []
+        current = ""
+        for paragraph in content.split("\n\n"):
+            # Paragraphs longer than a chunk are hard-split
+            while len(paragraph) > self.chunk_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(paragraph[:self.chunk_chars])
+                paragraph = paragraph[self.chunk_chars:]
+            if current and len(current) + len(paragraph) + 2 > self.chunk_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current.strip() or not chunks:
+            chunks.append(current)
+        return chunks
+        
+    async def _analyze_map_reduce(self, research_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze chunks of the gathered information concurrently and merge the insights"""
+        chunks = self._split_content(research_results)
+        async def analyze_chunk(chunk: str) -> str:
+            return await self.generate(await self._build_analysis_prompt(self._package_gathered(chunk)), "research.analyze")
+        
+        analyses = await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks))
+        return self._merge_analyses(list(analyses))
+        
+    def _merge_analyses(self, analyses: List[str]) -> Dict[str, Any]:
+        """Merge per-chunk insights, dropping lines repeated across chunks"""
+        seen = set()
+        merged: List[str] = []
+        for analysis in analyses:
+            for line in analysis.split("\n"):
+                key = line.strip().lower()
+                if key and key in seen:
+                    continue
+                seen.add(key)
+                merged.append(line)
+        
+        result = self._package_analysis("\n".join(merged))
+        result["analysis_method"] = f"LLM-based map-reduce analysis over {len(analyses)} chunks"
+        return result
@@ -0,0 +1,171 @@
+"""
+Typed, slotted models of the results agents produce.
+
+Agents build and return plain dicts; these models are the compact form for
+holding many results in memory and for the binary codec
+(``src.storage.codec``), which writes a model's field values without their
+names. ``from_dict`` accepts any result dict: keys without a field are kept
+in ``extra``, and ``to_dict`` gives the same dict back, so the JSON form is
+unchanged.
+
+Codec type ids and field order are part of the stored format: new fields
+go at the end of a class.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Union
+
+from src.storage.codec import register
+
+def _split(cls: type, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Constructor arguments for ``cls``: its fields from ``data``, everything else as ``extra``"""
+    names = cls.__dataclass_fields__
+    kwargs = {key: value for key, value in data.items() if key in names and key != "extra"}
+    if "extra" in names:
+        kwargs["extra"] = {key: value for key, value in data.items() if key not in names}
+    return kwargs
+
+def _to_dict(obj: Any, optional: tuple = ()) -> Dict[str, Any]:
+    """Fields of a model as a dict; ``optional`` fields are left out while None, ``extra`` is merged in"""
+    result: Dict[str, Any] = {}
+    for name in obj.__dataclass_fields__:
+        value = getattr(obj, name)
+        if name == "extra":
+            result.update(value)
+        elif value is not None or name not in optional:
+            result[name] = value.to_dict() if hasattr(value, "to_dict") else value
+    return result
+
+@register(1)
+@dataclass(slots=True)
+class ResearchSource:
+    """One piece of gathered information"""
+    source: str = "LLM"
+    content: str = ""
+    confidence: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResearchSource":
+        return cls(**_split(cls, data))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+@register(2)
+@dataclass(slots=True)
+class Analysis:
+    """Insights extracted from gathered information"""
+    key_insights: List[str] = field(default_factory=list)
+    sections: List[Dict[str, Any]] = field(default_factory=list)
+    confidence_score: float = 0.0
+    analysis_method: str = ""
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Analysis":
+        return cls(**_split(cls, data))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+@register(3)
+@dataclass(slots=True)
+class ResearchResult:
+    """Result of a ResearchAgent"""
+    status: str = "completed"
+    research_query: str = ""
+    raw_results: List[ResearchSource] = field(default_factory=list)
+    analysis: Optional[Analysis] = None
+    strategy: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResearchResult":
+        kwargs = _split(cls, data)
+        kwargs["raw_results"] = [ResearchSource.from_dict(item) for item in kwargs.get("raw_results", [])]
+        if kwargs.get("analysis") is not None:
+            kwargs["analysis"] = Analysis.from_dict(kwargs["analysis"])
+        return cls(**kwargs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = _to_dict(self, optional=("analysis", "strategy"))
+        result["raw_results"] = [item.to_dict() for item in self.raw_results]
+        return result
+
+@register(4)
+@dataclass(slots=True)
+class Plan:
+    """Plan produced by a PlanningAgent"""
+    steps: List[str] = field(default_factory=list)
+    sections: List[Dict[str, Any]] = field(default_factory=list)
+    generated_at: str = ""
+    confidence: float = 0.0
+    format_version: str = ""
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Plan":
+        return cls(**_split(cls, data))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+@register(5)
+@dataclass(slots=True)
+class SubtaskResult:
+    """Outcome of one subtask in a combined result"""
+    id: str = ""
+    type: str = ""
+    agent: str = ""
+    description: str = ""
+    depends_on: List[str] = field(default_factory=list)
+    status: str = ""
+    elapsed: Optional[float] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SubtaskResult":
+        return cls(**_split(cls, data))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self, optional=("error",))
+
+@register(6)
+@dataclass(slots=True)
+class TaskResult:
+    """Combined result of a TaskManagerAgent task
+
+    ``research_results`` and ``plan`` hold the empty dict when that agent
+    produced nothing, as in the result dict.
+    """
+    status: str = "completed"
+    research_results: Union[ResearchResult, Dict[str, Any], None] = None
+    plan: Union[Plan, Dict[str, Any], None] = None
+    subtask_results: Optional[List[SubtaskResult]] = None
+    agent_status: Optional[Dict[str, Dict[str, Any]]] = None
+    outputs: Optional[Dict[str, Any]] = None
+    summary: Optional[str] = None
+    message: Optional[str] = None
+    timing: Optional[Dict[str, Any]] = None
+    task_id: Optional[str] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    trace: Optional[Dict[str, Any]] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaskResult":
+        kwargs = _split(cls, data)
+        if kwargs.get("research_results"):
+            kwargs["research_results"] = ResearchResult.from_dict(kwargs["research_results"])
+        if kwargs.get("plan"):
+            kwargs["plan"] = Plan.from_dict(kwargs["plan"])
+        if kwargs.get("subtask_results") is not None:
+            kwargs["subtask_results"] = [SubtaskResult.from_dict(item) for item in kwargs["subtask_results"]]
+        return cls(**kwargs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Every field but status is optional: error results carry only a message
+        result = _to_dict(self, optional=tuple(name for name in self.__dataclass_fields__ if name != "status"))
+        if self.subtask_results is not None:
+            result["subtask_results"] = [item.to_dict() for item in self.subtask_results]
+        return result
@@ -1,104 +1,504 @@
-from typing import Dict, Any, List
+import copy
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, AsyncIterator, Optional
 from .base_agent import BaseAgent
+from .context import TaskContext
+from .dag import DAGScheduler, DAGNode, COMPLETED
+from ..utils.helpers import save_task_result, task_content_hash
+from ..utils.singleflight import SingleFlight
+from config.settings import SYSTEM_CONFIG, AGENT_CONFIG, SEMANTIC_CONFIG, RESULT_STORE_CONFIG
 import asyncio
 
+# Pipeline stages in dependency order; each stage consumes the previous one's output
+PIPELINE = ["research", "planning", "implementation", "qa"]
+
 class TaskManagerAgent(BaseAgent):
     """Agent responsible for coordinating other agents"""
     
-    def __init__(self, name: str = "TaskManager"):
+    agent_type = "task_manager"
+    
+    def __init__(self, name: str = "TaskManager", semantic_index: Any = None, result_store: Any = None):
         super().__init__(name)
         self.agents: List[BaseAgent] = []
+        self.agent_pool: Dict[str, BaseAgent] = {}
+        
+        # Results of earlier tasks, reused for near-duplicate descriptions
+        if semantic_index is None and SEMANTIC_CONFIG["enabled"]:
+            # Imported here so NumPy only loads when reuse is switched on
+            from ..memory.semantic import get_default_semantic_index
+            semantic_index = get_default_semantic_index()
+        self.semantic_index = semantic_index
+        
+        # Finished results are kept in the indexed result store
+        if result_store is None and RESULT_STORE_CONFIG["enabled"]:
+            from ..storage.result_store import get_default_result_store
+            result_store = get_default_result_store()
+        self.result_store = result_store
+        
+        # Identical tasks submitted while one is running share its result
+        self.single_flight: Optional[SingleFlight] = SingleFlight() if SYSTEM_CONFIG["coalesce_tasks"] else None
         
     def register_agent(self, agent: BaseAgent) -> None:
         """Register an agent with the task manager"""
         self.agents.append(agent)
+        self.agent_pool[agent.state.name] = agent
+        
+    async def process(
+        self,
+        task: Dict[str, Any],
+        timeout: int = 120,
+        agent_timeouts: Optional[Dict[str, float]] = None,
+        first_k: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Process a task by running its subtasks as a dependency graph
         
-    async def process(self, task: Dict[str, Any], timeout: int = 120) -> Dict[str, Any]:
-        """Process a task by coordinating multiple agents"""
-        self.update_state(status="working", current_task=task)
+        The task is broken into subtasks (research, then planning, ...) and
+        each is run by its agent as soon as its dependencies finish, with
+        upstream outputs fed into downstream prompts. Each agent runs under
+        its own deadline (``agent_timeouts`` by agent name, capped by
+        ``timeout``); with ``first_k`` the call returns as soon as that many
+        subtasks have completed. The result carries per-subtask and
+        per-agent status plus critical-path timing, and its overall status
+        is ``completed``, ``partial`` or ``error``.
         
-        try:
-            # Create tasks for all agents
-            tasks = []
-            for i, agent in enumerate(self.agents):
-                print(f"  🔄 Starting {agent.__class__.__name__}...")
-                tasks.append(asyncio.create_task(agent.process(task)))
+        While a task is running, identical tasks (same content and options)
+        attach to it and get a copy of its result marked ``coalesced``.
+        
+        With a step journal (``STEP_JOURNAL=true``), subtasks and agent stages
+        completed by an earlier attempt of the task (same ``id``, or same
+        content) are not run again; the result lists them under ``resumed``.
+        
+        With a result store (``RESULT_STORE=true``) every result is saved there.
+        """
+        self._validate_task(task)
+        if self.single_flight is None or task.get("coalesce") is False:
+            result = await self._process(task, timeout, agent_timeouts, first_k)
+        else:
+            key = (task_content_hash(task), timeout, json.dumps(agent_timeouts, sort_keys=True), first_k)
+            leader, joined = await self.single_flight.do(
+                key, lambda: self._process(task, timeout, agent_timeouts, first_k)
+            )
+            result = leader
+            if joined:
+                result = copy.deepcopy(leader)
+                result["coalesced"] = {"task_id": leader.get("task_id")}
+                result["task_id"] = str(task["id"]) if "id" in task else uuid.uuid4().hex
+                result.pop("trace", None)
+        self._save_result(task, result)
+        return result
+        
+    async def _process(
+        self,
+        task: Dict[str, Any],
+        timeout: int,
+        agent_timeouts: Optional[Dict[str, float]],
+        first_k: Optional[int]
+    ) -> Dict[str, Any]:
+        """Run one task's subtask graph (see ``process``)"""
+        async with self.task_context(task) as ctx:
+            reused = self._find_reusable(task)
+            if reused is not None:
+                print(f"  ♻️ Reusing the result of a similar task ({reused['reused']['similarity']:.2f} similar)")
+                return self._stamp_result(reused, ctx)
             
-            # Wait for all tasks with timeout
-            print("  ⏳ Waiting for agent responses (timeout:", timeout, "seconds)...")
-            results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=timeout)
-            print("  ✓ All agents completed successfully")
+            try:
+                scheduler = DAGScheduler(self._break_down_task(task))
+                
+                for node in scheduler.nodes.values():
+                    print(f"  🔄 Scheduling {node.subtask['agent']} ({node.id})...")
+                print("  ⏳ Waiting for agent responses (timeout:", timeout, "seconds)...")
+                
+                async def run_node(subtask: Dict[str, Any], upstream: Dict[str, Any]) -> Dict[str, Any]:
+                    agent = self.agent_pool[subtask["agent"]]
+                    # A subtask completed by an earlier attempt of this task is not run again
+                    return await self.step(
+                        f"subtask.{subtask['id']}",
+                        lambda: agent.process(self._subtask_input(task, subtask, upstream))
+                    )
+                    
+                nodes = await scheduler.run(
+                    run_node,
+                    timeout=timeout,
+                    node_timeouts=self._node_timeouts(scheduler, agent_timeouts),
+                    first_k=first_k
+                )
+                for node in nodes:
+                    if node.status != COMPLETED:
+                        print(f"  ⚠️ {node.subtask['agent']} {node.status.replace('_', ' ')}")
+                        
+                combined_results = self._combine_results(nodes)
+                combined_results["timing"] = scheduler.timing()
+                self._stamp_result(combined_results, ctx)
+                if ctx.get_from_memory("resumed_steps"):
+                    combined_results["resumed"] = ctx.get_from_memory("resumed_steps")
+                
+                if combined_results["status"] == "error":
+                    print("\n  ❌ Error: No agent completed")
+                    print("  💡 Tip: Try increasing the timeout or simplifying the task")
+                    ctx.status = "error"
+                    ctx.error = combined_results["message"]
+                    return combined_results
+                    
+                if combined_results["status"] == "partial":
+                    completed = sum(1 for node in nodes if node.status == COMPLETED)
+                    print(f"  ⚠️ Returning partial results from {completed}/{len(nodes)} subtasks")
+                else:
+                    print("  ✓ All agents completed successfully")
+                    self._remember(task, combined_results)
+                    self._forget_steps(task)
+                    
+                # Validate results
+                if not combined_results["research_results"]:
+                    print("  ⚠️ Warning: No research results available")
+                if not combined_results["plan"]:
+                    print("  ⚠️ Warning: No planning results available")
+                    
+                return combined_results
+                
+            except Exception as e:
+                print(f"\n  ❌ Error: {str(e)}")
+                ctx.status = "error"
+                ctx.error = str(e)
+                return self._stamp_result({
+                    "status": "error",
+                    "message": str(e)
+                }, ctx)
+                
+    async def process_stream(self, task: Dict[str, Any], timeout: int = 120) -> AsyncIterator[Dict[str, Any]]:
+        """Process a task, yielding tagged agent events as soon as they arrive
+        
+        Events are ``research_chunk``, ``research_section``, ``plan_section``,
+        ``agent_done`` and ``agent_error`` from the agents, followed by one ``task_done`` event
+        carrying the combined result. Subtasks are scheduled as in
+        ``process``, so downstream agents start streaming once their
+        dependencies are done.
+        """
+        self._validate_task(task)
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        finished = object()
+        
+        async def run_node(subtask: Dict[str, Any], upstream: Dict[str, Any]) -> Dict[str, Any]:
+            agent = self.agent_pool[subtask["agent"]]
+            stage = f"subtask.{subtask['id']}"
+            result: Dict[str, Any] = self._resume(stage) or {}
+            if result:
+                await queue.put(agent._event("agent_done", result=result, resumed=True))
+                return result
+            try:
+                async for event in agent.stream(self._subtask_input(task, subtask, upstream)):
+                    if event["type"] == "agent_done":
+                        result = event["result"]
+                    await queue.put(event)
+            except Exception as e:
+                await queue.put(agent._event("agent_error", message=str(e)))
+                raise
+            self._record_step(stage, result)
+            return result
             
-            # Combine results with better error handling
-            combined_results = {
-                "status": "completed",
-                "research_results": {},
-                "plan": {}
-            }
+        async with self.task_context(task) as ctx:
+            reused = self._find_reusable(task)
+            if reused is not None:
+                self._save_result(task, self._stamp_result(reused, ctx))
+                yield {"type": "task_done", "agent": self.state.name, "result": reused}
+                return
             
-            for result in results:
-                if isinstance(result, dict):
-                    if "research_query" in result:
-                        combined_results["research_results"] = result
-                    elif "plan" in result:
-                        combined_results["plan"] = result.get("plan", {})
+            scheduler = DAGScheduler(self._break_down_task(task))
             
-            # Validate results
-            if not combined_results["research_results"]:
-                print("  ⚠️ Warning: No research results available")
-            if not combined_results["plan"]:
-                print("  ⚠️ Warning: No planning results available")
+            async def run_graph() -> List[DAGNode]:
+                try:
+                    return await scheduler.run(run_node, timeout=timeout)
+                finally:
+                    await queue.put({"type": finished})
+                    
+            runner = asyncio.create_task(run_graph())
+            try:
+                while True:
+                    event = await queue.get()
+                    if event["type"] is finished:
+                        break
+                    yield event
+                nodes = await runner
+            finally:
+                # Stop agents that are still generating if the consumer went away
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+                
+            combined_results = self._combine_results(nodes)
+            combined_results["timing"] = scheduler.timing()
+            self._stamp_result(combined_results, ctx)
+            if ctx.get_from_memory("resumed_steps"):
+                combined_results["resumed"] = ctx.get_from_memory("resumed_steps")
+            if combined_results["status"] == "error":
+                ctx.status = "error"
+                ctx.error = combined_results["message"]
+            elif combined_results["status"] == "completed":
+                self._remember(task, combined_results)
+                self._forget_steps(task)
+                
+        self._save_result(task, combined_results)
+        yield {"type": "task_done", "agent": self.state.name, "result": combined_results}
+        
+    async def process_many(
+        self,
+        tasks: List[Dict[str, Any]],
+        max_concurrency: int = SYSTEM_CONFIG["max_concurrency"],
+        batch_size: int = SYSTEM_CONFIG["batch_size"],
+        timeout: int = 120
+    ) -> List[Dict[str, Any]]:
+        """Process many tasks, batching each agent's LLM calls across tasks
+        
+        Tasks are grouped into batches of ``batch_size``. Within a batch the
+        subtask graph runs wave by wave: every agent in a wave handles the
+        whole batch with one ``agenerate`` call per pipeline stage, fed with
+        each task's upstream outputs. At most ``max_concurrency`` batches
+        run at once. Results come back in input order, with per-task
+        status and errors; a task that fails validation gets an error
+        result and is not run.
+        """
+        results: List[Dict[str, Any]] = [{}] * len(tasks)
+        valid: List[int] = []
+        for i, task in enumerate(tasks):
+            try:
+                self._validate_task(task)
+            except ValueError as e:
+                results[i] = {"status": "error", "message": str(e)}
+            else:
+                valid.append(i)
+        valid_tasks = [tasks[i] for i in valid]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_batch(offset: int, batch: List[Dict[str, Any]]) -> None:
+            # Batched tasks share the default breakdown, so one graph per task
+            # with identical shape; the waves are taken from the first
+            schedulers = [DAGScheduler(self._break_down_task(task, allow_override=False)) for task in batch]
+            waves = schedulers[0].levels()
             
-            self.update_state(status="idle", current_task=None)
-            return combined_results
+            async def run_waves() -> None:
+                for wave in waves:
+                    await asyncio.gather(*(run_stage(node.id) for node in wave))
+                    
+            async def run_stage(node_id: str) -> None:
+                nodes = [scheduler.nodes[node_id] for scheduler in schedulers]
+                agent = self.agent_pool[nodes[0].subtask["agent"]]
+                inputs = [
+                    self._subtask_input(task, node.subtask, scheduler.upstream_results(node))
+                    for task, node, scheduler in zip(batch, nodes, schedulers)
+                ]
+                loop = asyncio.get_running_loop()
+                for node in nodes:
+                    node.status = "running"
+                    node.started = loop.time()
+                try:
+                    outputs: List[Any] = await agent.process_batch(inputs)
+                except Exception as e:
+                    outputs = [e] * len(nodes)
+                for node, output in zip(nodes, outputs):
+                    node.finished = loop.time()
+                    if isinstance(output, Exception):
+                        node.status = "failed"
+                        node.error = str(output)
+                    else:
+                        node.status = COMPLETED
+                        node.result = output
+                        
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(run_waves(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    for scheduler in schedulers:
+                        for node in scheduler.nodes.values():
+                            if not node.done:
+                                node.status = "timed_out" if node.status == "running" else "skipped"
+                                node.error = "Timed out" if node.status == "timed_out" else None
+                                
+            for i, scheduler in enumerate(schedulers):
+                result = self._combine_results(list(scheduler.nodes.values()))
+                results[valid[offset + i]] = self._stamp_result(result, contexts[offset + i], trace=False)
+                
+        async with self.batch_context(valid_tasks) as contexts:
+            await asyncio.gather(*(
+                run_batch(offset, valid_tasks[offset:offset + batch_size])
+                for offset in range(0, len(valid_tasks), batch_size)
+            ))
             
-        except asyncio.TimeoutError:
-            print(f"\n  ⚠️ Task timed out after {timeout} seconds")
-            print("  💡 Tip: Try increasing the timeout or simplifying the task")
-            self.update_state(status="error", current_task=None)
-            return {
-                "status": "error",
-                "message": f"Task timed out after {timeout} seconds"
-            }
-        except Exception as e:
-            print(f"\n  ❌ Error: {str(e)}")
-            self.update_state(status="error", current_task=None)
-            return {
-                "status": "error",
-                "message": str(e)
+            for ctx, i in zip(contexts, valid):
+                result = results[i]
+                if result["status"] == "error":
+                    ctx.status = "error"
+                    ctx.error = result["message"]
+                    
+        for task, result in zip(tasks, results):
+            self._save_result(task, result)
+        return results
+        
+    def _stamp_result(self, result: Dict[str, Any], ctx: TaskContext, trace: bool = True) -> Dict[str, Any]:
+        """Record the task's real start/end times and its traced LLM totals on the result"""
+        result["task_id"] = ctx.task_id
+        result["start_time"] = datetime.fromtimestamp(ctx.started_at or ctx.queued_at).isoformat()
+        result["end_time"] = datetime.now().isoformat()
+        # Batched tasks share one span, so its totals are not per task
+        if trace and ctx.span is not None:
+            result["trace"] = {
+                "trace_id": ctx.trace_id,
+                **{key: round(value, 6) for key, value in ctx.span.totals.items()}
             }
+        return result
+        
+    def _find_reusable(self, task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """A copy of an earlier result for a near-duplicate description with identical other fields, or None"""
+        if self.semantic_index is None or task.get("reuse") is False:
+            return None
+        match = self.semantic_index.lookup(task["description"], group=self._reuse_group(task))
+        if match is None:
+            return None
+        similarity, entry = match
+        result = copy.deepcopy(entry["value"])
+        result["reused"] = {"task_id": entry["key"], "similarity": round(similarity, 4)}
+        result.pop("trace", None)
+        return result
+        
+    def _remember(self, task: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Index a completed result for reuse by later near-duplicate tasks"""
+        if self.semantic_index is not None and "reused" not in result:
+            self.semantic_index.add(task["description"], copy.deepcopy(result), key=result.get("task_id"),
+                                    group=self._reuse_group(task))
+        
+    def _save_result(self, task: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Keep a finished result in the result store, and as a JSON file when ``RESULT_JSON_DIR`` is set"""
+        if not result.get("task_id"):
+            return
+        if self.result_store is not None:
+            self.result_store.put(result, task=task)
+        json_dir = RESULT_STORE_CONFIG["json_dir"]
+        if json_dir:
+            os.makedirs(json_dir, exist_ok=True)
+            # The task goes along so a later migration into the store can index it by content
+            save_task_result({**result, "task": task}, os.path.join(json_dir, f"{result['task_id']}.json"))
+        
+    @staticmethod
+    def _reuse_group(task: Dict[str, Any]) -> str:
+        """Hash of everything a task asks for except its description, which must match exactly for reuse"""
+        return task_content_hash({key: value for key, value in task.items() if key not in ("description", "reuse")})
+        
+    def _validate_task(self, task: Dict[str, Any]) -> None:
+        """Reject tasks that cannot be broken down"""
+        if not isinstance(task, dict) or not task.get("description"):
+            raise ValueError("Task must have a description")
+        
+    def _subtask_input(self, task: Dict[str, Any], subtask: Dict[str, Any], upstream: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the task an agent receives for a subtask, including upstream outputs"""
+        subtask_input = {
+            **task,
+            "subtask": {key: subtask[key] for key in ("id", "type", "description")},
+            "upstream_results": upstream
+        }
+        if self.journal is not None:
+            # Agents journal their stages under the task's key, so they are cleared with it
+            subtask_input["journal_key"] = self._journal_key(task)
+        return subtask_input
+        
+    def _journal_key(self, task: Dict[str, Any]) -> Optional[str]:
+        """Tasks are journaled by id or content; the manager clears their steps on completion"""
+        from ..storage.journal import journal_key
+        return journal_key(task)
+        
+    def _forget_steps(self, task: Dict[str, Any]) -> None:
+        """Clear the journaled steps of a task that has completed"""
+        if self.journal is not None:
+            self.journal.clear(self._journal_key(task)) # type: ignore [arg-type]
+        
+    def _node_timeouts(self, scheduler: DAGScheduler, agent_timeouts: Optional[Dict[str, float]]) -> Dict[str, float]:
+        """Translate per-agent deadlines into per-node deadlines"""
+        agent_timeouts = agent_timeouts or {}
+        return {
+            node.id: agent_timeouts[node.subtask["agent"]]
+            for node in scheduler.nodes.values()
+            if node.subtask["agent"] in agent_timeouts
+        }
+        
+    def _collect_results(self, results: List[Any]) -> Dict[str, Any]:
+        """Combine per-agent results for one task into the task result"""
+        combined_results = {
+            "status": "completed",
+            "research_results": {},
+            "plan": {}
+        }
+        
+        for result in results:
+            if isinstance(result, dict):
+                if "research_query" in result:
+                    combined_results["research_results"] = result
+                elif "plan" in result:
+                    combined_results["plan"] = result.get("plan", {})
+                    
+        return combined_results
+        
+    def _break_down_task(self, task: Dict[str, Any], allow_override: bool = True) -> List[Dict[str, Any]]:
+        """Break down a task into subtasks with declared dependencies
+        
+        Pipeline stages with a registered agent are chained in order
+        (research -> planning -> implementation -> qa); registered agents
+        outside the pipeline run as independent subtasks. A task may supply
+        its own graph as ``task["subtasks"]`` (each with ``id``, ``type`` and
+        optional ``depends_on``/``agent``).
+        """
+        description = task.get("description", "")
+        descriptions = {
+            "research": f"Research information for {description}",
+            "planning": f"Create execution plan for {description}",
+            "implementation": f"Implement solution for {description}",
+            "qa": f"Validate results for {description}"
+        }
+        
+        if allow_override and task.get("subtasks"):
+            subtasks = []
+            for subtask in task["subtasks"]:
+                subtask = dict(subtask)
+                subtask.setdefault("id", subtask.get("type"))
+                subtask.setdefault("description", descriptions.get(subtask.get("type", ""), description))
+                subtask.setdefault("depends_on", [])
+                subtask.setdefault("agent", self._select_agent_for_task(subtask))
+                subtasks.append(subtask)
+            return subtasks
             
-    def _break_down_task(self, task: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Break down a complex task into subtasks"""
-        # This is a simplified version - in practice, you'd want more sophisticated
-        # task decomposition logic based on task type, complexity, etc.
-        return [
-            {
-                "type": "research",
-                "description": f"Research information for {task.get('description', '')}"
-            },
-            {
-                "type": "planning",
-                "description": f"Create execution plan for {task.get('description', '')}"
-            },
-            {
-                "type": "implementation",
-                "description": f"Implement solution for {task.get('description', '')}"
-            },
-            {
-                "type": "qa",
-                "description": f"Validate results for {task.get('description', '')}"
-            }
-        ]
+        subtasks: List[Dict[str, Any]] = []
+        used = set()
+        previous: Optional[str] = None
+        for task_type in PIPELINE:
+            try:
+                agent_name = self._select_agent_for_task({"type": task_type})
+            except ValueError:
+                continue
+            subtasks.append({
+                "id": task_type,
+                "type": task_type,
+                "description": descriptions[task_type],
+                "agent": agent_name,
+                "depends_on": [previous] if previous else []
+            })
+            used.add(agent_name)
+            previous = task_type
+            
+        for agent in self.agents:
+            if agent.state.name not in used:
+                subtasks.append({
+                    "id": agent.state.name,
+                    "type": agent.agent_type,
+                    "description": f"{agent.state.name} for {description}",
+                    "agent": agent.state.name,
+                    "depends_on": []
+                })
+        return subtasks
         
     def _select_agent_for_task(self, task: Dict[str, Any]) -> str:
         """Select the most appropriate agent for a task"""
         # Simple mapping of task types to agent names
         task_to_agent = {
-            "research": "ResearchAgent",
-            "planning": "PlanningAgent",
-            "implementation": "ImplementationAgent",
-            "qa": "QAAgent"
+            task_type: AGENT_CONFIG[task_type]["name"]
+            for task_type in PIPELINE
         }
         
         task_type = task.get("type")
@@ -106,17 +506,56 @@ class TaskManagerAgent(BaseAgent):
             raise ValueError(f"No agent available for task type: {task_type}")
             
         agent_name = task_to_agent[task_type]
-        if agent_name not in self.agent_pool: # type: ignore [reportUnknownMemberType]
-            raise ValueError(f"Required agent {agent_name} not found in pool")
+        if agent_name in self.agent_pool:
+            return agent_name
             
-        return agent_name
+        # Fall back to any registered agent of the right type
+        for name, agent in self.agent_pool.items():
+            if agent.agent_type == task_type:
+                return name
+                
+        raise ValueError(f"Required agent {agent_name} not found in pool")
         
-    def _combine_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Combine results from multiple subtasks"""
-        # This is a simplified version - in practice, you'd want more sophisticated
-        # result combination logic based on task type, dependencies, etc.
-        return {
-            "status": "completed",
-            "subtask_results": results,
-            "summary": "Combined results from all subtasks"
-        } 
\ No newline at end of file
+    def _combine_results(self, nodes: List[DAGNode]) -> Dict[str, Any]:
+        """Combine results from all subtasks, with per-subtask and per-agent status"""
+        completed = [node for node in nodes if node.status == COMPLETED]
+        combined_results = self._collect_results([node.result for node in completed])
+        
+        # Outputs of stages beyond research and planning
+        outputs = {
+            node.id: node.result for node in completed
+            if node.subtask["type"] not in ("research", "planning")
+        }
+        if outputs:
+            combined_results["outputs"] = outputs
+            
+        combined_results["subtask_results"] = []
+        combined_results["agent_status"] = {}
+        for node in nodes:
+            subtask_result = {
+                "id": node.id,
+                "type": node.subtask["type"],
+                "agent": node.subtask["agent"],
+                "description": node.subtask["description"],
+                "depends_on": node.depends_on,
+                "status": node.status,
+                "elapsed": round(node.elapsed, 3) if node.elapsed is not None else None
+            }
+            agent_status: Dict[str, Any] = {"status": node.status}
+            if node.error:
+                subtask_result["error"] = node.error
+                agent_status["error"] = node.error
+            agent_status["elapsed"] = subtask_result["elapsed"]
+            combined_results["subtask_results"].append(subtask_result)
+            combined_results["agent_status"][node.subtask["agent"]] = agent_status
+            
+        if not completed:
+            combined_results["status"] = "error"
+            combined_results["message"] = "; ".join(
+                f"{node.subtask['agent']}: {node.error or node.status}" for node in nodes
+            ) or "No agents registered"
+        elif len(completed) < len(nodes):
+            combined_results["status"] = "partial"
+            
+        combined_results["summary"] = f"Combined results from {len(completed)}/{len(nodes)} subtasks"
+        return combined_results
@@ -0,0 +1,3 @@
+"""
+LLM call infrastructure shared by all agents.
+"""
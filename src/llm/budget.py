@@ -0,0 +1,186 @@
+import asyncio
+import re
+import threading
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from config.settings import BUDGET_CONFIG
+from ..utils.tracing import current_span
+from .rate_limiter import estimate_tokens
+
+# Truncation strategies: keep the start, the end, or both ends of an oversized input
+TRUNCATIONS = ("head", "tail", "head-tail")
+OVERFLOWS = ("truncate", "summarize")
+
+TRUNCATION_MARKER = "\n[... {tokens} tokens omitted ...]\n"
+
+def dedup_lines(text: str) -> str:
+    """Drop repeated non-empty lines and collapse runs of blank lines"""
+    seen = set()
+    lines: List[str] = []
+    for line in text.split("\n"):
+        key = " ".join(line.split()).lower()
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        elif lines and not lines[-1].strip():
+            continue
+        lines.append(line.rstrip())
+    return "\n".join(lines).strip("\n")
+
+def truncate(text: str, max_tokens: int, strategy: str = "head-tail") -> str:
+    """Cut text down to about ``max_tokens``, on line boundaries where possible"""
+    if strategy not in TRUNCATIONS:
+        raise ValueError(f"Unknown truncation strategy: {strategy}")
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    max_chars = max_tokens * 4
+    omitted = TRUNCATION_MARKER.format(tokens=estimate_tokens(text) - max_tokens)
+    if strategy == "head":
+        head = text[:max_chars]
+        return head[:head.rfind("\n")] if "\n" in head else head
+    if strategy == "tail":
+        tail = text[-max_chars:]
+        return tail[tail.find("\n") + 1:] if "\n" in tail else tail
+
+    # Keep two thirds from the start (context) and a third from the end (conclusions)
+    head = text[:max_chars * 2 // 3]
+    tail = text[-(max_chars // 3):]
+    head = head[:head.rfind("\n")] if "\n" in head else head
+    tail = tail[tail.find("\n") + 1:] if "\n" in tail else tail
+    return head + omitted + tail
+
+class PromptBudget:
+    """Per-stage token budgets for the variable parts of agent prompts
+
+    ``fit`` deduplicates an input and, if it still exceeds its stage budget,
+    truncates it. ``fit_async`` can instead run a summarize-first pass that
+    condenses the input with the model before it is used. Token counts
+    before and after are recorded per stage.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        truncation: str = "head-tail",
+        overflow: str = "truncate",
+        dedup: bool = True
+    ):
+        if truncation not in TRUNCATIONS:
+            raise ValueError(f"Unknown truncation strategy: {truncation}")
+        if overflow not in OVERFLOWS:
+            raise ValueError(f"Unknown overflow strategy: {overflow}")
+        self.budgets = dict(budgets or {})
+        self.truncation = truncation
+        self.overflow = overflow
+        self.dedup = dedup
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def budget_for(self, stage: str) -> Optional[int]:
+        """Token budget for a stage (None for unlimited)"""
+        return self.budgets.get(stage)
+
+    def fit(self, stage: str, text: str) -> str:
+        """Deduplicate and truncate an input to its stage budget"""
+        compacted = dedup_lines(text) if self.dedup else text
+        budget = self.budget_for(stage)
+        if budget is not None:
+            compacted = truncate(compacted, budget, self.truncation)
+        self._record(stage, text, compacted)
+        return compacted
+
+    async def fit_async(
+        self,
+        stage: str,
+        text: str,
+        summarize: Optional[Callable[[str], Awaitable[str]]] = None
+    ) -> str:
+        """Like ``fit``, but with ``overflow="summarize"`` condenses oversized input first
+
+        ``summarize`` is called once per budget-sized chunk of the input, and
+        the joined summaries are truncated if they are still over budget.
+        """
+        budget = self.budget_for(stage)
+        compacted = dedup_lines(text) if self.dedup else text
+        if (self.overflow == "summarize" and summarize is not None and budget is not None
+                and estimate_tokens(compacted) > budget):
+            summaries = await asyncio.gather(*(summarize(chunk) for chunk in split_by_tokens(compacted, budget)))
+            compacted = "\n".join(summaries)
+            self._count(stage, "summarized")
+        if budget is not None:
+            compacted = truncate(compacted, budget, self.truncation)
+        self._record(stage, text, compacted)
+        return compacted
+
+    def _count(self, stage: str, key: str, amount: int = 1) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(stage, {
+                "calls": 0, "input_tokens": 0, "output_tokens": 0,
+                "saved_tokens": 0, "compacted": 0, "summarized": 0
+            })
+            stats[key] += amount
+
+    def _record(self, stage: str, original: str, compacted: str) -> None:
+        """Account the tokens a stage saved, here and on the current trace span"""
+        before, after = estimate_tokens(original), estimate_tokens(compacted)
+        saved = max(before - after, 0)
+        self._count(stage, "calls")
+        self._count(stage, "input_tokens", before)
+        self._count(stage, "output_tokens", after)
+        self._count(stage, "saved_tokens", saved)
+        if compacted != original:
+            self._count(stage, "compacted")
+
+        span = current_span()
+        if span is not None and saved:
+            span.add("prompt_tokens_saved", saved)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-stage token counts and savings"""
+        with self._lock:
+            stages = {stage: dict(stats) for stage, stats in self._stats.items()}
+        return {
+            "stages": stages,
+            "saved_tokens": sum(stats["saved_tokens"] for stats in stages.values())
+        }
+
+def split_by_tokens(text: str, max_tokens: int) -> List[str]:
+    """Split text into pieces of at most ``max_tokens`` on paragraph or line boundaries"""
+    max_chars = max(max_tokens, 1) * 4
+    pieces: List[str] = []
+    current = ""
+    for block in re.split(r"(\n\n|\n)", text):
+        while len(block) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(block[:max_chars])
+            block = block[max_chars:]
+        if len(current) + len(block) > max_chars:
+            pieces.append(current)
+            current = ""
+        current += block
+    if current.strip() or not pieces:
+        pieces.append(current)
+    return [piece.strip("\n") for piece in pieces if piece.strip()] or [text]
+
+_default_budget: Optional[PromptBudget] = None
+
+def get_default_budget() -> PromptBudget:
+    """Get the process-wide prompt budget built from BUDGET_CONFIG"""
+    global _default_budget
+    if _default_budget is None:
+        _default_budget = PromptBudget(
+            budgets=BUDGET_CONFIG["stages"],
+            truncation=BUDGET_CONFIG["truncation"],
+            overflow=BUDGET_CONFIG["overflow"],
+            dedup=BUDGET_CONFIG["dedup"]
+        )
+    return _default_budget
+
+def set_default_budget(budget: PromptBudget) -> None:
+    """Replace the process-wide prompt budget"""
+    global _default_budget
+    _default_budget = budget
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from config.settings import CACHE_CONFIG
+
+def make_cache_key(model: str, temperature: float, prompt: str) -> str:
+    """Build a stable cache key from model name, temperature and prompt text"""
+    payload = json.dumps([model, temperature, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """Two-tier LLM response cache: in-process LRU backed by an SQLite store"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600,
+        db_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+
+        # key -> (text, expires_at, latency)
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "saved_seconds": 0.0
+        }
+
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str) -> None:
+        """Open (and create if needed) the on-disk tier"""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                text TEXT NOT NULL,
+                expires_at REAL,
+                latency REAL NOT NULL DEFAULT 0
+            )"""
+        )
+        self._db.commit()
+
+    def get(self, model: str, temperature: float, prompt: str) -> Optional[str]:
+        """Return the cached completion for a prompt, or None on a miss"""
+        key = make_cache_key(model, temperature, prompt)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                text, expires_at, latency = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    self._stats["saved_seconds"] += latency
+                    return text
+                del self._entries[key]
+                self._stats["expirations"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT text, expires_at, latency FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    text, expires_at, latency = row
+                    if expires_at is None or expires_at > now:
+                        # Promote to the in-process tier
+                        self._store_memory(key, text, expires_at, latency)
+                        self._stats["disk_hits"] += 1
+                        self._stats["saved_seconds"] += latency
+                        return text
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._stats["expirations"] += 1
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, model: str, temperature: float, prompt: str, text: str, latency: float = 0.0) -> None:
+        """Store a completion in both tiers"""
+        key = make_cache_key(model, temperature, prompt)
+        expires_at = time.time() + self.ttl if self.ttl else None
+
+        with self._lock:
+            self._store_memory(key, text, expires_at, latency)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, text, expires_at, latency) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, model, text, expires_at, latency)
+                )
+                self._db.commit()
+
+    def _store_memory(self, key: str, text: str, expires_at: Optional[float], latency: float) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries"""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (text, expires_at, latency)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the on-disk tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the latency saved by cache hits"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self._entries)
+            return stats
+
+_UNSET: Any = object()
+_default_cache: Any = _UNSET
+
+def get_default_cache() -> Optional[LLMCache]:
+    """Get the process-wide cache shared by all agents (None when disabled)"""
+    global _default_cache
+    if _default_cache is _UNSET:
+        _default_cache = LLMCache(
+            max_entries=CACHE_CONFIG["max_entries"],
+            ttl=CACHE_CONFIG["ttl"],
+            db_path=CACHE_CONFIG["db_path"]
+        ) if CACHE_CONFIG["enabled"] else None
+    return _default_cache
+
+def set_default_cache(cache: Optional[LLMCache]) -> None:
+    """Replace the process-wide cache (e.g. with a custom backend or None)"""
+    global _default_cache
+    _default_cache = cache
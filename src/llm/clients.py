@@ -0,0 +1,251 @@
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from config.settings import GOOGLE_CONFIG, CLIENT_CONFIG
+
+# (model, temperature, api_key)
+ClientKey = Tuple[str, float, Optional[str]]
+ClientFactory = Callable[[str, float, Optional[str], List[Tuple[str, Any]]], Any]
+
+GEMINI_ENDPOINT = "generativelanguage.googleapis.com"
+
+def channel_options(keepalive_seconds: float, keepalive_timeout_seconds: float) -> List[Tuple[str, Any]]:
+    """gRPC channel options that keep idle connections open between calls"""
+    return [
+        ("grpc.keepalive_time_ms", int(keepalive_seconds * 1000)),
+        ("grpc.keepalive_timeout_ms", int(keepalive_timeout_seconds * 1000)),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1)
+    ]
+
+_pooled_model_class: Any = None
+
+def _pooled_chat_model_class() -> Any:
+    """Build the pooled Gemini chat model class (LangChain is imported on first use)"""
+    global _pooled_model_class
+    if _pooled_model_class is not None:
+        return _pooled_model_class
+
+    from langchain_google_genai import ChatGoogleGenerativeAI # type: ignore [import-untyped]
+    from pydantic import Field, PrivateAttr
+
+    class PooledChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+        """Gemini chat model whose async gRPC channel uses keep-alive options
+
+        The stock model builds its async client once and keeps it even after
+        the event loop that owns the channel has closed; this one rebuilds it
+        when it is used from a different loop.
+        """
+
+        channel_options: List[Tuple[str, Any]] = Field(default_factory=list, exclude=True)
+        _client_loop: Any = PrivateAttr(default=None)
+
+        @property
+        def async_client(self) -> Any:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return self.async_client_running
+            if self.async_client_running is None or self._client_loop is not loop:
+                self.async_client_running = self._build_async_client()
+                self._client_loop = loop
+            return self.async_client_running
+
+        def _build_async_client(self) -> Any:
+            """Create the async GAPIC client on a channel with the pool's options"""
+            from google.api_core import client_options as client_options_lib # type: ignore
+            from google.ai.generativelanguage_v1beta import GenerativeServiceAsyncClient # type: ignore
+            from google.ai.generativelanguage_v1beta.services.generative_service.transports.grpc_asyncio import ( # type: ignore
+                GenerativeServiceGrpcAsyncIOTransport
+            )
+
+            options = dict(self.channel_options)
+
+            def create_channel(host: str, **kwargs: Any) -> Any:
+                kwargs["options"] = list({**dict(kwargs.get("options") or []), **options}.items())
+                return GenerativeServiceGrpcAsyncIOTransport.create_channel(host, **kwargs)
+
+            def transport(**kwargs: Any) -> Any:
+                return GenerativeServiceGrpcAsyncIOTransport(channel=create_channel, **kwargs)
+
+            client_options: Dict[str, Any] = {"api_endpoint": GEMINI_ENDPOINT, **(self.client_options or {})}
+            if self.google_api_key is not None and not self.credentials:
+                client_options["api_key"] = self.google_api_key.get_secret_value()
+            return GenerativeServiceAsyncClient(
+                credentials=self.credentials,
+                transport=transport,
+                client_options=client_options_lib.ClientOptions(**client_options)
+            )
+
+        async def warm_up(self, timeout: float) -> None:
+            """Open the connection (DNS, TCP and TLS) before the first real call"""
+            channel = self.async_client.transport.grpc_channel
+            await asyncio.wait_for(channel.channel_ready(), timeout=timeout)
+
+        async def aclose(self) -> None:
+            """Close the async channel"""
+            if self.async_client_running is not None:
+                await self.async_client_running.transport.close()
+                self.async_client_running = None
+                self._client_loop = None
+
+    _pooled_model_class = PooledChatGoogleGenerativeAI
+    return _pooled_model_class
+
+def build_gemini_client(
+    model: str,
+    temperature: float,
+    api_key: Optional[str],
+    options: List[Tuple[str, Any]]
+) -> Any:
+    """Default client factory: a Gemini chat model on a keep-alive channel"""
+    return _pooled_chat_model_class()(
+        model=model,
+        google_api_key=api_key,
+        temperature=temperature,
+        channel_options=options
+    )
+
+class ClientRegistry:
+    """Chat-model clients shared by all agents, keyed by (model, temperature, api_key)
+
+    Each key owns a pool of up to ``pool_size`` clients, each with its own
+    keep-alive connection; agents asking for the same key are handed the
+    pooled clients round-robin instead of opening connections of their own.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 2,
+        keepalive_seconds: float = 30,
+        keepalive_timeout_seconds: float = 10,
+        factory: Optional[ClientFactory] = None
+    ):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.pool_size = pool_size
+        self.channel_options = channel_options(keepalive_seconds, keepalive_timeout_seconds)
+        self._factory = factory or build_gemini_client
+        self._pools: Dict[ClientKey, List[Any]] = {}
+        self._next: Dict[ClientKey, int] = {}
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "warmed": 0,
+            "warmup_failures": 0,
+            "closed": 0
+        }
+
+    def _key(self, model: Optional[str], temperature: Optional[float], api_key: Optional[str]) -> ClientKey:
+        """Fill in GOOGLE_CONFIG defaults for anything not given"""
+        return (
+            model or GOOGLE_CONFIG["model_name"],
+            float(GOOGLE_CONFIG["temperature"] if temperature is None else temperature),
+            api_key if api_key is not None else GOOGLE_CONFIG["api_key"]
+        )
+
+    def get(
+        self,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        api_key: Optional[str] = None
+    ) -> Any:
+        """Get a pooled client for a (model, temperature, api_key) combination"""
+        key = self._key(model, temperature, api_key)
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            index = self._next.get(key, 0)
+            self._next[key] = (index + 1) % self.pool_size
+            if index < len(pool):
+                self._stats["reused"] += 1
+                return pool[index]
+
+            client = self._factory(key[0], key[1], key[2], self.channel_options)
+            pool.append(client)
+            self._stats["created"] += 1
+            return client
+
+    async def warm_up(
+        self,
+        keys: Optional[List[Tuple[Optional[str], Optional[float], Optional[str]]]] = None,
+        timeout: float = 10
+    ) -> Dict[str, Any]:
+        """Fill the pools for the given keys and open their connections
+
+        Defaults to the GOOGLE_CONFIG client. Failures are counted rather than
+        raised, so an unreachable endpoint does not stop startup; the first
+        real call then connects (and fails) as it would without warm-up.
+        """
+        pools = []
+        for model, temperature, api_key in keys or [(None, None, None)]:
+            key = self._key(model, temperature, api_key)
+            while len(self._pools.get(key, [])) < self.pool_size:
+                self.get(*key)
+            pools.append(self._pools[key])
+
+        clients = [client for pool in pools for client in pool]
+        results = await asyncio.gather(
+            *(self._warm_up_client(client, timeout) for client in clients),
+            return_exceptions=True
+        )
+        errors = [str(result) or result.__class__.__name__ for result in results if isinstance(result, BaseException)]
+        self._stats["warmed"] += len(results) - len(errors)
+        self._stats["warmup_failures"] += len(errors)
+        return {"clients": len(clients), "ready": len(results) - len(errors), "errors": errors}
+
+    async def _warm_up_client(self, client: Any, timeout: float) -> None:
+        """Warm up one client, if it supports it"""
+        warm_up = getattr(client, "warm_up", None)
+        if warm_up is not None:
+            await warm_up(timeout)
+
+    async def close(self) -> None:
+        """Close every pooled client and empty the registry"""
+        with self._lock:
+            clients = [client for pool in self._pools.values() for client in pool]
+            self._pools.clear()
+            self._next.clear()
+
+        for client in clients:
+            aclose = getattr(client, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            self._stats["closed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics"""
+        stats: Dict[str, Any] = dict(self._stats)
+        with self._lock:
+            stats["keys"] = len(self._pools)
+            stats["clients"] = sum(len(pool) for pool in self._pools.values())
+        return stats
+
+_default_registry: Optional[ClientRegistry] = None
+
+def get_default_registry() -> ClientRegistry:
+    """Get the process-wide client registry shared by all agents"""
+    global _default_registry
+    if _default_registry is None:
+        factory = None
+        if CLIENT_CONFIG["backend"] == "fake":
+            from .fake import make_fake_factory
+            factory = make_fake_factory()
+        elif CLIENT_CONFIG["backend"] != "gemini":
+            raise ValueError(f"Unknown LLM backend: {CLIENT_CONFIG['backend']}")
+        _default_registry = ClientRegistry(
+            pool_size=CLIENT_CONFIG["pool_size"],
+            keepalive_seconds=CLIENT_CONFIG["keepalive_seconds"],
+            keepalive_timeout_seconds=CLIENT_CONFIG["keepalive_timeout_seconds"],
+            factory=factory
+        )
+    return _default_registry
+
+def set_default_registry(registry: ClientRegistry) -> None:
+    """Replace the process-wide client registry"""
+    global _default_registry
+    _default_registry = registry
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import random
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+
+from config.settings import FAKE_LLM_CONFIG
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+# Vocabulary the fake responses are assembled from
+WORDS = (
+    "api", "latency", "throughput", "model", "data", "pipeline", "cache", "service", "request",
+    "schema", "deployment", "monitoring", "cost", "scaling", "accuracy", "dataset", "training",
+    "evaluation", "security", "integration", "provider", "quota", "feature", "baseline", "risk"
+)
+
+class FakeLLMError(Exception):
+    """Injected provider error; ``status_code`` is what ``classify_error`` inspects"""
+
+    STATUS_CODES = {"throttled": 429, "server": 503, "fatal": 400}
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.status_code = self.STATUS_CODES[kind]
+        super().__init__(f"Fake LLM {kind} error ({self.status_code})")
+
+def fake_response(prompt: str, tokens: int) -> str:
+    """Deterministic markdown response of roughly ``tokens`` tokens for a prompt
+
+    The layout (``## Findings``/``## Key Insights`` and numbered sections)
+    matches what the research and planning prompts ask for, so the agents'
+    parsers take the same paths as with a real model.
+    """
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    headings = ("## Findings", "1. Overview", "2. Details", "## Key Insights", "3. Recommendations")
+    # About ten words (~80 characters) per bullet line
+    bullets = max(max(tokens, 1) * 4 // (80 * len(headings)), 1)
+    words = rng.choices(WORDS, k=bullets * len(headings) * 10)
+    lines: List[str] = []
+    for i, heading in enumerate(headings):
+        lines.append(heading)
+        for j in range(bullets):
+            start = (i * bullets + j) * 10
+            lines.append("- " + " ".join(words[start:start + 10]))
+    return "\n".join(lines)
+
+class FakeChatModel:
+    """Offline stand-in for the Gemini chat model
+
+    Responses are deterministic per prompt. Latency (time to first token) is
+    drawn from a configurable distribution, output is paced at
+    ``tokens_per_second`` when set, and a fraction ``error_rate`` of calls
+    fails with a ``FakeLLMError`` of ``error_kind``.
+    """
+
+    def __init__(
+        self,
+        model: str = "fake-model",
+        temperature: float = 0.7,
+        latency: str = "fixed",
+        latency_mean: float = 0.05,
+        latency_sigma: float = 0.5,
+        tokens_per_second: Optional[float] = None,
+        response_tokens: int = 200,
+        error_rate: float = 0.0,
+        error_kind: str = "throttled",
+        seed: int = 0
+    ):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        if error_kind not in FakeLLMError.STATUS_CODES:
+            raise ValueError(f"Unknown error kind: {error_kind}")
+        self.model = model
+        self.temperature = temperature
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self._rng = random.Random(seed)
+
+        self._stats = {
+            "calls": 0,
+            "prompts": 0,
+            "errors": 0,
+            "output_tokens": 0
+        }
+
+    def sample_latency(self) -> float:
+        """Draw a time-to-first-token from the configured distribution"""
+        mean = self.latency_mean
+        if mean <= 0:
+            return 0.0
+        if self.latency == "uniform":
+            return self._rng.uniform(0, 2 * mean)
+        if self.latency == "exponential":
+            return self._rng.expovariate(1 / mean)
+        if self.latency == "lognormal":
+            # Parameterised so the median equals latency_mean
+            return self._rng.lognormvariate(0, self.latency_sigma) * mean
+        return mean
+
+    def _generation_time(self, text: str) -> float:
+        """Time to emit a response at the configured token rate"""
+        if not self.tokens_per_second:
+            return 0.0
+        return (len(text) // 4) / self.tokens_per_second
+
+    def _maybe_fail(self) -> None:
+        """Raise an injected error for a fraction of calls"""
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self._stats["errors"] += 1
+            raise FakeLLMError(self.error_kind)
+
+    def _respond(self, messages: List[Any]) -> str:
+        """Build the response to a conversation (only the last message is read)"""
+        text = fake_response(messages[-1].content, self.response_tokens)
+        self._stats["output_tokens"] += len(text) // 4
+        return text
+
+    async def agenerate(self, message_batches: List[List[Any]]) -> Any:
+        """Batched generation, shaped like LangChain's ``LLMResult``"""
+        self._stats["calls"] += 1
+        self._stats["prompts"] += len(message_batches)
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+
+        texts = [self._respond(messages) for messages in message_batches]
+        # A batch is generated in parallel, so it takes as long as its longest response
+        await asyncio.sleep(max((self._generation_time(text) for text in texts), default=0.0))
+        return SimpleNamespace(generations=[[SimpleNamespace(text=text)] for text in texts])
+
+    async def astream(self, messages: List[Any], chunk_tokens: int = 8) -> AsyncIterator[Any]:
+        """Stream the response in chunks of about ``chunk_tokens`` tokens"""
+        self._stats["calls"] += 1
+        self._stats["prompts"] += 1
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+
+        text = self._respond(messages)
+        step = chunk_tokens * 4
+        for i in range(0, len(text), step):
+            chunk = text[i:i + step]
+            await asyncio.sleep(self._generation_time(chunk))
+            yield SimpleNamespace(content=chunk)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call statistics"""
+        return dict(self._stats)
+
+def make_fake_factory(**overrides: Any) -> Any:
+    """Client factory for ``ClientRegistry`` that builds fake models
+
+    Settings come from FAKE_LLM_CONFIG, with keyword overrides.
+    """
+    settings = {**FAKE_LLM_CONFIG, **overrides}
+
+    def factory(model: str, temperature: float, api_key: Optional[str], options: List[Tuple[str, Any]]) -> FakeChatModel:
+        return FakeChatModel(model=model, temperature=temperature, **settings)
+
+    return factory
@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Awaitable, Callable, Deque, List, Optional, Tuple, TypeVar
+
+from config.settings import HEDGING_CONFIG
+from ..utils.tracing import current_span
+
+T = TypeVar("T")
+
+def _percentile(sorted_samples: List[Tuple[float, bool]], fraction: float) -> float:
+    """Percentile of sorted, non-empty ``(latency, censored)`` samples
+    
+    A censored sample is a lower bound: a request cancelled after that long.
+    It leaves the at-risk count without counting as an answer (Kaplan-Meier),
+    so the requests hedging cut short still push the percentile up. When
+    the percentile lies beyond every exact sample, the largest bound is used.
+    """
+    at_risk = len(sorted_samples)
+    remaining = 1.0
+    for latency, censored in sorted_samples:
+        if not censored:
+            remaining *= 1 - 1 / at_risk
+            if 1 - remaining >= fraction - 1e-9:
+                return latency
+        at_risk -= 1
+    return sorted_samples[-1][0]
+
+class Hedger:
+    """Fires a backup request for LLM calls that run past a latency percentile
+
+    Latency is tracked per key (``model/stage``) over the last ``window``
+    calls. Once a key has ``min_samples``, a call that has not answered
+    after the ``percentile`` latency (at least ``min_delay``) gets a
+    duplicate request; the first successful response wins and the other
+    request is cancelled. A failure only counts once both requests fail.
+    The window records the first request's latency; when the backup wins,
+    the time until it was cancelled is kept as a censored sample, so hedging
+    does not drag the percentile (and with it the hedge delay) down.
+
+    Hedges are paid from a budget: each call earns ``budget`` credits (up
+    to ``burst``) and a hedge spends one, so at most about ``budget`` of
+    calls are duplicated however slow the backend gets. When the caller's
+    ``ready`` check says a backup could not start right away (the rate
+    limiter is saturated), no hedge is sent and no credit is spent: a
+    backup queued behind its own primary could never answer first.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        budget: float = 0.05,
+        burst: float = 10.0,
+        enabled: bool = True
+    ):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.budget = budget
+        self.burst = burst
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[Tuple[float, bool]]] = {}
+        self._keys: Dict[str, Dict[str, int]] = {}
+        self._credits = 0.0
+
+    def delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging a call on ``key`` (None: not enough history yet)"""
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            return max(self.min_delay, _percentile(sorted(latencies), self.percentile))
+
+    def observe(self, key: str, latency: float, censored: bool = False) -> None:
+        """Record the latency of a finished call (``censored``: cancelled after ``latency``, unanswered)"""
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None:
+                latencies = self._latencies[key] = deque(maxlen=self.window)
+            latencies.append((latency, censored))
+
+    def _count(self, key: str, counter: str) -> None:
+        stats = self._keys.setdefault(key, {"calls": 0, "hedged": 0, "won": 0, "denied": 0, "saturated": 0})
+        stats[counter] += 1
+
+    def _admit(self, key: str) -> None:
+        """Count a call and earn its budget credit"""
+        with self._lock:
+            self._count(key, "calls")
+            self._credits = min(self.burst, self._credits + self.budget)
+
+    def _spend(self, key: str, ready: Optional[Callable[[], bool]] = None) -> bool:
+        """Take one credit for a hedge, if the budget allows and a backup could start now"""
+        if ready is not None and not ready():
+            with self._lock:
+                self._count(key, "saturated")
+            return False
+        with self._lock:
+            if self._credits < 1:
+                self._count(key, "denied")
+                return False
+            self._credits -= 1
+            self._count(key, "hedged")
+            return True
+
+    async def run(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[T]],
+        backup: Optional[Callable[[], Awaitable[T]]] = None,
+        ready: Optional[Callable[[], bool]] = None
+    ) -> T:
+        """Run ``call``, firing ``backup`` (default: ``call`` again) if it is slower than the key's hedge delay
+
+        ``ready`` reports whether a backup could start right away; without
+        it the backup is always assumed to.
+        """
+        if not self.enabled:
+            return await call()
+        self._admit(key)
+        delay = self.delay(key)
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(call())
+        if delay is None:
+            result = await primary
+            self.observe(key, time.perf_counter() - start)
+            return result
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or not self._spend(key, ready):
+            result = await primary
+            self.observe(key, time.perf_counter() - start)
+            return result
+
+        span = current_span()
+        second = asyncio.ensure_future((backup or call)())
+        pending = {primary, second}
+        winner: Optional["asyncio.Future[T]"] = None
+        primary_latency: Optional[float] = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if primary in done:
+                    primary_latency = time.perf_counter() - start
+                # Checking every finished attempt also marks a loser's error as retrieved
+                succeeded = [attempt for attempt in done if attempt.exception() is None]
+                winner = succeeded[0] if succeeded else None
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if primary_latency is None:
+            # The first request was cancelled: it would have taken at least this long
+            self.observe(key, time.perf_counter() - start, censored=True)
+        elif not primary.cancelled() and primary.exception() is None:
+            self.observe(key, primary_latency)
+        if winner is None:
+            # Both failed: surface the original request's error
+            raise primary.exception() # type: ignore [misc]
+        with self._lock:
+            if winner is second:
+                self._count(key, "won")
+        if span is not None:
+            span.set(hedged=True, hedge_won=winner is second, hedge_delay=delay)
+        return winner.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedge rate, backup win rate and latency percentiles per key"""
+        with self._lock:
+            keys = {}
+            for key, stats in self._keys.items():
+                latencies = sorted(self._latencies.get(key, ()))
+                keys[key] = {
+                    **stats,
+                    "hedge_rate": stats["hedged"] / stats["calls"] if stats["calls"] else 0.0,
+                    "p50": _percentile(latencies, 0.50) if latencies else 0.0,
+                    "p99": _percentile(latencies, 0.99) if latencies else 0.0,
+                    "delay": max(self.min_delay, _percentile(latencies, self.percentile))
+                    if len(latencies) >= self.min_samples else None
+                }
+            calls = sum(stats["calls"] for stats in keys.values())
+            hedged = sum(stats["hedged"] for stats in keys.values())
+            won = sum(stats["won"] for stats in keys.values())
+            return {
+                "enabled": self.enabled,
+                "calls": calls,
+                "hedged": hedged,
+                "hedge_rate": hedged / calls if calls else 0.0,
+                "win_rate": won / hedged if hedged else 0.0,
+                "denied": sum(stats["denied"] for stats in keys.values()),
+                "saturated": sum(stats["saturated"] for stats in keys.values()),
+                "credits": round(self._credits, 3),
+                "keys": keys
+            }
+
+_default_hedger: Optional[Hedger] = None
+
+def get_default_hedger() -> Hedger:
+    """Get the process-wide hedger built from HEDGING_CONFIG"""
+    global _default_hedger
+    if _default_hedger is None:
+        _default_hedger = Hedger(
+            percentile=HEDGING_CONFIG["percentile"],
+            window=HEDGING_CONFIG["window"],
+            min_samples=HEDGING_CONFIG["min_samples"],
+            min_delay=HEDGING_CONFIG["min_delay"],
+            budget=HEDGING_CONFIG["budget"],
+            burst=HEDGING_CONFIG["burst"],
+            enabled=HEDGING_CONFIG["enabled"]
+        )
+    return _default_hedger
+
+def set_default_hedger(hedger: Hedger) -> None:
+    """Replace the process-wide hedger"""
+    global _default_hedger
+    _default_hedger = hedger
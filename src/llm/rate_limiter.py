@@ -0,0 +1,264 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator, Awaitable, Callable, TypeVar
+
+from config.settings import RATE_LIMIT_CONFIG, SCHEDULER_CONFIG, SYSTEM_CONFIG
+from ..utils.tracing import current_span, record_queue_wait
+from .scheduler import PriorityScheduler, Schedule, current_schedule
+
+T = TypeVar("T")
+
+# Exception class names raised by the Google client libraries
+THROTTLE_ERRORS = {"ResourceExhausted", "TooManyRequests"}
+SERVER_ERRORS = {"InternalServerError", "ServiceUnavailable", "BadGateway", "GatewayTimeout", "DeadlineExceeded"}
+
+def classify_error(exc: BaseException) -> Optional[str]:
+    """Classify an LLM call failure as 'throttled', 'server' or 'timeout' (None if not retryable)"""
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+
+    name = exc.__class__.__name__
+    if name in THROTTLE_ERRORS:
+        return "throttled"
+    if name in SERVER_ERRORS:
+        return "server"
+
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        if code == 429:
+            return "throttled"
+        if 500 <= code < 600:
+            return "server"
+
+    message = str(exc)
+    if "429" in message or "RESOURCE_EXHAUSTED" in message:
+        return "throttled"
+    return None
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self, amount: float) -> bool:
+        """Whether ``amount`` tokens could be taken now (nothing is taken)"""
+        self._refill()
+        return self._tokens >= min(amount, self.capacity)
+
+    def try_acquire(self, amount: float) -> float:
+        """Take ``amount`` tokens if available; otherwise return the seconds to wait"""
+        self._refill()
+        # Requests larger than the bucket are let through once it is full
+        amount = min(amount, self.capacity)
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return 0.0
+        return (amount - self._tokens) / self.rate
+
+class AdaptiveRateLimiter:
+    """Process-wide limiter for LLM calls
+
+    Combines request and token buckets (per minute) with an AIMD concurrency
+    limit: the limit grows additively while calls succeed and is cut
+    multiplicatively when the provider answers 429 or 5xx. Failed calls are
+    retried with jittered exponential backoff. Calls waiting for a slot are
+    ordered by their task's priority and deadline (see ``PriorityScheduler``).
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 150,
+        tokens_per_minute: float = 2_000_000,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        max_retries: int = 3,
+        timeout: Optional[float] = 60,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        scheduling: bool = True,
+        aging: float = 30.0,
+        preempt: bool = True
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.concurrency_limit = float(max_concurrency)
+        # Without scheduling every call gets the same class: plain FIFO
+        self.scheduling = scheduling
+        self.scheduler = PriorityScheduler(
+            capacity=lambda: int(self.concurrency_limit), aging=aging, preempt=preempt
+        )
+        self._waiting = 0
+        self._waits: "deque[float]" = deque(maxlen=1024)
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "server_errors": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0
+        }
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0, requests: int = 1) -> AsyncIterator[None]:
+        """Wait for rate and concurrency capacity, then hold a concurrency slot"""
+        schedule = (current_schedule() if self.scheduling else None) or Schedule()
+        start = time.monotonic()
+        self._waiting += 1
+        try:
+            waiter = await self.scheduler.acquire(schedule)
+            try:
+                for bucket, amount in ((self.request_bucket, requests), (self.token_bucket, tokens)):
+                    while amount:
+                        delay = bucket.try_acquire(amount)
+                        if not delay:
+                            break
+                        # Nothing is sent yet, so more urgent calls may take the slot meanwhile
+                        if await self.scheduler.hold_preemptible(waiter, delay):
+                            await self.scheduler.requeue(waiter)
+            except BaseException:
+                self.scheduler.release(waiter)
+                raise
+        finally:
+            self._waiting -= 1
+
+        self._record_wait(time.monotonic() - start)
+        span = current_span()
+        if span is not None:
+            span.set(priority=schedule.priority)
+        try:
+            yield
+        finally:
+            self.scheduler.release(waiter)
+
+    def has_capacity(self, tokens: int = 0, requests: int = 1) -> bool:
+        """Whether a call could start now, without waiting for a slot or rate capacity"""
+        return (
+            not self.scheduler.waiting
+            and self.scheduler.in_flight < int(self.concurrency_limit)
+            and self.request_bucket.available(requests)
+            and self.token_bucket.available(tokens)
+        )
+
+    def _record_wait(self, waited: float) -> None:
+        record_queue_wait(waited)
+        self._waits.append(waited)
+        self._stats["queue_wait_total"] += waited
+        self._stats["queue_wait_max"] = max(self._stats["queue_wait_max"], waited)
+
+    def record_success(self) -> None:
+        """Additive increase of the concurrency limit"""
+        self.concurrency_limit = min(
+            float(self.max_concurrency),
+            self.concurrency_limit + self.increase / max(self.concurrency_limit, 1.0)
+        )
+
+    def record_failure(self, kind: Optional[str]) -> None:
+        """Multiplicative decrease of the concurrency limit on provider pushback"""
+        if kind == "throttled":
+            self._stats["throttled"] += 1
+        elif kind == "server":
+            self._stats["server_errors"] += 1
+        elif kind == "timeout":
+            self._stats["timeouts"] += 1
+
+        if kind in ("throttled", "server"):
+            self.concurrency_limit = max(
+                float(self.min_concurrency),
+                self.concurrency_limit * self.decrease_factor
+            )
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for a retry attempt (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def call(self, fn: Callable[[], Awaitable[T]], tokens: int = 0, requests: int = 1) -> T:
+        """Run an LLM call under the limiter, retrying throttling, 5xx and timeouts"""
+        for attempt in range(self.max_retries + 1):
+            async with self.slot(tokens=tokens, requests=requests):
+                self._stats["requests"] += 1
+                try:
+                    if self.timeout:
+                        result = await asyncio.wait_for(fn(), timeout=self.timeout)
+                    else:
+                        result = await fn()
+                    self.record_success()
+                    return result
+                except Exception as e:
+                    kind = classify_error(e)
+                    self.record_failure(kind)
+                    if kind is None or attempt >= self.max_retries:
+                        self._stats["failures"] += 1
+                        raise
+
+            # Back off outside the slot so other calls can proceed
+            self._stats["retries"] += 1
+            await asyncio.sleep(self.backoff_delay(attempt))
+
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get throughput and queue-wait metrics for sizing"""
+        stats = dict(self._stats)
+        waits = sorted(self._waits)
+        stats["queue_wait_avg"] = stats["queue_wait_total"] / len(waits) if waits else 0.0
+        stats["queue_wait_p95"] = waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+        stats["concurrency_limit"] = self.concurrency_limit
+        stats["in_flight"] = self.scheduler.in_flight
+        stats["waiting"] = self._waiting
+        stats["scheduling"] = self.scheduler.get_stats()["priorities"]
+        return stats
+
+_default_limiter: Optional[AdaptiveRateLimiter] = None
+
+def get_default_limiter() -> AdaptiveRateLimiter:
+    """Get the process-wide limiter shared by all agents"""
+    global _default_limiter
+    if _default_limiter is None:
+        _default_limiter = AdaptiveRateLimiter(
+            requests_per_minute=RATE_LIMIT_CONFIG["requests_per_minute"],
+            tokens_per_minute=RATE_LIMIT_CONFIG["tokens_per_minute"],
+            max_concurrency=RATE_LIMIT_CONFIG["max_concurrency"],
+            min_concurrency=RATE_LIMIT_CONFIG["min_concurrency"],
+            max_retries=SYSTEM_CONFIG["max_retries"],
+            timeout=SYSTEM_CONFIG["timeout"],
+            base_delay=RATE_LIMIT_CONFIG["backoff_base"],
+            max_delay=RATE_LIMIT_CONFIG["backoff_max"],
+            scheduling=SCHEDULER_CONFIG["enabled"],
+            aging=SCHEDULER_CONFIG["aging"],
+            preempt=SCHEDULER_CONFIG["preempt"]
+        )
+    return _default_limiter
+
+def set_default_limiter(limiter: AdaptiveRateLimiter) -> None:
+    """Replace the process-wide limiter"""
+    global _default_limiter
+    _default_limiter = limiter
@@ -0,0 +1,169 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+from config.settings import ROUTING_CONFIG
+from .scheduler import Schedule
+
+@dataclass(frozen=True)
+class Route:
+    """Model choice for one LLM call
+
+    ``model`` None means the agent's own model (the default tier).
+    ``escalate_to`` is the tier to retry on if the answer fails the cascade
+    quality check.
+    """
+    stage: str
+    tier: str
+    model: Optional[str]
+    escalate_to: Optional[str] = None
+
+class ModelRouter:
+    """Picks a model tier per LLM call from its stage, task priority and prompt size
+
+    Rules are tried in order and the first match wins; a rule matches when
+    each of its conditions (``stages``, ``priorities``,
+    ``max_prompt_tokens``) holds, and rules marked ``cascade_only`` apply
+    only with the cascade enabled. Calls matching no rule use the default
+    tier. With the cascade enabled, answers from a cheaper tier that fail
+    ``accept`` are retried on the default tier.
+    """
+
+    def __init__(
+        self,
+        tiers: Dict[str, Optional[str]],
+        default_tier: str = "strong",
+        rules: Optional[List[Dict[str, Any]]] = None,
+        cascade: bool = False,
+        min_tokens: int = 40,
+        refusals: Optional[List[str]] = None,
+        required: Optional[Dict[str, str]] = None,
+        prices: Optional[Dict[str, Dict[str, float]]] = None,
+        enabled: bool = True
+    ):
+        if default_tier not in tiers:
+            raise ValueError(f"Unknown default tier: {default_tier}")
+        for rule in rules or []:
+            if rule.get("tier") not in tiers:
+                raise ValueError(f"Unknown tier in routing rule: {rule}")
+        self.tiers = dict(tiers)
+        self.default_tier = default_tier
+        self.rules = list(rules or [])
+        self.cascade = cascade
+        self.min_tokens = min_tokens
+        self.refusal = re.compile("|".join(refusals), re.IGNORECASE) if refusals else None
+        self.required = {stage: re.compile(pattern, re.MULTILINE) for stage, pattern in (required or {}).items()}
+        self.prices = dict(prices or {})
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._baseline_cost = 0.0
+
+    def route(self, stage: str, prompt_tokens: int, schedule: Optional[Schedule] = None) -> Route:
+        """Choose the tier for a call"""
+        tier = self.default_tier
+        if self.enabled:
+            priority = (schedule or Schedule()).priority
+            for rule in self.rules:
+                if rule.get("cascade_only") and not self.cascade:
+                    continue
+                if "stages" in rule and stage not in rule["stages"]:
+                    continue
+                if "priorities" in rule and priority not in rule["priorities"]:
+                    continue
+                if "max_prompt_tokens" in rule and prompt_tokens > rule["max_prompt_tokens"]:
+                    continue
+                tier = rule["tier"]
+                break
+
+        escalate_to = self.default_tier if self.cascade and tier != self.default_tier else None
+        return Route(stage=stage, tier=tier, model=self.tiers[tier], escalate_to=escalate_to)
+
+    def escalate(self, route: Route) -> Route:
+        """The route to retry a rejected answer on"""
+        tier = route.escalate_to or self.default_tier
+        return Route(stage=route.stage, tier=tier, model=self.tiers[tier])
+
+    def accept(self, stage: str, text: str, completion_tokens: int) -> bool:
+        """Cheap quality check for cascade answers: long enough, not a refusal, expected layout"""
+        if completion_tokens < self.min_tokens:
+            return False
+        if self.refusal is not None and self.refusal.search(text[:200]):
+            return False
+        required = self.required.get(stage)
+        return required is None or required.search(text) is not None
+
+    def cost(self, tier: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimated cost of a call in USD (prices are per million tokens)"""
+        prices = self.prices.get(tier, {})
+        return (prompt_tokens * prices.get("input", 0.0) + completion_tokens * prices.get("output", 0.0)) / 1e6
+
+    def record(
+        self,
+        route: Route,
+        latency: float,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached: bool = False,
+        rejected: bool = False
+    ) -> None:
+        """Account one call (or cache hit) to its ``stage/tier`` route"""
+        cost = 0.0 if cached else self.cost(route.tier, prompt_tokens, completion_tokens)
+        with self._lock:
+            stats = self._routes.setdefault(f"{route.stage}/{route.tier}", {
+                "calls": 0, "cached": 0, "escalated": 0, "latency_total": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0
+            })
+            stats["calls"] += 1
+            stats["cached"] += cached
+            stats["escalated"] += rejected
+            stats["cost"] += cost
+            if not cached:
+                stats["latency_total"] += latency
+                stats["prompt_tokens"] += prompt_tokens
+                stats["completion_tokens"] += completion_tokens
+                # What the call would have cost on the default tier; an
+                # escalated answer is paid for again there, so it saves nothing
+                if not rejected:
+                    self._baseline_cost += self.cost(self.default_tier, prompt_tokens, completion_tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-route calls, latency, tokens and cost, and the savings versus the default tier"""
+        with self._lock:
+            routes = {}
+            for name, stats in self._routes.items():
+                uncached = stats["calls"] - stats["cached"]
+                routes[name] = {**stats, "latency_avg": stats["latency_total"] / uncached if uncached else 0.0}
+            cost = sum(stats["cost"] for stats in routes.values())
+            return {
+                "routes": routes,
+                "cost": cost,
+                "baseline_cost": self._baseline_cost,
+                "saved_cost": self._baseline_cost - cost,
+                "escalations": sum(stats["escalated"] for stats in routes.values())
+            }
+
+_default_router: Optional[ModelRouter] = None
+
+def get_default_router() -> ModelRouter:
+    """Get the process-wide router built from ROUTING_CONFIG"""
+    global _default_router
+    if _default_router is None:
+        _default_router = ModelRouter(
+            tiers=ROUTING_CONFIG["tiers"],
+            default_tier=ROUTING_CONFIG["default_tier"],
+            rules=ROUTING_CONFIG["rules"],
+            cascade=ROUTING_CONFIG["cascade"],
+            min_tokens=ROUTING_CONFIG["quality"]["min_tokens"],
+            refusals=ROUTING_CONFIG["quality"]["refusals"],
+            required=ROUTING_CONFIG["quality"]["required"],
+            prices=ROUTING_CONFIG["prices"],
+            enabled=ROUTING_CONFIG["enabled"]
+        )
+    return _default_router
+
+def set_default_router(router: ModelRouter) -> None:
+    """Replace the process-wide router"""
+    global _default_router
+    _default_router = router
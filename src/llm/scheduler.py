@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, date, time as dtime
+from typing import Dict, Any, List, Optional, Callable, Iterator, Iterable
+
+from config.settings import SCHEDULER_CONFIG
+
+# Task priorities, most urgent first; unknown values count as "medium"
+PRIORITIES = ("high", "medium", "low")
+
+@dataclass(frozen=True)
+class Schedule:
+    """Scheduling class of the LLM calls made for a task"""
+    priority: str = "medium"
+    deadline: Optional[float] = None  # epoch seconds
+
+    @property
+    def level(self) -> int:
+        return PRIORITIES.index(self.priority)
+
+def parse_deadline(value: Any) -> Optional[float]:
+    """Deadline as epoch seconds: a number, an ISO datetime, or an ISO date (end of that day)"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime.combine(value, dtime.max).timestamp()
+    if isinstance(value, str):
+        for parse in (date.fromisoformat, datetime.fromisoformat):
+            try:
+                return parse_deadline(parse(value.strip()))
+            except ValueError:
+                continue
+    return None
+
+def schedule_for(task: Dict[str, Any]) -> Schedule:
+    """Read a task's ``priority`` and ``deadline`` fields"""
+    priority = str(task.get("priority") or SCHEDULER_CONFIG["default_priority"]).lower()
+    if priority not in PRIORITIES:
+        priority = "medium"
+    return Schedule(priority=priority, deadline=parse_deadline(task.get("deadline")))
+
+def most_urgent(schedules: Iterable[Schedule]) -> Schedule:
+    """Highest priority and earliest deadline among several schedules (a batch's)"""
+    schedules = list(schedules)
+    if not schedules:
+        return Schedule()
+    deadlines = [schedule.deadline for schedule in schedules if schedule.deadline is not None]
+    return Schedule(
+        priority=PRIORITIES[min(schedule.level for schedule in schedules)],
+        deadline=min(deadlines) if deadlines else None
+    )
+
+_current_schedule: ContextVar[Optional[Schedule]] = ContextVar("current_llm_schedule", default=None)
+
+def current_schedule() -> Optional[Schedule]:
+    """Get the schedule of the task whose LLM calls the current coroutine makes"""
+    return _current_schedule.get()
+
+@contextmanager
+def use_schedule(schedule: Schedule) -> Iterator[Schedule]:
+    """Schedule LLM calls made inside the block with ``schedule``"""
+    token = _current_schedule.set(schedule)
+    try:
+        yield schedule
+    finally:
+        _current_schedule.reset(token)
+
+class _Waiter:
+    """A request for a slot; ``rank`` is fixed at enqueue time (see PriorityScheduler)"""
+
+    __slots__ = ("rank", "seq", "schedule", "enqueued_at", "future", "preempt", "preemptible", "cancelled")
+
+    def __init__(self, rank: float, seq: int, schedule: Schedule, enqueued_at: float):
+        self.rank = rank
+        self.seq = seq
+        self.schedule = schedule
+        self.enqueued_at = enqueued_at
+        self.future: Optional["asyncio.Future[None]"] = None
+        self.preempt: Optional[asyncio.Event] = None
+        self.preemptible = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.rank, self.seq) < (other.rank, other.seq)
+
+class PriorityScheduler:
+    """Orders waiters for LLM capacity by priority, aging and deadline
+
+    Each waiter gets a rank when it is enqueued:
+    ``enqueued_at + level * aging``, lowered to its deadline if that comes
+    first (but never below ``enqueued_at``, so overdue work ranks like fresh
+    high-priority work). Lower ranks run first. Because waiting time and
+    the priority gap are on the same clock, a "low" call waits at most
+    ``2 * aging`` seconds longer than "high" calls that arrived after it:
+    priorities age, and nothing starves. Between deadlines this is earliest
+    deadline first.
+
+    Holders that have a slot but have not sent their request yet (they wait
+    on rate buckets) can be preempted by a better-ranked arrival: they hand
+    their slot over and queue again with their original rank.
+    """
+
+    def __init__(self, capacity: Callable[[], int], aging: float = 30.0, preempt: bool = True):
+        self.capacity = capacity
+        self.aging = aging
+        self.preempt = preempt
+        self._heap: List[_Waiter] = []
+        self._holders: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._stats: Dict[str, Dict[str, Any]] = {
+            priority: {"calls": 0, "preempted": 0, "wait_total": 0.0, "wait_max": 0.0, "waits": deque(maxlen=1024)}
+            for priority in PRIORITIES
+        }
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._holders)
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for waiter in self._heap if not waiter.cancelled)
+
+    def _check_loop(self) -> None:
+        # Slots held on a previous event loop can never be released
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._heap = []
+            self._holders = []
+
+    def rank(self, schedule: Schedule, now: float) -> float:
+        """Rank of a call enqueued at ``now`` (epoch seconds); lower runs first"""
+        rank = now + schedule.level * self.aging
+        if schedule.deadline is not None:
+            rank = min(rank, max(schedule.deadline, now))
+        return rank
+
+    async def acquire(self, schedule: Schedule) -> _Waiter:
+        """Wait for a slot; pass the returned waiter to ``release``"""
+        self._check_loop()
+        now = time.time()
+        waiter = _Waiter(self.rank(schedule, now), next(self._seq), schedule, now)
+        stats = self._stats[schedule.priority]
+        stats["calls"] += 1
+        await self._wait(waiter)
+        waited = time.time() - now
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+        stats["waits"].append(waited)
+        return waiter
+
+    async def _wait(self, waiter: _Waiter) -> None:
+        if not self._heap and len(self._holders) < max(self.capacity(), 1):
+            self._holders.append(waiter)
+            return
+
+        waiter.future = asyncio.get_running_loop().create_future()
+        waiter.cancelled = False
+        heapq.heappush(self._heap, waiter)
+        self._dispatch()
+        if not waiter.future.done():
+            self._preempt_for(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted in the same step we were cancelled; pass it on
+                self.release(waiter)
+            else:
+                waiter.cancelled = True
+            raise
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the best-ranked waiters"""
+        while self._heap and len(self._holders) < max(self.capacity(), 1):
+            waiter = heapq.heappop(self._heap)
+            if waiter.cancelled or waiter.future is None or waiter.future.done():
+                continue
+            self._holders.append(waiter)
+            waiter.future.set_result(None)
+
+    def _preempt_for(self, waiter: _Waiter) -> None:
+        """Ask the worst-ranked preemptible holder to give its slot to ``waiter``"""
+        if not self.preempt:
+            return
+        victims = [holder for holder in self._holders if holder.preemptible and waiter < holder]
+        if victims:
+            victim = max(victims)
+            victim.preemptible = False
+            if victim.preempt is not None:
+                victim.preempt.set()
+            self._stats[victim.schedule.priority]["preempted"] += 1
+
+    async def hold_preemptible(self, waiter: _Waiter, delay: float) -> bool:
+        """Wait ``delay`` seconds before sending; returns True if preempted meanwhile"""
+        waiter.preempt = asyncio.Event()
+        waiter.preemptible = True
+        try:
+            await asyncio.wait_for(waiter.preempt.wait(), delay)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiter.preemptible = False
+            waiter.preempt = None
+
+    async def requeue(self, waiter: _Waiter) -> None:
+        """Give up a held slot and wait for one again with the original rank"""
+        self.release(waiter)
+        await self._wait(waiter)
+
+    def release(self, waiter: _Waiter) -> None:
+        """Return a slot and wake the next waiter"""
+        if waiter in self._holders:
+            self._holders.remove(waiter)
+        self._dispatch()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue-wait latency and preemptions per priority"""
+        priorities: Dict[str, Any] = {}
+        for priority, stats in self._stats.items():
+            waits = sorted(stats["waits"])
+            priorities[priority] = {
+                "calls": stats["calls"],
+                "preempted": stats["preempted"],
+                "wait_avg": stats["wait_total"] / stats["calls"] if stats["calls"] else 0.0,
+                "wait_p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "wait_max": stats["wait_max"]
+            }
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "priorities": priorities
+        }
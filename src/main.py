@@ -1,12 +1,15 @@
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, List
 import sys
 import os
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.settings import GOOGLE_CONFIG, SYSTEM_CONFIG
+from config.settings import GOOGLE_CONFIG, SYSTEM_CONFIG, CLIENT_CONFIG, TRACING_CONFIG, SEMANTIC_CONFIG
+from src.llm.clients import get_default_registry
+from src.utils.helpers import calculate_task_metrics, format_duration
+from src.utils.tracing import get_default_tracer
 from src.agents.task_manager import TaskManagerAgent
 from src.agents.research_agent import ResearchAgent
 from src.agents.planning_agent import PlanningAgent
@@ -34,11 +37,52 @@ async def process_task(task_manager: TaskManagerAgent, task: Dict[str, Any]) ->
         print(f"Error processing task: {str(e)}")
         return {"status": "error", "message": str(e)}
 
+async def process_tasks(
+    task_manager: TaskManagerAgent,
+    tasks: List[Dict[str, Any]],
+    max_concurrency: int = SYSTEM_CONFIG["max_concurrency"]
+) -> List[Dict[str, Any]]:
+    """Process many tasks through the multi-agent system with batched LLM calls"""
+    try:
+        return await task_manager.process_many(tasks, max_concurrency=max_concurrency)
+    except Exception as e:
+        print(f"Error processing tasks: {str(e)}")
+        return [{"status": "error", "message": str(e)} for _ in tasks]
+
 async def main():
     """Main entry point"""
     print("Setting up multi-agent system...")
     task_manager = await setup_agents()
+    registry = get_default_registry()
+    tracer = get_default_tracer()
+    
+    # Expose Prometheus metrics while running
+    metrics_server = None
+    if TRACING_CONFIG["metrics_port"]:
+        metrics_server = tracer.metrics.serve(TRACING_CONFIG["metrics_port"])
+        print(f"Serving metrics on :{TRACING_CONFIG['metrics_port']}/metrics")
     
+    # Open the pooled LLM connections before the first task needs them
+    if CLIENT_CONFIG["warmup_on_start"] and GOOGLE_CONFIG["api_key"]:
+        warmup = await registry.warm_up(timeout=CLIENT_CONFIG["warmup_timeout"])
+        print(f"Warmed up {warmup['ready']}/{warmup['clients']} LLM connections")
+    
+    try:
+        await run_example(task_manager)
+    finally:
+        await registry.close()
+        if task_manager.semantic_index is not None and SEMANTIC_CONFIG["path"]:
+            task_manager.semantic_index.save(SEMANTIC_CONFIG["path"])
+        if task_manager.result_store is not None:
+            task_manager.result_store.close()
+        if TRACING_CONFIG["metrics_path"]:
+            tracer.metrics.write(TRACING_CONFIG["metrics_path"])
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        tracer.close()
+
+async def run_example(task_manager: TaskManagerAgent) -> None:
+    """Run the example task and print the results"""
     # Example task
     example_task = {
         "description": "Research and create a plan for implementing a new machine learning model",
@@ -51,7 +95,12 @@ async def main():
     
     print("\nTask processing complete!")
     print("Status:", result.get("status"))
-    if result.get("status") == "completed":
+    metrics = calculate_task_metrics(result)
+    if metrics.get("duration_seconds") is not None:
+        print(f"Time: {format_duration(metrics['duration_seconds'])} "
+              f"({metrics.get('llm_calls', 0):.0f} LLM calls, {metrics.get('llm_seconds', 0):.1f}s in LLM, "
+              f"{metrics.get('queue_wait', 0):.1f}s queued)")
+    if result.get("status") in ("completed", "partial"):
         print("\nSubtask Results:")
         for subtask in result.get("subtask_results", []):
             print(f"- {subtask.get('status', 'unknown')}: {subtask.get('description', 'no description')}")
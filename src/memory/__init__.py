@@ -0,0 +1,3 @@
+"""
+Memory subsystem shared by the agents.
+"""
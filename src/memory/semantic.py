@@ -0,0 +1,241 @@
+"""
+Semantic reuse: find earlier results for near-duplicate task descriptions.
+
+Descriptions are embedded locally as signed, hashed character n-gram and
+word features (no network, no model), L2-normalised so that a dot product
+is the cosine similarity. Vectors live in one NumPy matrix. Lookups use
+random-hyperplane LSH over several tables to pick candidates, then score
+them exactly; small indexes are scanned in full.
+
+The embedding is lexical: it catches rewordings and reorderings, not
+synonyms, and "migrate to MySQL" is close to "migrate to PostgreSQL".
+Keep the reuse threshold high. Two guards sit in front of the score: an
+entry only matches queries in the same ``group`` (callers put whatever
+must match exactly there), and with the same negation words, so "do not
+use X" never reuses "use X".
+"""
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import SEMANTIC_CONFIG
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+# "don't" tokenises to "don" + "t", so contractions are listed by their stem
+NEGATIONS = frozenset({
+    "no", "not", "never", "none", "nor", "without", "except", "excluding", "avoid",
+    "cannot", "don", "dont", "doesn", "didn", "isn", "aren", "shouldn", "mustn"
+})
+
+def negations(text: str) -> List[str]:
+    """The negation words of a text, sorted"""
+    return sorted(word for word in TOKEN.findall(text.lower()) if word in NEGATIONS)
+
+def text_features(text: str) -> List[str]:
+    """Character 3- and 4-grams of each word, plus word unigrams and bigrams"""
+    words = TOKEN.findall(text.lower())
+    features: List[str] = []
+    for word in words:
+        padded = f" {word} "
+        for n in (3, 4):
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    features.extend("w:" + word for word in words)
+    features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+    return features
+
+def embed(text: str, dim: int = 256) -> np.ndarray:
+    """Hashed feature vector of a text, unit length (all zeros for empty text)"""
+    features = text_features(text)
+    hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features),
+                         dtype=np.uint32, count=len(features))
+    # The top hash bit picks the sign, so collisions cancel out on average
+    signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+    vector = np.bincount(hashes % dim, weights=signs, minlength=dim).astype(np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+class SemanticIndex:
+    """Vector index from task descriptions to earlier results"""
+
+    def __init__(
+        self,
+        dim: int = 256,
+        threshold: float = 0.85,
+        tables: int = 24,
+        bits: int = 12,
+        flat_below: int = 4096,
+        seed: int = 0
+    ):
+        self.dim = dim
+        self.threshold = threshold
+        self.tables = tables
+        self.bits = bits
+        self.flat_below = flat_below
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((tables * bits, dim)).astype(np.float32)
+        self._weights = (1 << np.arange(bits, dtype=np.int64))
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._entries: List[Dict[str, Any]] = []
+        # One dict per table: bucket signature -> entry ids
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(tables)]
+        # Entries are partitioned by group and negation words, and a search
+        # only scores its own partition: label per entry, size per label
+        self._labels = np.zeros(1024, dtype=np.int32)
+        self._partitions: Dict[str, int] = {}
+        self._sizes: List[int] = []
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "candidates": 0
+        }
+
+    def _signatures(self, vectors: np.ndarray) -> np.ndarray:
+        """Bucket signature per table for each row of ``vectors`` (shape: rows x tables)"""
+        bits = (vectors @ self._planes.T > 0).reshape(len(vectors), self.tables, self.bits)
+        return bits.astype(np.int64) @ self._weights
+
+    @staticmethod
+    def _partition(text: str, group: Optional[str]) -> str:
+        return json.dumps([group, negations(text)])
+
+    def _label(self, text: str, group: Optional[str]) -> int:
+        """Label of the partition for a text and group, created on first use"""
+        partition = self._partition(text, group)
+        label = self._partitions.get(partition)
+        if label is None:
+            label = self._partitions[partition] = len(self._sizes)
+            self._sizes.append(0)
+        return label
+
+    def add(self, text: str, value: Any, key: Optional[str] = None, group: Optional[str] = None) -> int:
+        """Index a description with the value to return for near duplicates in ``group``"""
+        vector = embed(text, self.dim)
+        with self._lock:
+            return self._add(vector, {"key": key, "text": text, "value": value, "group": group})
+
+    def _add(self, vector: np.ndarray, entry: Dict[str, Any]) -> int:
+        entry_id = len(self._entries)
+        if entry_id == len(self._vectors):
+            grown = np.zeros((len(self._vectors) * 2, self.dim), dtype=np.float32)
+            grown[:entry_id] = self._vectors
+            self._vectors = grown
+            self._labels = np.resize(self._labels, len(grown))
+        self._vectors[entry_id] = vector
+        label = self._labels[entry_id] = self._label(entry["text"], entry.get("group"))
+        self._sizes[label] += 1
+        self._entries.append(entry)
+        for table, signature in enumerate(self._signatures(vector[None, :])[0]):
+            self._buckets[table].setdefault(int(signature), []).append(entry_id)
+        return entry_id
+
+    def search(self, text: str, k: int = 1, group: Optional[str] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """The ``k`` most similar entries in ``group`` with the same negations, as ``(similarity, entry)``, best first"""
+        vector = embed(text, self.dim)
+        with self._lock:
+            label = self._partitions.get(self._partition(text, group))
+            if label is None or not vector.any():
+                return []
+            count = len(self._entries)
+            if self._sizes[label] < self.flat_below:
+                candidates = np.flatnonzero(self._labels[:count] == label)
+            else:
+                signatures = self._signatures(vector[None, :])[0]
+                buckets = [self._buckets[table].get(int(signature)) for table, signature in enumerate(signatures)]
+                candidates = np.fromiter(set().union(*(bucket for bucket in buckets if bucket)), dtype=np.int64)
+                candidates = candidates[self._labels[candidates] == label]
+            self._stats["candidates"] += len(candidates)
+            if not len(candidates):
+                return []
+
+            scores = self._vectors[candidates] @ vector
+            top = np.argsort(-scores)[:k] if k > 1 else [int(np.argmax(scores))]
+            return [(float(scores[i]), self._entries[candidates[i]]) for i in top]
+
+    def lookup(self, text: str, group: Optional[str] = None) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Best match in ``group`` at or above the reuse threshold, or None"""
+        matches = self.search(text, group=group)
+        with self._lock:
+            self._stats["lookups"] += 1
+            if matches and matches[0][0] >= self.threshold:
+                self._stats["hits"] += 1
+                return matches[0]
+            self._stats["misses"] += 1
+            return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self, path: str) -> None:
+        """Write the index to a directory (vectors as .npy, entries as JSONL)"""
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            count = len(self._entries)
+            np.save(os.path.join(path, "vectors.npy"), self._vectors[:count])
+            tmp_path = os.path.join(path, "entries.jsonl.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in self._entries:
+                    f.write(json.dumps(entry, default=str) + "\n")
+            os.replace(tmp_path, os.path.join(path, "entries.jsonl"))
+            with open(os.path.join(path, "index.json"), "w") as f:
+                json.dump({"dim": self.dim, "tables": self.tables, "bits": self.bits, "seed": self.seed, "count": count}, f)
+
+    def load(self, path: str) -> None:
+        """Replace the contents with an index written by ``save``"""
+        with open(os.path.join(path, "index.json")) as f:
+            meta = json.load(f)
+        if (meta["dim"], meta["tables"], meta["bits"], meta["seed"]) != (self.dim, self.tables, self.bits, self.seed):
+            raise ValueError(f"Index at {path} was built with different settings: {meta}")
+        vectors = np.load(os.path.join(path, "vectors.npy"))
+        with open(os.path.join(path, "entries.jsonl"), encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        count = min(len(vectors), len(entries), meta["count"])
+
+        with self._lock:
+            self._vectors = np.zeros((max(1024, count * 2), self.dim), dtype=np.float32)
+            self._vectors[:count] = vectors[:count]
+            self._entries = entries[:count]
+            self._buckets = [{} for _ in range(self.tables)]
+            for entry_id, signatures in enumerate(self._signatures(self._vectors[:count])):
+                for table, signature in enumerate(signatures):
+                    self._buckets[table].setdefault(int(signature), []).append(entry_id)
+            self._labels = np.zeros(len(self._vectors), dtype=np.int32)
+            self._partitions, self._sizes = {}, []
+            for entry_id, entry in enumerate(self._entries):
+                label = self._labels[entry_id] = self._label(entry["text"], entry.get("group"))
+                self._sizes[label] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookup counters and index size"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+            return stats
+
+_default_index: Optional[SemanticIndex] = None
+
+def get_default_semantic_index() -> SemanticIndex:
+    """Get the process-wide index, loaded from SEMANTIC_CONFIG["path"] when saved there"""
+    global _default_index
+    if _default_index is None:
+        _default_index = SemanticIndex(dim=SEMANTIC_CONFIG["dim"], threshold=SEMANTIC_CONFIG["threshold"])
+        path = SEMANTIC_CONFIG["path"]
+        if path and os.path.exists(os.path.join(path, "index.json")):
+            _default_index.load(path)
+    return _default_index
+
+def set_default_semantic_index(index: Optional[SemanticIndex]) -> None:
+    """Replace the process-wide semantic index"""
+    global _default_index
+    _default_index = index
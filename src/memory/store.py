@@ -0,0 +1,271 @@
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Iterator, MutableMapping
+
+from config.settings import MEMORY_CONFIG
+
+_MISSING: Any = object()
+
+def entry_size(value: Any) -> int:
+    """Approximate size of a value in bytes (its pickled size)"""
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+class MemoryStore(MutableMapping[str, Any]):
+    """Bounded key/value memory with LRU and TTL eviction
+
+    Entries are kept in memory up to ``max_entries`` and ``max_bytes``.
+    Beyond that the least recently used entries are evicted; with a
+    ``spill_path`` they are moved to an SQLite file instead of dropped,
+    and a later read loads them back. Every entry may carry a TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 1000,
+        max_bytes: Optional[int] = 16 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        spill_path: Optional[str] = None,
+        namespace: str = "default"
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill_path = spill_path
+        self.namespace = namespace
+
+        # key -> (value, size, expires_at), least recently used first
+        self._entries: "OrderedDict[str, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "spilled": 0,
+            "reloads": 0,
+            "dropped": 0
+        }
+
+        if spill_path:
+            self._open_spill(spill_path)
+
+    def _open_spill(self, spill_path: str) -> None:
+        """Open (and create if needed) the on-disk spill store"""
+        directory = os.path.dirname(spill_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(spill_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS agent_memory (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            )"""
+        )
+        self._db.commit()
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; ``ttl`` overrides the store's default TTL"""
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._discard(key)
+            self._insert(key, value, entry_size(value), expires_at)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a value, reloading it from the spill store if it was evicted"""
+        with self._lock:
+            value = self._lookup(key)
+            return default if value is _MISSING else value
+
+    def _lookup(self, key: str) -> Any:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, size, expires_at = entry
+            if expires_at is None or expires_at > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value
+            self._remove(key)
+            self._stats["expirations"] += 1
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT value, size, expires_at FROM agent_memory WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is not None:
+                self._delete_spilled(key)
+                blob, size, expires_at = row
+                if expires_at is None or expires_at > now:
+                    value = pickle.loads(blob)
+                    self._insert(key, value, size, expires_at)
+                    self._stats["hits"] += 1
+                    self._stats["reloads"] += 1
+                    return value
+                self._stats["expirations"] += 1
+
+        self._stats["misses"] += 1
+        return _MISSING
+
+    def _insert(self, key: str, value: Any, size: int, expires_at: Optional[float]) -> None:
+        """Add an entry in memory, then evict down to the budgets"""
+        self._entries[key] = (value, size, expires_at)
+        self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        """When over budget, drop expired entries, then evict least recently used ones"""
+        if not self._over_budget():
+            return
+        now = time.time()
+        for key in [key for key, (_, _, expires_at) in self._entries.items()
+                    if expires_at is not None and expires_at <= now]:
+            self._remove(key)
+            self._stats["expirations"] += 1
+
+        # The most recent entry always stays, even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and self._over_budget():
+            key, (value, size, expires_at) = next(iter(self._entries.items()))
+            self._remove(key)
+            self._stats["evictions"] += 1
+            self._spill(key, value, size, expires_at)
+
+    def _over_budget(self) -> bool:
+        return (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        )
+
+    def _spill(self, key: str, value: Any, size: int, expires_at: Optional[float]) -> None:
+        """Move an evicted entry to disk, or drop it if there is no spill store"""
+        if self._db is None:
+            self._stats["dropped"] += 1
+            return
+        try:
+            blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            self._stats["dropped"] += 1
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO agent_memory (namespace, key, value, size, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, blob, size, expires_at)
+        )
+        self._db.commit()
+        self._stats["spilled"] += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _delete_spilled(self, key: str) -> None:
+        if self._db is not None:
+            self._db.execute("DELETE FROM agent_memory WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._db.commit()
+
+    def _discard(self, key: str) -> bool:
+        """Remove a key from both tiers; returns whether it was present"""
+        found = key in self._entries
+        if found:
+            self._remove(key)
+        if self._db is not None:
+            cursor = self._db.execute(
+                "DELETE FROM agent_memory WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+            self._db.commit()
+            found = found or cursor.rowcount > 0
+        return found
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            if not self._discard(key):
+                raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        # Membership without counting a hit or reloading from disk
+        with self._lock:
+            if key in self._entries:
+                return True
+            return self._db is not None and self._db.execute(
+                "SELECT 1 FROM agent_memory WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone() is not None
+
+    def _keys(self) -> Dict[str, None]:
+        keys = dict.fromkeys(self._entries)
+        if self._db is not None:
+            for (key,) in self._db.execute("SELECT key FROM agent_memory WHERE namespace = ?", (self.namespace,)):
+                keys[key] = None
+        return keys
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._keys()))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys())
+
+    def clear(self) -> None:
+        """Remove all entries from memory and the spill store"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM agent_memory WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the spill store"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss and eviction counters and current usage"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["spill_entries"] = self._db.execute(
+                "SELECT COUNT(*) FROM agent_memory WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0] if self._db is not None else 0
+            return stats
+
+def create_memory_store(namespace: str = "default") -> MemoryStore:
+    """Build a memory store with the limits from MEMORY_CONFIG"""
+    return MemoryStore(
+        max_entries=MEMORY_CONFIG["max_entries"],
+        max_bytes=MEMORY_CONFIG["max_bytes"],
+        ttl=MEMORY_CONFIG["ttl"],
+        spill_path=MEMORY_CONFIG["spill_path"] or None,
+        namespace=namespace
+    )
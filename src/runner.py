@@ -0,0 +1,333 @@
+"""
+Durable queue runner: process a backlog of tasks from JSONL across worker processes.
+
+Tasks are read from a JSONL file, or from every ``*.jsonl`` file in a
+directory. Each line is a task dict (``description``, ``priority``, ...), or a
+request record with ``title``/``body``. Worker processes pull tasks from a
+shared queue. Each runs its own event loop with many tasks in flight, so
+the CPU-bound parts (prompt building, parsing, JSON) scale across cores.
+
+Every finished task is appended to its worker's checkpoint file in the
+output directory. Restarting with the same output directory skips tasks
+already completed, so a crash or Ctrl-C loses only the tasks that were in
+flight. Tasks that ended in ``error`` or ``partial`` are retried. With
+``RESULT_STORE=true`` each worker process also keeps its results in its own
+result store under ``RESULT_STORE_PATH`` (``worker-<n>``), as a store has a
+single writer.
+
+Usage:
+    python -m src.runner requests.jsonl --output-dir runs/backlog --workers 4 --concurrency 32
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, Any, List, Tuple, Set, AsyncIterator, Callable, Awaitable
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import RESULT_STORE_CONFIG, RUNNER_CONFIG
+
+# Only completed tasks are skipped on resume
+DONE_STATUS = "completed"
+CHECKPOINT_PATTERN = "results-*.jsonl"
+
+Job = Tuple[str, Dict[str, Any]]
+
+def to_task(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn an input record into a task; request records (title/body) become descriptions"""
+    task = dict(record)
+    if not task.get("description"):
+        parts = [str(task[key]) for key in ("title", "body") if task.get(key)]
+        if parts:
+            task["description"] = "\n\n".join(parts)
+    return task
+
+def task_id_for(record: Dict[str, Any], line: str) -> str:
+    """Stable id for a task: its own id field, else a hash of its line"""
+    for key in ("id", "task_id", "request_id"):
+        if record.get(key):
+            return str(record[key])
+    return hashlib.sha256(line.strip().encode("utf-8")).hexdigest()[:16]
+
+def load_tasks(path: str) -> List[Job]:
+    """Read tasks from a JSONL file or a directory of JSONL files, dropping duplicate ids"""
+    files = sorted(glob.glob(os.path.join(path, "*.jsonl"))) if os.path.isdir(path) else [path]
+    jobs: List[Job] = []
+    seen: Set[str] = set()
+    for file_path in files:
+        with open(file_path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{file_path}:{line_number}: invalid JSON ({e})") from e
+                task_id = task_id_for(record, line)
+                if task_id in seen:
+                    continue
+                seen.add(task_id)
+                jobs.append((task_id, {**to_task(record), "id": task_id}))
+    return jobs
+
+class Checkpoint:
+    """Append-only log of finished tasks, one file per worker"""
+
+    def __init__(self, directory: str, worker_id: int, fsync: bool = False):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"results-{worker_id}.jsonl")
+        self.worker_id = worker_id
+        self.fsync = fsync
+        self._truncate_torn_line(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _truncate_torn_line(path: str, chunk_size: int = 64 * 1024) -> None:
+        """Cut a last line left unfinished by a crash, so the next record starts on a line of its own"""
+        if not os.path.exists(path):
+            return
+        with open(path, "r+b") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - chunk_size)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                f.truncate(position)
+
+    def record(self, task_id: str, result: Dict[str, Any]) -> None:
+        """Persist a finished task; a line is only complete once it hits the file"""
+        line = json.dumps({
+            "task_id": task_id,
+            "status": result.get("status"),
+            "worker": self.worker_id,
+            "finished_at": time.time(),
+            "result": result
+        }, default=str)
+        self._file.write(line + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    @staticmethod
+    def completed_ids(directory: str) -> Set[str]:
+        """Ids of tasks already completed in earlier runs"""
+        done: Set[str] = set()
+        for path in glob.glob(os.path.join(directory, CHECKPOINT_PATTERN)):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash; that task reruns
+                        continue
+                    if entry.get("status") == DONE_STATUS:
+                        done.add(entry["task_id"])
+        return done
+
+def load_setup(spec: str) -> Callable[[], Awaitable[Any]]:
+    """Resolve a ``module:function`` setup spec"""
+    module_name, _, function_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+async def run_worker(
+    jobs: AsyncIterator[Job],
+    checkpoint: Checkpoint,
+    setup: str,
+    concurrency: int,
+    timeout: float
+) -> Dict[str, int]:
+    """Run jobs on one event loop, at most ``concurrency`` at a time
+
+    The next job is only pulled from ``jobs`` after a slot has been
+    acquired, so a busy worker never holds a job it cannot start yet, and
+    workers that get through their tasks faster pull more of the shared queue.
+    """
+    from src.llm.clients import get_default_registry
+
+    task_manager = await load_setup(setup)()
+    slots = asyncio.Semaphore(concurrency)
+    running: Set["asyncio.Task[None]"] = set()
+    counts: Dict[str, int] = {}
+
+    async def run_job(task_id: str, task: Dict[str, Any]) -> None:
+        try:
+            result = await task_manager.process(task, timeout=timeout)
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+        checkpoint.record(task_id, result)
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+    def finished(job: "asyncio.Task[None]") -> None:
+        running.discard(job)
+        slots.release()
+
+    try:
+        while True:
+            # Take the slot first: a job pulled while all slots are busy
+            # would sit here instead of going to an idle worker
+            await slots.acquire()
+            try:
+                task_id, task = await jobs.__anext__()
+            except StopAsyncIteration:
+                slots.release()
+                break
+            job = asyncio.create_task(run_job(task_id, task))
+            running.add(job)
+            job.add_done_callback(finished)
+        await asyncio.gather(*running)
+    finally:
+        await get_default_registry().close()
+    return counts
+
+async def _iterate(jobs: List[Job]) -> AsyncIterator[Job]:
+    for job in jobs:
+        yield job
+
+async def _from_queue(queue: Any) -> AsyncIterator[Job]:
+    """Pull jobs from a multiprocessing queue without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        job = await loop.run_in_executor(None, queue.get)
+        if job is None:
+            return
+        yield job
+
+def _worker_main(worker_id: int, queue: Any, counts_queue: Any, options: Dict[str, Any]) -> None:
+    """Worker process entry point"""
+    checkpoint = Checkpoint(options["output_dir"], worker_id, fsync=options["fsync"])
+    if RESULT_STORE_CONFIG["enabled"]:
+        from src.storage.result_store import ResultStore, set_default_result_store
+        set_default_result_store(ResultStore(
+            os.path.join(RESULT_STORE_CONFIG["path"], f"worker-{worker_id}"),
+            segment_bytes=RESULT_STORE_CONFIG["segment_bytes"],
+            compression_level=RESULT_STORE_CONFIG["compression_level"]
+        ))
+    try:
+        with contextlib.ExitStack() as stack:
+            if not options["verbose"]:
+                stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+            counts = asyncio.run(run_worker(
+                _from_queue(queue), checkpoint, options["setup"], options["concurrency"], options["timeout"]
+            ))
+        counts_queue.put(counts)
+    finally:
+        checkpoint.close()
+
+def run(
+    input_path: str,
+    output_dir: str = RUNNER_CONFIG["output_dir"],
+    workers: int = RUNNER_CONFIG["workers"],
+    concurrency: int = RUNNER_CONFIG["concurrency"],
+    timeout: float = RUNNER_CONFIG["task_timeout"],
+    setup: str = RUNNER_CONFIG["setup"],
+    fsync: bool = RUNNER_CONFIG["fsync"],
+    verbose: bool = False
+) -> Dict[str, Any]:
+    """Process every task not yet completed in ``output_dir``; returns a run summary
+
+    With ``workers=0`` tasks run in this process (no multiprocessing).
+    """
+    start = time.perf_counter()
+    jobs = load_tasks(input_path)
+    done = Checkpoint.completed_ids(output_dir)
+    pending = [job for job in jobs if job[0] not in done]
+    options = {
+        "output_dir": output_dir,
+        "setup": setup,
+        "concurrency": concurrency,
+        "timeout": timeout,
+        "fsync": fsync,
+        "verbose": verbose
+    }
+
+    counts: Dict[str, int] = {}
+    failed_workers = 0
+    if pending and workers <= 0:
+        checkpoint = Checkpoint(output_dir, 0, fsync=fsync)
+        try:
+            counts = asyncio.run(run_worker(_iterate(pending), checkpoint, setup, concurrency, timeout))
+        finally:
+            checkpoint.close()
+    elif pending:
+        context = multiprocessing.get_context(RUNNER_CONFIG["start_method"])
+        queue = context.Queue()
+        counts_queue = context.Queue()
+        processes = [
+            context.Process(target=_worker_main, args=(worker_id, queue, counts_queue, options), daemon=True)
+            for worker_id in range(min(workers, len(pending)))
+        ]
+        for process in processes:
+            process.start()
+        for job in pending:
+            queue.put(job)
+        for _ in processes:
+            queue.put(None)
+
+        for process in processes:
+            process.join()
+            failed_workers += process.exitcode != 0
+        while not counts_queue.empty():
+            for status, count in counts_queue.get().items():
+                counts[status] = counts.get(status, 0) + count
+
+    elapsed = time.perf_counter() - start
+    processed = sum(counts.values())
+    return {
+        "tasks": len(jobs),
+        "skipped": len(jobs) - len(pending),
+        "processed": processed,
+        "statuses": counts,
+        "failed_workers": failed_workers,
+        "seconds": round(elapsed, 3),
+        "tasks_per_sec": round(processed / elapsed, 2) if elapsed else 0.0
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Process a JSONL task backlog across worker processes")
+    parser.add_argument("input", help="JSONL file or directory of JSONL files")
+    parser.add_argument("--output-dir", default=RUNNER_CONFIG["output_dir"], help="checkpoint directory (reuse to resume)")
+    parser.add_argument("--workers", type=int, default=RUNNER_CONFIG["workers"], help="worker processes (0 = in-process)")
+    parser.add_argument("--concurrency", type=int, default=RUNNER_CONFIG["concurrency"], help="tasks in flight per worker")
+    parser.add_argument("--timeout", type=float, default=RUNNER_CONFIG["task_timeout"], help="seconds per task")
+    parser.add_argument("--setup", default=RUNNER_CONFIG["setup"], help="module:function that builds the TaskManagerAgent")
+    parser.add_argument("--fsync", action="store_true", default=RUNNER_CONFIG["fsync"], help="fsync every checkpoint")
+    parser.add_argument("--verbose", action="store_true", help="show per-task agent output")
+    args = parser.parse_args()
+
+    summary = run(
+        args.input,
+        output_dir=args.output_dir,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        setup=args.setup,
+        fsync=args.fsync,
+        verbose=args.verbose
+    )
+    print(f"✓ {summary['processed']} processed, {summary['skipped']} already done "
+          f"({summary['tasks_per_sec']} tasks/s): {summary['statuses']}")
+    if summary["failed_workers"]:
+        print(f"⚠️ {summary['failed_workers']} worker(s) exited abnormally; rerun to resume their tasks")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
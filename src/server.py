@@ -0,0 +1,275 @@
+"""
+HTTP service: one warm TaskManagerAgent serving tasks on a single event loop.
+
+Endpoints:
+    POST /tasks             run a task (JSON body); responds with the result
+    POST /tasks?stream=1    same, streamed as Server-Sent Events (also with Accept: text/event-stream)
+    GET  /healthz           liveness and admission state
+    GET  /stats             admission, agent, client, scheduling, routing, hedging and journal statistics
+    GET  /metrics           Prometheus metrics from the tracer
+
+Admission is bounded: ``max_active`` tasks run at once and up to
+``max_queue`` more wait for a slot. Beyond that requests are rejected with
+429 and a Retry-After header. On shutdown the server stops admitting work
+(503) and lets in-flight tasks finish for up to ``drain_timeout`` seconds.
+
+Usage:
+    python -m src.server --port 8080
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator
+
+from aiohttp import web
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import CLIENT_CONFIG, GOOGLE_CONFIG, SEMANTIC_CONFIG, SERVER_CONFIG, TRACING_CONFIG
+from src.llm.clients import get_default_registry
+from src.llm.hedging import get_default_hedger
+from src.llm.rate_limiter import get_default_limiter
+from src.llm.router import get_default_router
+from src.utils.tracing import get_default_tracer
+
+class AdmissionQueue:
+    """Bounded admission: ``max_active`` running plus at most ``max_queue`` waiting"""
+
+    def __init__(self, max_active: int, max_queue: int):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.draining = False
+        self._slots = asyncio.Semaphore(max_active)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self._stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "completed": 0
+        }
+
+    def try_admit(self) -> bool:
+        """Reserve a place in line; False when saturated or draining"""
+        if self.draining or self.active + self.waiting >= self.max_active + self.max_queue:
+            self._stats["rejected"] += 1
+            return False
+        self.waiting += 1
+        self._idle.clear()
+        self._stats["admitted"] += 1
+        return True
+
+    def withdraw(self) -> None:
+        """Give back a reservation from ``try_admit`` that will never take a slot"""
+        self.waiting -= 1
+        self._check_idle()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a running slot; only valid after a successful ``try_admit``"""
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+            self._check_idle()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._stats["completed"] += 1
+            self._slots.release()
+            self._check_idle()
+
+    def _check_idle(self) -> None:
+        if not self.active and not self.waiting:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop admitting and wait for admitted tasks; returns whether all finished"""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission counters and current occupancy"""
+        return {
+            **self._stats,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_active": self.max_active,
+            "max_queue": self.max_queue,
+            "draining": self.draining
+        }
+
+TASK_MANAGER = web.AppKey("task_manager", Any)
+ADMISSION = web.AppKey("admission", AdmissionQueue)
+DRAIN_TIMEOUT = web.AppKey("drain_timeout", float)
+
+def json_response(data: Any, status: int = 200, **kwargs: Any) -> web.Response:
+    return web.json_response(data, status=status, dumps=lambda value: json.dumps(value, default=str), **kwargs)
+
+def sse_event(event: Dict[str, Any]) -> bytes:
+    """Encode an agent event as a Server-Sent Event"""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, default=str)}\n\n".encode("utf-8")
+
+async def handle_task(request: web.Request) -> web.StreamResponse:
+    app = request.app
+    admission: AdmissionQueue = app[ADMISSION]
+    try:
+        task = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return json_response({"status": "error", "message": "Body must be a JSON task"}, status=400)
+    if not isinstance(task, dict) or not task.get("description"):
+        return json_response({"status": "error", "message": "Task must have a description"}, status=400)
+    try:
+        timeout = float(request.query.get("timeout", SERVER_CONFIG["task_timeout"]))
+    except ValueError:
+        timeout = math.nan
+    if not math.isfinite(timeout) or timeout <= 0:
+        return json_response({"status": "error", "message": "timeout must be a positive number"}, status=400)
+    timeout = min(timeout, SERVER_CONFIG["task_timeout"])
+
+    if not admission.try_admit():
+        if admission.draining:
+            return json_response({"status": "error", "message": "Server is shutting down"}, status=503)
+        return json_response(
+            {"status": "error", "message": "Server is at capacity, retry later"},
+            status=429, headers={"Retry-After": str(SERVER_CONFIG["retry_after"])}
+        )
+
+    stream = request.query.get("stream") in ("1", "true") or "text/event-stream" in request.headers.get("Accept", "")
+    task_manager = app[TASK_MANAGER]
+    if not stream:
+        async with admission.slot():
+            result = await task_manager.process(task, timeout=timeout)
+        return json_response(result)
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    try:
+        await response.prepare(request)
+        if admission.active >= admission.max_active:
+            await response.write(sse_event({"type": "queued", "waiting": admission.waiting}))
+    except BaseException:
+        # The client went away before the task took a slot: free its place in line
+        admission.withdraw()
+        raise
+    try:
+        async with admission.slot():
+            events = task_manager.process_stream(task, timeout=timeout)
+            try:
+                async for event in events:
+                    await response.write(sse_event(event))
+            finally:
+                # Cancels agents still generating if the client went away
+                await events.aclose()
+    except (ConnectionResetError, asyncio.CancelledError):
+        raise
+    except Exception as e:
+        await response.write(sse_event({"type": "error", "message": str(e)}))
+    await response.write_eof()
+    return response
+
+async def handle_health(request: web.Request) -> web.Response:
+    admission: AdmissionQueue = request.app[ADMISSION]
+    return json_response({
+        "status": "draining" if admission.draining else "ok",
+        "active": admission.active,
+        "waiting": admission.waiting
+    }, status=503 if admission.draining else 200)
+
+async def handle_stats(request: web.Request) -> web.Response:
+    task_manager = request.app[TASK_MANAGER]
+    return json_response({
+        "admission": request.app[ADMISSION].get_stats(),
+        "agents": {agent.state.name: agent.get_stats() for agent in [task_manager, *task_manager.agents]},
+        "clients": get_default_registry().get_stats(),
+        "limiter": get_default_limiter().get_stats(),
+        "routing": get_default_router().get_stats(),
+        "hedging": get_default_hedger().get_stats(),
+        "journal": task_manager.journal.get_stats() if task_manager.journal is not None else None
+    })
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=get_default_tracer().metrics.render(), content_type="text/plain", charset="utf-8")
+
+async def on_startup(app: web.Application) -> None:
+    """Build the task manager and warm the LLM connections once, before serving"""
+    if app[TASK_MANAGER] is None:
+        from src.main import setup_agents
+        app[TASK_MANAGER] = await setup_agents()
+    if CLIENT_CONFIG["warmup_on_start"] and GOOGLE_CONFIG["api_key"]:
+        warmup = await get_default_registry().warm_up(timeout=CLIENT_CONFIG["warmup_timeout"])
+        print(f"Warmed up {warmup['ready']}/{warmup['clients']} LLM connections")
+
+async def on_shutdown(app: web.Application) -> None:
+    """Refuse new tasks and let admitted ones finish"""
+    admission: AdmissionQueue = app[ADMISSION]
+    if admission.active or admission.waiting:
+        print(f"Draining {admission.active + admission.waiting} task(s)...")
+    if not await admission.drain(app[DRAIN_TIMEOUT]):
+        print(f"⚠️ Drain timed out with {admission.active + admission.waiting} task(s) unfinished")
+
+async def on_cleanup(app: web.Application) -> None:
+    """Release shared clients and flush persisted state"""
+    await get_default_registry().close()
+    task_manager = app[TASK_MANAGER]
+    if task_manager is not None and task_manager.semantic_index is not None and SEMANTIC_CONFIG["path"]:
+        task_manager.semantic_index.save(SEMANTIC_CONFIG["path"])
+    if task_manager is not None and task_manager.journal is not None:
+        task_manager.journal.close()
+    if task_manager is not None and task_manager.result_store is not None:
+        task_manager.result_store.close()
+    tracer = get_default_tracer()
+    if TRACING_CONFIG["metrics_path"]:
+        tracer.metrics.write(TRACING_CONFIG["metrics_path"])
+    tracer.close()
+
+def create_app(
+    task_manager: Any = None,
+    max_active: int = SERVER_CONFIG["max_active"],
+    max_queue: int = SERVER_CONFIG["max_queue"],
+    drain_timeout: float = SERVER_CONFIG["drain_timeout"]
+) -> web.Application:
+    """Build the application; without a task manager one is created by ``setup_agents`` on startup"""
+    app = web.Application()
+    app[TASK_MANAGER] = task_manager
+    app[ADMISSION] = AdmissionQueue(max_active, max_queue)
+    app[DRAIN_TIMEOUT] = drain_timeout
+    app.router.add_post("/tasks", handle_task)
+    app.router.add_get("/healthz", handle_health)
+    app.router.add_get("/stats", handle_stats)
+    app.router.add_get("/metrics", handle_metrics)
+    app.on_startup.append(on_startup)
+    app.on_shutdown.append(on_shutdown)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the multi-agent system over HTTP")
+    parser.add_argument("--host", default=SERVER_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG["port"])
+    parser.add_argument("--max-active", type=int, default=SERVER_CONFIG["max_active"], help="tasks processed at once")
+    parser.add_argument("--max-queue", type=int, default=SERVER_CONFIG["max_queue"], help="tasks waiting before 429")
+    args = parser.parse_args()
+
+    app = create_app(max_active=args.max_active, max_queue=args.max_queue)
+    # aiohttp waits this long for open requests after on_shutdown; give the drain room to finish
+    web.run_app(app, host=args.host, port=args.port, shutdown_timeout=SERVER_CONFIG["drain_timeout"] + 5)
+
+if __name__ == "__main__":
+    main()
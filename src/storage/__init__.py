@@ -0,0 +1,3 @@
+"""
+Durable storage for task results.
+"""
@@ -0,0 +1,271 @@
+"""
+Compact binary codec for results: the MessagePack wire format.
+
+Plain values (None, bools, ints, floats, str, bytes, lists, tuples and
+dicts) are encoded as standard MessagePack, so any MessagePack reader can
+decode them. Registered typed models (see ``register``) are encoded as an
+extension type holding the model's type id and its field values in
+declaration order, without repeating field names in every record; decoding
+gives the model back.
+
+The ``msgpack`` C extension is used when it is installed; otherwise a
+pure-Python implementation writes the same bytes.
+
+A model's fields may only be appended to: records written with fewer
+fields decode with the missing ones at their defaults.
+"""
+import struct
+from typing import Dict, Any, List, Tuple, Callable
+
+# MessagePack extension type used for registered models
+MODEL_EXT = 1
+
+_models_by_type: Dict[type, int] = {}
+_models_by_id: Dict[int, type] = {}
+
+def register(type_id: int) -> Callable[[type], type]:
+    """Class decorator: encode instances of a slotted dataclass as model ``type_id``"""
+    def decorator(cls: type) -> type:
+        if type_id in _models_by_id and _models_by_id[type_id] is not cls:
+            raise ValueError(f"Model type id {type_id} is already used by {_models_by_id[type_id].__name__}")
+        _models_by_type[cls] = type_id
+        _models_by_id[type_id] = cls
+        return cls
+    return decorator
+
+def _model_fields(obj: Any) -> List[Any]:
+    return [getattr(obj, name) for name in obj.__dataclass_fields__]
+
+def _build_model(type_id: int, values: List[Any]) -> Any:
+    cls = _models_by_id.get(type_id)
+    if cls is None:
+        raise ValueError(f"Unknown model type id: {type_id}")
+    names = list(cls.__dataclass_fields__)
+    # Newer writers may have appended fields this version does not know
+    return cls(**dict(zip(names, values[:len(names)])))
+
+# --- pure-Python encoder ----------------------------------------------------
+
+_pack_float = struct.Struct(">Bd").pack
+
+def _pack_int(value: int, out: List[bytes]) -> None:
+    if 0 <= value < 0x80:
+        out.append(bytes((value,)))
+    elif -32 <= value < 0:
+        out.append(bytes((value & 0xff,)))
+    elif 0 <= value <= 0xff:
+        out.append(struct.pack(">BB", 0xcc, value))
+    elif 0 <= value <= 0xffff:
+        out.append(struct.pack(">BH", 0xcd, value))
+    elif 0 <= value <= 0xffffffff:
+        out.append(struct.pack(">BI", 0xce, value))
+    elif 0 <= value <= 0xffffffffffffffff:
+        out.append(struct.pack(">BQ", 0xcf, value))
+    elif -0x80 <= value:
+        out.append(struct.pack(">Bb", 0xd0, value))
+    elif -0x8000 <= value:
+        out.append(struct.pack(">Bh", 0xd1, value))
+    elif -0x80000000 <= value:
+        out.append(struct.pack(">Bi", 0xd2, value))
+    elif -0x8000000000000000 <= value:
+        out.append(struct.pack(">Bq", 0xd3, value))
+    else:
+        raise OverflowError("Integer out of MessagePack range")
+
+def _pack_header(length: int, fix: int, fix_max: int, codes: Tuple[int, int, int], out: List[bytes]) -> None:
+    """Length header for str/bin/array/map: fix form, then 8/16/32-bit forms (0 marks no such form)"""
+    if length < fix_max and fix:
+        out.append(bytes((fix | length,)))
+    elif length <= 0xff and codes[0]:
+        out.append(struct.pack(">BB", codes[0], length))
+    elif length <= 0xffff:
+        out.append(struct.pack(">BH", codes[1], length))
+    else:
+        out.append(struct.pack(">BI", codes[2], length))
+
+def _pack(obj: Any, out: List[bytes]) -> None:
+    kind = type(obj)
+    if kind is str:
+        data = obj.encode("utf-8")
+        _pack_header(len(data), 0xa0, 32, (0xd9, 0xda, 0xdb), out)
+        out.append(data)
+    elif obj is None:
+        out.append(b"\xc0")
+    elif kind is bool:
+        out.append(b"\xc3" if obj else b"\xc2")
+    elif kind is int:
+        _pack_int(obj, out)
+    elif kind is float:
+        out.append(_pack_float(0xcb, obj))
+    elif kind is dict:
+        _pack_header(len(obj), 0x80, 16, (0, 0xde, 0xdf), out)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    elif kind is list or kind is tuple:
+        _pack_header(len(obj), 0x90, 16, (0, 0xdc, 0xdd), out)
+        for value in obj:
+            _pack(value, out)
+    elif kind in _models_by_type:
+        _pack_ext(_encode_model(obj), out)
+    elif kind is bytes or kind is bytearray:
+        _pack_header(len(obj), 0, 0, (0xc4, 0xc5, 0xc6), out)
+        out.append(bytes(obj))
+    elif isinstance(obj, (str, int, float, dict, list, tuple)):
+        # Subclasses (enums, named tuples, ...) encode as their base type
+        for base in (bool, int, float, str, dict, list):
+            if isinstance(obj, base):
+                _pack(base(obj), out)
+                return
+        _pack(list(obj), out)
+    else:
+        raise TypeError(f"Cannot encode {kind.__name__}")
+
+def _pack_ext(data: bytes, out: List[bytes]) -> None:
+    fixext = {1: 0xd4, 2: 0xd5, 4: 0xd6, 8: 0xd7, 16: 0xd8}.get(len(data))
+    if fixext is not None:
+        out.append(struct.pack(">Bb", fixext, MODEL_EXT))
+    elif len(data) <= 0xff:
+        out.append(struct.pack(">BBb", 0xc7, len(data), MODEL_EXT))
+    elif len(data) <= 0xffff:
+        out.append(struct.pack(">BHb", 0xc8, len(data), MODEL_EXT))
+    else:
+        out.append(struct.pack(">BIb", 0xc9, len(data), MODEL_EXT))
+    out.append(data)
+
+def _encode_model(obj: Any) -> bytes:
+    return _py_encode([_models_by_type[type(obj)], *_model_fields(obj)])
+
+def _py_encode(obj: Any) -> bytes:
+    out: List[bytes] = []
+    _pack(obj, out)
+    return b"".join(out)
+
+# --- pure-Python decoder ----------------------------------------------------
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def take(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.data):
+            raise ValueError("Truncated MessagePack data")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def unpack(self, fmt: struct.Struct) -> Any:
+        value = fmt.unpack_from(self.data, self.pos)[0]
+        self.pos += fmt.size
+        return value
+
+_U8, _U16, _U32, _U64 = (struct.Struct(f">{c}") for c in "BHIQ")
+_I8, _I16, _I32, _I64 = (struct.Struct(f">{c}") for c in "bhiq")
+_F32, _F64 = struct.Struct(">f"), struct.Struct(">d")
+
+def _unpack(reader: _Reader) -> Any:
+    data = reader.data
+    if reader.pos >= len(data):
+        raise ValueError("Truncated MessagePack data")
+    code = data[reader.pos]
+    reader.pos += 1
+
+    if code <= 0x7f:
+        return code
+    if code >= 0xe0:
+        return code - 0x100
+    if 0xa0 <= code <= 0xbf:
+        return reader.take(code & 0x1f).decode("utf-8")
+    if 0x90 <= code <= 0x9f:
+        return [_unpack(reader) for _ in range(code & 0x0f)]
+    if 0x80 <= code <= 0x8f:
+        return _unpack_map(reader, code & 0x0f)
+    if code == 0xc0:
+        return None
+    if code == 0xc2:
+        return False
+    if code == 0xc3:
+        return True
+    if code == 0xcb:
+        return reader.unpack(_F64)
+    if code == 0xca:
+        return reader.unpack(_F32)
+    if 0xcc <= code <= 0xcf:
+        return reader.unpack((_U8, _U16, _U32, _U64)[code - 0xcc])
+    if 0xd0 <= code <= 0xd3:
+        return reader.unpack((_I8, _I16, _I32, _I64)[code - 0xd0])
+    if 0xd9 <= code <= 0xdb:
+        return reader.take(reader.unpack((_U8, _U16, _U32)[code - 0xd9])).decode("utf-8")
+    if 0xc4 <= code <= 0xc6:
+        return reader.take(reader.unpack((_U8, _U16, _U32)[code - 0xc4]))
+    if code in (0xdc, 0xdd):
+        return [_unpack(reader) for _ in range(reader.unpack(_U16 if code == 0xdc else _U32))]
+    if code in (0xde, 0xdf):
+        return _unpack_map(reader, reader.unpack(_U16 if code == 0xde else _U32))
+    if 0xd4 <= code <= 0xd8:
+        return _unpack_ext(reader, 1 << (code - 0xd4))
+    if 0xc7 <= code <= 0xc9:
+        return _unpack_ext(reader, reader.unpack((_U8, _U16, _U32)[code - 0xc7]))
+    raise ValueError(f"Unsupported MessagePack type byte: {code:#x}")
+
+def _unpack_map(reader: _Reader, length: int) -> Dict[Any, Any]:
+    result = {}
+    for _ in range(length):
+        key = _unpack(reader)
+        result[key] = _unpack(reader)
+    return result
+
+def _unpack_ext(reader: _Reader, length: int) -> Any:
+    ext_type = reader.unpack(_I8)
+    return _ext_hook(ext_type, reader.take(length))
+
+def _ext_hook(ext_type: int, data: bytes) -> Any:
+    if ext_type != MODEL_EXT:
+        raise ValueError(f"Unsupported MessagePack extension type: {ext_type}")
+    type_id, *values = decode(data)
+    return _build_model(type_id, values)
+
+def _py_decode(data: bytes) -> Any:
+    reader = _Reader(bytes(data))
+    value = _unpack(reader)
+    if reader.pos != len(reader.data):
+        raise ValueError("Trailing data after MessagePack value")
+    return value
+
+# --- public API -------------------------------------------------------------
+
+def _load_msgpack() -> Any:
+    try:
+        import msgpack # type: ignore [import-not-found]
+    except ImportError:
+        return None
+    return msgpack
+
+_msgpack = _load_msgpack()
+
+def implementation() -> str:
+    """Which encoder is in use: "msgpack" (C extension) or "python\""""
+    return "msgpack" if _msgpack is not None else "python"
+
+def _ext_default(obj: Any) -> Any:
+    if type(obj) in _models_by_type:
+        return _msgpack.ExtType(MODEL_EXT, _msgpack.packb(
+            [_models_by_type[type(obj)], *_model_fields(obj)], use_bin_type=True, default=_ext_default
+        ))
+    raise TypeError(f"Cannot encode {type(obj).__name__}")
+
+def encode(obj: Any) -> bytes:
+    """Encode a value (plain data and registered models) as MessagePack"""
+    if _msgpack is not None:
+        return _msgpack.packb(obj, use_bin_type=True, default=_ext_default)
+    return _py_encode(obj)
+
+def decode(data: bytes) -> Any:
+    """Decode MessagePack written by ``encode`` (or any MessagePack writer)"""
+    if _msgpack is not None:
+        return _msgpack.unpackb(data, raw=False, strict_map_key=False, ext_hook=_ext_hook)
+    return _py_decode(data)
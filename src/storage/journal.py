@@ -0,0 +1,137 @@
+"""
+Step journal: outputs of completed pipeline stages, so a retried task resumes.
+
+Each completed stage of a task (``research.gather``, ``research.analyze``,
+``planning.plan``, or a whole ``subtask.<id>``) is recorded under the task's
+journal key before the next stage starts. When the task is run again after
+a failure or timeout, stages found in the journal return their recorded
+output instead of calling the LLM, so the retry only pays for the stages
+that did not finish. A task's entries are cleared once it completes, and
+entries older than the TTL are pruned on open.
+
+Outputs are stored with the MessagePack codec (``src.storage.codec``) in an
+SQLite table; each record is committed before the stage returns.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from config.settings import JOURNAL_CONFIG
+from src.utils.helpers import task_content_hash
+from . import codec
+
+def journal_key(task: Dict[str, Any]) -> str:
+    """The key a task's steps are journaled under: its ``journal_key``, its id, or its content hash"""
+    if task.get("journal_key"):
+        return str(task["journal_key"])
+    if "id" in task:
+        return str(task["id"])
+    return task_content_hash(task)
+
+class StepJournal:
+    """Durable per-task record of completed stage outputs, keyed by task and stage"""
+
+    def __init__(self, path: str = "", ttl: Optional[float] = None):
+        self.path = path
+        self.ttl = ttl
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(path, "steps.sqlite3"), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        else:
+            # No path: the journal only survives retries within this process
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS steps (
+                task_key TEXT,
+                stage TEXT,
+                output BLOB,
+                recorded_at REAL,
+                PRIMARY KEY (task_key, stage)
+            )"""
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "resumed": 0, "cleared": 0, "pruned": 0}
+        self.prune()
+
+    def get(self, task_key: str, stage: str) -> Optional[Any]:
+        """The recorded output of a stage, or None if it has not completed"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output FROM steps WHERE task_key = ? AND stage = ?", (task_key, stage)
+            ).fetchone()
+            if row is None:
+                return None
+            self._stats["resumed"] += 1
+        return codec.decode(row[0])
+
+    def record(self, task_key: str, stage: str, output: Any) -> None:
+        """Record a completed stage's output (replacing an earlier one)"""
+        data = codec.encode(output)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO steps (task_key, stage, output, recorded_at) VALUES (?, ?, ?, ?)",
+                (task_key, stage, data, time.time())
+            )
+            self._db.commit()
+            self._stats["recorded"] += 1
+
+    def steps(self, task_key: str) -> Dict[str, Any]:
+        """Every recorded stage output of a task, by stage"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT stage, output FROM steps WHERE task_key = ? ORDER BY recorded_at", (task_key,)
+            ).fetchall()
+        return {stage: codec.decode(output) for stage, output in rows}
+
+    def clear(self, task_key: str) -> int:
+        """Forget a task's steps (once it has completed); returns how many were removed"""
+        with self._lock:
+            removed = self._db.execute("DELETE FROM steps WHERE task_key = ?", (task_key,)).rowcount
+            self._db.commit()
+            self._stats["cleared"] += removed
+        return removed
+
+    def prune(self) -> int:
+        """Remove steps older than the TTL; returns how many were removed"""
+        if not self.ttl:
+            return 0
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM steps WHERE recorded_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            self._db.commit()
+            self._stats["pruned"] += removed
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM steps").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get recorded/resumed/cleared counts and the number of pending steps"""
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["pending"] = len(self)
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+_default_journal: Optional[StepJournal] = None
+
+def get_default_journal() -> Optional[StepJournal]:
+    """Get the process-wide journal built from JOURNAL_CONFIG (None when disabled)"""
+    global _default_journal
+    if _default_journal is None and JOURNAL_CONFIG["enabled"]:
+        _default_journal = StepJournal(JOURNAL_CONFIG["path"], ttl=JOURNAL_CONFIG["ttl"])
+    return _default_journal
+
+def set_default_journal(journal: Optional[StepJournal]) -> None:
+    """Replace the process-wide journal"""
+    global _default_journal
+    _default_journal = journal
@@ -0,0 +1,355 @@
+"""
+Append-only result store: compressed segment files plus an SQLite index.
+
+Each result is written as one frame at the end of the active segment file:
+
+    magic (4 bytes) | payload length (uint32) | crc32 (uint32) | zlib(JSON payload)
+
+The index maps task ids and task-content hashes to (segment, offset, length),
+so a lookup is one index query plus one memory-mapped read. Rewriting a task
+appends a new frame and repoints the index; old frames stay on disk.
+
+The index is committed after the frame is flushed. On open, frames written
+after the last committed position (a crash between the two) are re-indexed,
+and a torn frame at the end of the segment is truncated away.
+
+A store has a single writer: open it from one process at a time.
+"""
+import argparse
+import glob
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Any, List, Optional, Tuple, Iterator, Iterable
+
+from config.settings import RESULT_STORE_CONFIG
+from src.utils.helpers import load_task_result, task_content_hash
+
+MAGIC = b"RSF1"
+HEADER = struct.Struct("<4sII")
+SEGMENT_FORMAT = "segment-{:06d}.log"
+
+def encode_frame(payload: Dict[str, Any], level: int = 6) -> bytes:
+    """Serialise one record as a checksummed, compressed frame"""
+    body = zlib.compress(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"), level)
+    return HEADER.pack(MAGIC, len(body), zlib.crc32(body)) + body
+
+def decode_frame(buffer: Any, offset: int) -> Tuple[Dict[str, Any], int]:
+    """Decode the frame at ``offset``; returns the payload and the frame's total size
+
+    Raises ValueError on a torn or corrupt frame.
+    """
+    header = bytes(buffer[offset:offset + HEADER.size])
+    if len(header) < HEADER.size:
+        raise ValueError(f"Truncated frame header at offset {offset}")
+    magic, length, crc = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"Bad frame magic at offset {offset}")
+    body = bytes(buffer[offset + HEADER.size:offset + HEADER.size + length])
+    if len(body) < length or zlib.crc32(body) != crc:
+        raise ValueError(f"Truncated or corrupt frame at offset {offset}")
+    return json.loads(zlib.decompress(body)), HEADER.size + length
+
+class ResultStore:
+    """Task results in compressed, append-only segments, indexed by task id and content hash"""
+
+    def __init__(
+        self,
+        path: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        compression_level: int = 6
+    ):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.compression_level = compression_level
+
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        # segment number -> (mmap, mapped size); remapped when the segment grows
+        self._maps: Dict[int, Tuple[mmap.mmap, int]] = {}
+
+        self._stats = {
+            "writes": 0,
+            "reads": 0,
+            "bytes_written": 0,
+            "recovered": 0,
+            "truncated_bytes": 0
+        }
+
+        self._db = sqlite3.connect(os.path.join(path, "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                task_id TEXT PRIMARY KEY,
+                content_hash TEXT,
+                status TEXT,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_content_hash ON results (content_hash)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_position ON results (segment, offset)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS position (id INTEGER PRIMARY KEY CHECK (id = 0), segment INTEGER, end INTEGER)")
+        self._db.commit()
+
+        self._segment, self._end = self._recover()
+        self._file = open(self._segment_path(self._segment), "ab")
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, SEGMENT_FORMAT.format(segment))
+
+    def _segments(self) -> List[int]:
+        """Segment numbers on disk, oldest first"""
+        names = glob.glob(os.path.join(self.path, SEGMENT_FORMAT.replace("{:06d}", "*")))
+        return sorted(int(os.path.basename(name)[8:14]) for name in names)
+
+    def _recover(self) -> Tuple[int, int]:
+        """Index frames written after the last committed position; returns the write position"""
+        row = self._db.execute("SELECT segment, end FROM position WHERE id = 0").fetchone()
+        segment, end = row if row else (1, 0)
+        segments = [number for number in self._segments() if number >= segment] or [segment]
+
+        for number in segments:
+            path = self._segment_path(number)
+            start = end if number == segment else 0
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read()
+            offset = 0
+            while offset < len(data):
+                try:
+                    payload, size = decode_frame(data, offset)
+                except ValueError:
+                    # A frame torn by a crash; everything after it is unreachable
+                    self._stats["truncated_bytes"] += len(data) - offset
+                    with open(path, "r+b") as f:
+                        f.truncate(start + offset)
+                    break
+                self._index(payload, number, start + offset, size)
+                self._stats["recovered"] += 1
+                offset += size
+            segment, end = number, start + offset
+        self._set_position(segment, end)
+        self._db.commit()
+        return segment, end
+
+    def _index(self, payload: Dict[str, Any], segment: int, offset: int, length: int) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (task_id, content_hash, status, segment, offset, length, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (payload["task_id"], payload.get("content_hash"), payload["result"].get("status"),
+             segment, offset, length, payload["created_at"])
+        )
+
+    def _set_position(self, segment: int, end: int) -> None:
+        self._db.execute("INSERT OR REPLACE INTO position (id, segment, end) VALUES (0, ?, ?)", (segment, end))
+
+    def _append(self, task_id: str, result: Dict[str, Any], task: Optional[Dict[str, Any]]) -> None:
+        """Write one frame and stage its index entry (caller commits)"""
+        payload = {
+            "task_id": task_id,
+            "content_hash": task_content_hash(task) if task is not None else None,
+            "created_at": time.time(),
+            "result": result
+        }
+        frame = encode_frame(payload, self.compression_level)
+        if self._end and self._end + len(frame) > self.segment_bytes:
+            self._file.close()
+            self._segment, self._end = self._segment + 1, 0
+            self._file = open(self._segment_path(self._segment), "ab")
+
+        self._file.write(frame)
+        self._index(payload, self._segment, self._end, len(frame))
+        self._end += len(frame)
+        self._stats["writes"] += 1
+        self._stats["bytes_written"] += len(frame)
+
+    def put(self, result: Dict[str, Any], task: Optional[Dict[str, Any]] = None, task_id: Optional[str] = None) -> str:
+        """Store a result (replacing any earlier one for the task); returns its task id
+
+        ``task_id`` defaults to ``result["task_id"]``. Passing the task enables
+        ``find_by_task`` lookups on its content.
+        """
+        return self.put_many([(result, task, task_id)])[0]
+
+    def put_many(self, items: Iterable[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]]) -> List[str]:
+        """Store several results with a single index commit"""
+        records = []
+        for result, task, task_id in items:
+            task_id = task_id or result.get("task_id")
+            if not task_id:
+                raise ValueError("Result has no task_id")
+            records.append((task_id, result, task))
+
+        with self._lock:
+            for task_id, result, task in records:
+                self._append(task_id, result, task)
+            self._file.flush()
+            self._set_position(self._segment, self._end)
+            self._db.commit()
+        return [task_id for task_id, _, _ in records]
+
+    def _read(self, segment: int, offset: int, length: int) -> Dict[str, Any]:
+        """Read one frame through the segment's memory map"""
+        mapped = self._maps.get(segment)
+        if mapped is None or offset + length > mapped[1]:
+            if mapped is not None:
+                mapped[0].close()
+            with open(self._segment_path(segment), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                mapped = (mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ), size)
+            self._maps[segment] = mapped
+        self._stats["reads"] += 1
+        payload, _ = decode_frame(mapped[0], offset)
+        return payload
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Latest result for a task id, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT segment, offset, length FROM results WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            return self._read(*row)["result"] if row else None
+
+    def find_by_task(self, task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Most recent result stored for a task with the same content, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT segment, offset, length FROM results WHERE content_hash = ? "
+                "ORDER BY created_at DESC LIMIT 1", (task_content_hash(task),)
+            ).fetchone()
+            return self._read(*row)["result"] if row else None
+
+    def __contains__(self, task_id: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM results WHERE task_id = ?", (task_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def iter_results(self, status: Optional[str] = None, batch_size: int = 256) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(task_id, result)`` for the latest result of every task, in write order
+
+        Rows are fetched ``batch_size`` at a time, so memory stays flat however
+        large the store is.
+        """
+        query = "SELECT task_id, segment, offset, length FROM results WHERE (segment, offset) > (?, ?)"
+        if status is not None:
+            query += " AND status = ?"
+        query += " ORDER BY segment, offset LIMIT ?"
+
+        # Keyset pagination: resume after the last frame seen
+        position = (-1, -1)
+        while True:
+            params = position + ((status,) if status is not None else ()) + (batch_size,)
+            with self._lock:
+                rows = self._db.execute(query, params).fetchall()
+                batch = [(task_id, self._read(segment, offset, length)["result"])
+                         for task_id, segment, offset, length in rows]
+            yield from batch
+            if len(rows) < batch_size:
+                return
+            position = (rows[-1][1], rows[-1][2])
+
+    def close(self) -> None:
+        """Flush and close the segment file, memory maps and index"""
+        with self._lock:
+            for mapped, _ in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            if not self._file.closed:
+                self._file.close()
+            self._db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write/read counters and on-disk size"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["results"] = len(self)
+            stats["segments"] = len(self._segments())
+            stats["disk_bytes"] = sum(os.path.getsize(self._segment_path(number)) for number in self._segments())
+            return stats
+
+def migrate_json_results(source: str, store: ResultStore, batch_size: int = 500) -> Dict[str, int]:
+    """Import results saved by ``save_task_result`` (a JSON/MessagePack file or a directory of them)
+
+    The task id is the result's ``task_id``, else the file name. A result
+    saved with its ``task`` (see ``RESULT_JSON_DIR``) is indexed by the
+    task's content too. Results already in the store are skipped, so an
+    interrupted migration can rerun.
+    """
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, "*.json")) + glob.glob(os.path.join(source, "*.msgpack")))
+    else:
+        paths = [source]
+    counts = {"imported": 0, "skipped": 0, "failed": 0}
+    batch: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]] = []
+    for path in paths:
+        try:
+            result = load_task_result(path)
+        except ValueError:  # bad JSON or MessagePack, or undecodable text
+            result = None
+        if not isinstance(result, dict):
+            counts["failed"] += 1
+            continue
+        task_id = str(result.get("task_id") or os.path.splitext(os.path.basename(path))[0])
+        if task_id in store:
+            counts["skipped"] += 1
+            continue
+        task = result.pop("task", None)
+        batch.append((result, task if isinstance(task, dict) else None, task_id))
+        if len(batch) >= batch_size:
+            counts["imported"] += len(store.put_many(batch))
+            batch = []
+    if batch:
+        counts["imported"] += len(store.put_many(batch))
+    return counts
+
+_default_store: Optional[ResultStore] = None
+
+def get_default_result_store() -> ResultStore:
+    """Get the process-wide result store, opened at RESULT_STORE_CONFIG["path"]"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ResultStore(
+            RESULT_STORE_CONFIG["path"],
+            segment_bytes=RESULT_STORE_CONFIG["segment_bytes"],
+            compression_level=RESULT_STORE_CONFIG["compression_level"]
+        )
+    return _default_store
+
+def set_default_result_store(store: Optional[ResultStore]) -> None:
+    """Replace the process-wide result store"""
+    global _default_store
+    _default_store = store
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import saved JSON task results into a result store")
+    parser.add_argument("source", help="JSON result file or directory of them")
+    parser.add_argument("--store", default=RESULT_STORE_CONFIG["path"], help="result store directory")
+    args = parser.parse_args()
+
+    store = ResultStore(args.store)
+    try:
+        counts = migrate_json_results(args.source, store)
+        stats = store.get_stats()
+    finally:
+        store.close()
+    print(f"✓ Imported {counts['imported']} results ({counts['skipped']} already stored, {counts['failed']} unreadable); "
+          f"{stats['results']} results in {stats['disk_bytes']} bytes")
+    return 1 if counts["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,11 @@
+import hashlib
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union, TYPE_CHECKING
 from datetime import datetime, timedelta
 
+if TYPE_CHECKING:
+    from src.agents.results import TaskResult
+
 def format_task_description(task: Dict[str, Any]) -> str:
     """Format a task dictionary into a readable string"""
     parts = []
@@ -26,9 +30,15 @@ def format_task_description(task: Dict[str, Any]) -> str:
     
     return "\n".join(parts)
 
+def task_content_hash(task: Dict[str, Any]) -> str:
+    """Hash of what a task asks for, ignoring its id, so reruns of the same task match"""
+    content = {key: value for key, value in task.items() if key not in ("id", "task_id")}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 def calculate_task_metrics(task_result: Dict[str, Any]) -> Dict[str, Any]:
     """Calculate metrics from a task result"""
-    metrics = {
+    metrics: Dict[str, Any] = {
         "completion_time": None,
         "success_rate": 0.0,
         "complexity_score": 0
@@ -39,6 +49,24 @@ def calculate_task_metrics(task_result: Dict[str, Any]) -> Dict[str, Any]:
         start = datetime.fromisoformat(task_result["start_time"])
         end = datetime.fromisoformat(task_result["end_time"])
         metrics["completion_time"] = str(end - start)
+        metrics["duration_seconds"] = (end - start).total_seconds()
+    
+    # Per-agent wall time and the critical path recorded by the scheduler
+    agent_seconds = {
+        subtask["agent"]: subtask["elapsed"]
+        for subtask in task_result.get("subtask_results", [])
+        if "agent" in subtask and subtask.get("elapsed") is not None
+    }
+    if agent_seconds:
+        metrics["agent_seconds"] = agent_seconds
+    if "timing" in task_result:
+        metrics["critical_path_seconds"] = task_result["timing"].get("critical_path_seconds")
+    
+    # LLM totals from the task's trace
+    trace = task_result.get("trace", {})
+    for key in ("llm_calls", "cached_calls", "coalesced_calls", "llm_seconds", "queue_wait", "prompt_tokens", "completion_tokens"):
+        if key in trace:
+            metrics[key] = trace[key]
     
     # Calculate success rate based on subtask results
     subtasks = task_result.get("subtask_results", [])
@@ -93,15 +121,29 @@ def format_duration(seconds: float) -> str:
     
     return " ".join(parts)
 
-def save_task_result(result: Dict[str, Any], filepath: str) -> None:
-    """Save a task result to a JSON file"""
+def save_task_result(result: Union[Dict[str, Any], "TaskResult"], filepath: str) -> None:
+    """Save a task result: compact MessagePack for a ``.msgpack`` path, else compact JSON"""
+    from src.agents.results import TaskResult
+    if filepath.endswith(".msgpack"):
+        from src.storage import codec
+        model = result if isinstance(result, TaskResult) else TaskResult.from_dict(result)
+        with open(filepath, 'wb') as f:
+            f.write(codec.encode(model))
+        return
+    if isinstance(result, TaskResult):
+        result = result.to_dict()
     with open(filepath, 'w') as f:
-        json.dump(result, f, indent=2)
+        json.dump(result, f, ensure_ascii=False, separators=(",", ":"))
 
 def load_task_result(filepath: str) -> Optional[Dict[str, Any]]:
-    """Load a task result from a JSON file"""
+    """Load a task result saved by ``save_task_result`` (MessagePack or JSON)"""
     try:
+        if filepath.endswith(".msgpack"):
+            from src.storage import codec
+            with open(filepath, 'rb') as f:
+                result = codec.decode(f.read())
+            return result.to_dict() if hasattr(result, "to_dict") else result
         with open(filepath, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
-        return None 
\ No newline at end of file
+        return None
@@ -0,0 +1,225 @@
+"""
+Incremental parsing of LLM markdown into a typed section tree.
+
+``SectionParser`` is fed text as it streams in and only ever looks at each
+complete line once; a partial last line waits in a buffer for the next
+chunk. Sections are returned from ``feed`` as soon as they close, so a
+consumer can act on "1. Technical Requirements" while the rest of the plan
+is still being generated.
+
+Section headings are markdown headings (``## Risks``), bold numbered lines
+(``**2. Implementation Steps**``) and unindented numbered lines that start
+the first section or continue the numbering of the open one. Other numbered
+lines are steps, and ``-``/``*``/``+`` lines are bullets; indented items
+nest under the item above them.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Iterable
+
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+BOLD_NUMBERED = re.compile(r"^\*\*\s*(\d+)[.)]\s+(.*?)\s*\*\*\s*:?\s*$")
+NUMBERED = re.compile(r"^(\s*)(\d+)[.)]\s+(.*)$")
+BULLET = re.compile(r"^(\s*)[-*+•]\s+(.*)$")
+TITLE_NUMBER = re.compile(r"^(?:step\s+)?(\d+)[.):]\s*(.*)$", re.IGNORECASE)
+
+def clean_title(text: str) -> str:
+    """Strip emphasis markers and a trailing colon from a heading"""
+    return text.strip().strip("*_").strip().rstrip(":").strip()
+
+@dataclass
+class Item:
+    """A numbered step or a bullet, with the items nested under it"""
+    text: str
+    kind: str  # "step" | "bullet"
+    number: Optional[int] = None
+    children: List["Item"] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "kind": self.kind,
+            "number": self.number,
+            "children": [child.to_dict() for child in self.children]
+        }
+
+@dataclass
+class Section:
+    """A heading with its text, steps, bullets and subsections"""
+    title: str
+    level: int
+    number: Optional[int] = None
+    numbered: bool = False  # opened by a "N. Title" line rather than a markdown heading
+    lines: List[str] = field(default_factory=list)
+    paragraphs: List[str] = field(default_factory=list)
+    items: List[Item] = field(default_factory=list)
+    children: List["Section"] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """The section's own lines (heading included, subsections excluded)"""
+        return "\n".join(self.lines).strip()
+
+    @property
+    def steps(self) -> List[Item]:
+        return [item for item in self.items if item.kind == "step"]
+
+    @property
+    def bullets(self) -> List[Item]:
+        return [item for item in self.items if item.kind == "bullet"]
+
+    def find(self, title: str) -> Optional["Section"]:
+        """First subsection (depth first) whose title contains ``title``, case-insensitively"""
+        return find_section(self.children, title)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "level": self.level,
+            "number": self.number,
+            "paragraphs": list(self.paragraphs),
+            "items": [item.to_dict() for item in self.items],
+            "children": [child.to_dict() for child in self.children]
+        }
+
+def find_section(sections: Iterable[Section], title: str) -> Optional[Section]:
+    """First section (depth first) whose title contains ``title``, case-insensitively"""
+    needle = title.lower()
+    for section in sections:
+        if needle in section.title.lower():
+            return section
+        found = find_section(section.children, title)
+        if found is not None:
+            return found
+    return None
+
+class SectionParser:
+    """Builds a section tree from markdown fed in arbitrary chunks"""
+
+    def __init__(self):
+        # Level 0 holds text before the first heading
+        self.root = Section(title="", level=0)
+        self._open: List[Section] = [self.root]
+        self._items: List[tuple] = []  # (indent, item) of the open item chain
+        self._pending = ""
+        self._closed = False
+
+    @property
+    def sections(self) -> List[Section]:
+        """Top-level sections parsed so far (the last ones may still be open)
+
+        Text before the first heading becomes an untitled level-0 section.
+        """
+        root = self.root
+        if root.paragraphs or root.items:
+            preamble = Section(title="", level=0, lines=root.lines, paragraphs=root.paragraphs, items=root.items)
+            return [preamble] + root.children
+        return list(root.children)
+
+    def feed(self, chunk: str) -> List[Section]:
+        """Parse the complete lines in ``chunk``; returns the sections that closed"""
+        if self._closed:
+            raise ValueError("Parser is closed")
+        self._pending += chunk
+        *lines, self._pending = self._pending.split("\n")
+        closed: List[Section] = []
+        for line in lines:
+            self._line(line.rstrip("\r"), closed)
+        return closed
+
+    def close(self) -> List[Section]:
+        """Parse the last partial line and close every open section"""
+        closed: List[Section] = []
+        if not self._closed:
+            if self._pending:
+                self._line(self._pending, closed)
+                self._pending = ""
+            self._close_to(0, closed)
+            self._closed = True
+        return closed
+
+    def _close_to(self, level: int, closed: List[Section]) -> None:
+        """Close open sections at ``level`` or deeper"""
+        while len(self._open) > 1 and self._open[-1].level >= level:
+            closed.append(self._open.pop())
+        self._items = []
+
+    def _open_section(self, section: Section, line: str, closed: List[Section]) -> None:
+        self._close_to(section.level, closed)
+        self._open[-1].children.append(section)
+        self._open.append(section)
+        section.lines.append(line)
+
+    def _heading(self, line: str) -> Optional[Section]:
+        """The section a line opens, if it is a heading"""
+        current = self._open[-1]
+        match = HEADING.match(line)
+        if match:
+            title = clean_title(match.group(2))
+            number_match = TITLE_NUMBER.match(title)
+            number = int(number_match.group(1)) if number_match else None
+            if number_match and number_match.group(2):
+                title = clean_title(number_match.group(2))
+            return Section(title=title, level=len(match.group(1)), number=number)
+
+        bold = BOLD_NUMBERED.match(line)
+        if bold:
+            number, title = int(bold.group(1)), bold.group(2)
+        else:
+            numbered = NUMBERED.match(line)
+            if not numbered or numbered.group(1):
+                return None
+            number, title = int(numbered.group(2)), numbered.group(3)
+            # A plain "N. Title" only starts a section where it cannot be a
+            # step; continuing the open section's own step list wins
+            steps = current.steps
+            starts = current is self.root and not current.items
+            continues = (current.numbered and number == (current.number or 0) + 1
+                         and not (steps and steps[-1].number == number - 1))
+            if not (starts or continues):
+                return None
+        # Numbered sections sit one level below the enclosing markdown heading
+        parent = next(section for section in reversed(self._open) if not section.numbered)
+        return Section(title=clean_title(title), level=parent.level + 1, number=number, numbered=True)
+
+    def _line(self, line: str, closed: List[Section]) -> None:
+        section = self._heading(line)
+        if section is not None:
+            self._open_section(section, line, closed)
+            return
+
+        current = self._open[-1]
+        current.lines.append(line)
+        if not line.strip():
+            return
+
+        match = NUMBERED.match(line) or BULLET.match(line)
+        if match is None:
+            indent = len(line) - len(line.lstrip())
+            if self._items and indent > self._items[-1][0]:
+                # Continuation of the item above
+                self._items[-1][1].text += " " + line.strip()
+            else:
+                self._items = []
+                current.paragraphs.append(line.strip())
+            return
+
+        indent = len(match.group(1))
+        if match.re is NUMBERED:
+            item = Item(text=match.group(3).strip(), kind="step", number=int(match.group(2)))
+        else:
+            item = Item(text=match.group(2).strip(), kind="bullet")
+        while self._items and self._items[-1][0] >= indent:
+            self._items.pop()
+        if self._items:
+            self._items[-1][1].children.append(item)
+        else:
+            current.items.append(item)
+        self._items.append((indent, item))
+
+def parse_sections(text: str) -> List[Section]:
+    """Parse a complete markdown text into its top-level sections"""
+    parser = SectionParser()
+    parser.feed(text)
+    parser.close()
+    return parser.sections
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Dict, Any, Callable, Awaitable, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class _Flight:
+    """One in-flight computation and the number of callers waiting on it"""
+
+    __slots__ = ("task", "waiters", "abandoned")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+        self.abandoned = False
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one computation
+
+    The first caller for a key starts the computation as its own asyncio
+    task; callers arriving while it runs wait on that task and receive the
+    same result or exception. A caller that is cancelled only stops
+    waiting: the computation keeps running for the others, and is cancelled
+    once no caller is left waiting on it. Nothing is kept after the
+    computation finishes; this is deduplication, not caching.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced": 0,
+            "abandoned": 0
+        }
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run ``fn`` once per key at a time; returns ``(result, joined)``
+
+        ``joined`` is True for callers that attached to a computation
+        another caller started.
+        """
+        self._stats["calls"] += 1
+        flight = self._flights.get(key)
+        if flight is not None and (flight.abandoned or flight.task.get_loop() is not asyncio.get_running_loop()):
+            # Being cancelled (or stranded on a closed loop); start afresh
+            flight = None
+        joined = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            self._stats["executions"] += 1
+            flight.task.add_done_callback(lambda _: self._finished(key, flight))
+        else:
+            self._stats["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            # shield: cancelling this caller must not cancel the shared task
+            return await asyncio.shield(flight.task), joined
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                # The last waiter went away; nobody wants the result
+                flight.abandoned = True
+                flight.task.cancel()
+                self._stats["abandoned"] += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finished(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Retrieve the exception so an abandoned failure is not logged as unhandled
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def in_flight(self) -> int:
+        """Number of distinct computations currently running"""
+        return len(self._flights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call, execution and coalescing counters"""
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["in_flight"] = len(self._flights)
+        return stats
+
+_default_single_flight = SingleFlight()
+
+def get_default_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group for LLM calls"""
+    return _default_single_flight
+
+def set_default_single_flight(group: SingleFlight) -> None:
+    """Replace the process-wide single-flight group"""
+    global _default_single_flight
+    _default_single_flight = group
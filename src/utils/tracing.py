@@ -0,0 +1,349 @@
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+from config.settings import TRACING_CONFIG
+
+@dataclass
+class Span:
+    """A timed unit of work (an agent invocation or an LLM call) within a trace
+
+    ``trace_id`` is the id of the task at the root of the trace, so every
+    agent invocation and LLM call made for one task shares it.
+    """
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent: Optional["Span"] = field(default=None, repr=False)
+    start: float = field(default_factory=time.time)
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    totals: Dict[str, float] = field(default_factory=dict)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+    _finished: Optional[float] = field(default=None, repr=False)
+    _last_llm_end: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self._finished is None:
+            return None
+        return self._finished - self._started
+
+    def elapsed(self) -> float:
+        """Seconds since the span started"""
+        return time.perf_counter() - self._started
+
+    def since_last_llm_call(self) -> Optional[float]:
+        """Seconds since the last LLM call inside this span finished (None if there was none)"""
+        if self._last_llm_end is None:
+            return None
+        return time.perf_counter() - self._last_llm_end
+
+    def set(self, **attributes: Any) -> None:
+        """Set span attributes"""
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float) -> None:
+        """Accumulate a numeric attribute"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form of a finished span"""
+        record = {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "start": self.start,
+            "end": self.end,
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "attributes": self.attributes
+        }
+        if self.totals:
+            record["totals"] = {key: round(value, 6) for key, value in self.totals.items()}
+        return record
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    """Get the innermost span open in the current coroutine"""
+    return _current_span.get()
+
+def record_queue_wait(seconds: float) -> None:
+    """Charge time spent waiting for an LLM slot to the current span"""
+    span = _current_span.get()
+    if span is not None:
+        span.add("queue_wait", seconds)
+
+class JsonlSink:
+    """Appends each finished span to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+class Histogram:
+    """Prometheus-style cumulative histogram, one series per label set"""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}
+
+    def observe(self, labels: Dict[str, str], value: float) -> None:
+        # Per-bucket counts (the last one is +Inf), then the sum; made cumulative on render
+        series = self._series.setdefault(tuple(sorted(labels.items())), [0.0] * (len(self.BUCKETS) + 2))
+        series[bisect_left(self.BUCKETS, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._series.items():
+            counts = list(accumulate(series[:-1]))
+            for bound, count in zip(self.BUCKETS, counts):
+                lines.append(f"{self.name}_bucket{_labels(labels, le=str(bound))} {count:g}")
+            lines.append(f"{self.name}_bucket{_labels(labels, le='+Inf')} {counts[-1]:g}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(labels)} {counts[-1]:g}")
+        return lines
+
+class Counter:
+    """Prometheus-style counter, one series per label set"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, labels: Dict[str, str], amount: float = 1) -> None:
+        key = tuple(sorted(labels.items()))
+        self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in self._series.items():
+            lines.append(f"{self.name}{_labels(labels)} {value:g}")
+        return lines
+
+def _labels(labels: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    """Render a Prometheus label set"""
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class MetricsSink:
+    """Aggregates finished spans into Prometheus metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.agent_tasks = Counter("agent_tasks_total", "Agent invocations by outcome")
+        self.agent_seconds = Histogram("agent_task_seconds", "Agent invocation wall time")
+        self.agent_queue_wait = Histogram("agent_queue_wait_seconds", "Time waiting for an agent concurrency slot")
+        self.post_processing = Histogram("agent_post_processing_seconds", "Time after the last LLM response of an invocation")
+        self.llm_calls = Counter("llm_calls_total", "LLM calls (including cache hits)")
+        self.llm_latency = Histogram("llm_latency_seconds", "LLM call latency excluding queue wait")
+        self.llm_queue_wait = Histogram("llm_queue_wait_seconds", "Time waiting for rate-limiter capacity")
+        self.ttft = Histogram("llm_time_to_first_token_seconds", "Time to first token")
+        self.priority_latency = Histogram("llm_priority_latency_seconds", "LLM call latency including queue wait, by task priority")
+        self.prompt_tokens = Counter("llm_prompt_tokens_total", "Estimated prompt tokens sent")
+        self.completion_tokens = Counter("llm_completion_tokens_total", "Estimated completion tokens received")
+        self.hedges = Counter("llm_hedges_total", "Backup requests fired for slow LLM calls, by which request answered first")
+        self._metrics = [
+            self.agent_tasks, self.agent_seconds, self.agent_queue_wait, self.post_processing,
+            self.llm_calls, self.llm_latency, self.llm_queue_wait, self.ttft, self.priority_latency,
+            self.prompt_tokens, self.completion_tokens, self.hedges
+        ]
+
+    def export(self, span: Span) -> None:
+        attributes = span.attributes
+        agent = {"agent": str(attributes.get("agent", ""))}
+        with self._lock:
+            if span.name == "agent":
+                self.agent_tasks.inc({**agent, "status": str(attributes.get("status", ""))})
+                self.agent_seconds.observe(agent, span.duration or 0.0)
+                self.agent_queue_wait.observe(agent, attributes.get("queue_wait", 0.0))
+                if "post_processing" in attributes:
+                    self.post_processing.observe(agent, attributes["post_processing"])
+            elif span.name.startswith("llm."):
+                labels = {**agent, "model": str(attributes.get("model", ""))}
+                self.llm_calls.inc({**labels, "kind": span.name[4:], "cached": str(bool(attributes.get("cached"))).lower()})
+                self.prompt_tokens.inc(labels, attributes.get("prompt_tokens", 0))
+                self.completion_tokens.inc(labels, attributes.get("completion_tokens", 0))
+                # Cache hits and coalesced calls made no request of their own
+                if not attributes.get("cached") and not attributes.get("coalesced"):
+                    self.llm_latency.observe(labels, attributes.get("llm_latency", 0.0))
+                    self.llm_queue_wait.observe(labels, attributes.get("queue_wait", 0.0))
+                    if "ttft" in attributes:
+                        self.ttft.observe(labels, attributes["ttft"])
+                    if attributes.get("hedged"):
+                        self.hedges.inc({**labels, "winner": "backup" if attributes.get("hedge_won") else "primary"})
+                    if "priority" in attributes:
+                        self.priority_latency.observe(
+                            {"priority": str(attributes["priority"])},
+                            attributes.get("queue_wait", 0.0) + attributes.get("llm_latency", 0.0)
+                        )
+
+    def render(self) -> str:
+        """Prometheus text exposition of all metrics"""
+        with self._lock:
+            lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the metrics to a file (atomically, for node_exporter's textfile collector)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> Any:
+        """Serve ``/metrics`` from a background thread; returns the server (call ``shutdown`` to stop)"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        sink = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = sink.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        return server
+
+class Tracer:
+    """Creates spans and hands finished ones to its sinks"""
+
+    def __init__(self, sinks: Optional[List[Any]] = None, enabled: bool = True):
+        self.enabled = enabled
+        self.metrics = MetricsSink()
+        self.sinks: List[Any] = [self.metrics] + list(sinks or [])
+        self.export_errors = 0
+
+    def add_sink(self, sink: Any) -> None:
+        """Export finished spans to another sink"""
+        self.sinks.append(sink)
+
+    @contextmanager
+    def span(self, name: str, trace_id: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+        """Open a span as a child of the current one
+
+        The span is exported when the block exits; an exception marks it
+        with ``status="error"`` and is re-raised.
+        """
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else (trace_id or uuid.uuid4().hex),
+            parent=parent,
+            attributes=attributes
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes.setdefault("status", "error")
+            span.attributes.setdefault("error", str(e) or e.__class__.__name__)
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Async generators closed from another task run in a different context
+                _current_span.set(parent)
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        span._finished = time.perf_counter()
+        span.end = time.time()
+
+        # Roll LLM call numbers up into every enclosing span (e.g. the task)
+        if span.name.startswith("llm."):
+            shared = span.attributes.get("cached") or span.attributes.get("coalesced")
+            rollup = {
+                "llm_calls": 0.0 if shared else 1.0,
+                "cached_calls": 1.0 if span.attributes.get("cached") else 0.0,
+                "coalesced_calls": 1.0 if span.attributes.get("coalesced") else 0.0,
+                "llm_seconds": span.attributes.get("llm_latency", 0.0),
+                "queue_wait": span.attributes.get("queue_wait", 0.0),
+                "prompt_tokens": span.attributes.get("prompt_tokens", 0),
+                "completion_tokens": span.attributes.get("completion_tokens", 0)
+            }
+            ancestor = span.parent
+            while ancestor is not None:
+                for key, value in rollup.items():
+                    ancestor.totals[key] = ancestor.totals.get(key, 0.0) + value
+                ancestor._last_llm_end = span._finished
+                ancestor = ancestor.parent
+
+        if not self.enabled:
+            return
+        for sink in self.sinks:
+            # Instrumentation must never fail the work it measures
+            try:
+                sink.export(span)
+            except Exception:
+                self.export_errors += 1
+
+    def close(self) -> None:
+        """Close sinks that hold resources"""
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close()
+
+_default_tracer: Optional[Tracer] = None
+
+def get_default_tracer() -> Tracer:
+    """Get the process-wide tracer shared by all agents"""
+    global _default_tracer
+    if _default_tracer is None:
+        sinks = [JsonlSink(TRACING_CONFIG["jsonl_path"])] if TRACING_CONFIG["jsonl_path"] else []
+        _default_tracer = Tracer(sinks=sinks, enabled=TRACING_CONFIG["enabled"])
+    return _default_tracer
+
+def set_default_tracer(tracer: Tracer) -> None:
+    """Replace the process-wide tracer"""
+    global _default_tracer
+    _default_tracer = tracer
@@ -0,0 +1,55 @@
+"""Stand-in chat models and agent setups shared by the tests"""
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+from src.llm.cache import LLMCache
+from src.llm.fake import FakeChatModel
+from src.agents.task_manager import TaskManagerAgent
+from src.agents.research_agent import ResearchAgent
+from src.agents.planning_agent import PlanningAgent
+
+class TextLLM:
+    """Stand-in chat model that answers every prompt with a fixed text, streamed a few characters at a time"""
+
+    def __init__(self, text: str, chunk_size: int = 7):
+        self.model = "test-model"
+        self.temperature = 0.7
+        self.text = text
+        self.chunk_size = chunk_size
+
+    async def agenerate(self, messages_list):
+        return SimpleNamespace(generations=[[SimpleNamespace(text=self.text)] for _ in messages_list])
+
+    async def astream(self, messages):
+        for i in range(0, len(self.text), self.chunk_size):
+            await asyncio.sleep(0)
+            yield SimpleNamespace(content=self.text[i:i + self.chunk_size])
+
+def make_manager(
+    llm: Any = None,
+    planning_llm: Any = None,
+    *,
+    semantic_index: Any = None,
+    tracer: Any = None,
+    journal: Any = None,
+    **fake_options: Any
+) -> TaskManagerAgent:
+    """Create a TaskManager with research and planning agents, each with a fresh cache
+
+    ``llm`` serves both agents unless ``planning_llm`` is given; without one,
+    each agent gets its own fake model (instant unless ``fake_options`` say
+    otherwise). A tracer or journal is shared by the manager and its agents.
+    """
+    manager = TaskManagerAgent(semantic_index=semantic_index)
+    research_agent = ResearchAgent(google_api_key="test-key", cache=LLMCache())
+    planning_agent = PlanningAgent(google_api_key="test-key", cache=LLMCache())
+    for agent, agent_llm in ((research_agent, llm), (planning_agent, planning_llm or llm)):
+        agent.llm = agent_llm if agent_llm is not None else FakeChatModel(**{"latency_mean": 0, **fake_options})
+        manager.register_agent(agent)
+    for member in (manager, research_agent, planning_agent):
+        if tracer is not None:
+            member.tracer = tracer
+        if journal is not None:
+            member.journal = journal
+    return manager
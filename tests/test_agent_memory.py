@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.research_agent import ResearchAgent
+from src.llm.cache import LLMCache
+from src.memory.store import MemoryStore, entry_size
+
+def test_lru_eviction_by_entries_and_bytes():
+    """Test that the least recently used entries go first under either budget"""
+    memory = MemoryStore(max_entries=3, max_bytes=None)
+    for key in "abc":
+        memory[key] = key
+    memory.get("a")
+    memory["d"] = "d"
+
+    assert list(memory) == ["c", "a", "d"]
+    assert memory.get("b") is None
+
+    sized = MemoryStore(max_entries=None, max_bytes=3 * entry_size("x" * 100))
+    for i in range(5):
+        sized.set(f"k{i}", "x" * 100)
+    stats = sized.get_stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= sized.max_bytes
+    assert stats["evictions"] == 2
+    assert stats["dropped"] == 2
+
+def test_ttl_expiry():
+    """Test that entries expire after their TTL, with per-entry overrides"""
+    memory = MemoryStore(ttl=0.05)
+    memory.set("short", 1)
+    memory.set("long", 2, ttl=60)
+    time.sleep(0.06)
+
+    assert memory.get("short") is None
+    assert memory.get("long") == 2
+    assert memory.get_stats()["expirations"] == 1
+
+def test_spill_and_transparent_reload(tmp_path):
+    """Test that evicted entries spill to disk and come back on read"""
+    memory = MemoryStore(max_entries=2, spill_path=str(tmp_path / "memory.sqlite3"), namespace="agent")
+    memory["a"] = {"findings": ["one"]}
+    memory["b"] = [1, 2, 3]
+    memory["c"] = "three"
+
+    assert memory.get_stats()["spill_entries"] == 1
+    assert "a" in memory and len(memory) == 3
+    assert memory["a"] == {"findings": ["one"]}
+
+    stats = memory.get_stats()
+    assert stats["reloads"] == 1
+    assert stats["spilled"] == 2  # reloading "a" pushed "b" out
+    assert stats["entries"] == 2
+
+    del memory["b"]
+    with pytest.raises(KeyError):
+        memory["b"]
+
+    # Namespaces sharing a spill file stay apart
+    other = MemoryStore(spill_path=str(tmp_path / "memory.sqlite3"), namespace="other")
+    assert len(other) == 0
+    memory.clear()
+    assert len(memory) == 0 and memory.get_stats()["spill_entries"] == 0
+
+def test_agent_memory_is_bounded():
+    """Test that agent memory uses the bounded store and reports its stats"""
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache())
+    assert isinstance(agent.state.memory, MemoryStore)
+    agent.state.memory = MemoryStore(max_entries=10)
+    for i in range(50):
+        agent.add_to_memory(f"note-{i}", i)
+
+    assert agent.get_from_memory("note-49") == 49
+    assert agent.get_from_memory("note-0") is None
+    assert agent.get_stats()["memory"]["evictions"] == 40
+
+    agent.clear_memory()
+    assert agent.get_stats()["memory"]["entries"] == 0
@@ -10,21 +10,28 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.agents.task_manager import TaskManagerAgent
 from src.agents.research_agent import ResearchAgent
 from src.agents.planning_agent import PlanningAgent
+from src.llm.cache import LLMCache
+from src.llm.clients import ClientRegistry, get_default_registry, set_default_registry
+from src.llm.fake import make_fake_factory
 from src.utils.helpers import validate_task_result, calculate_task_metrics
 
 @pytest.fixture
-async def task_manager():
-    """Fixture to create a configured TaskManagerAgent"""
+def task_manager():
+    """Fixture to create a configured TaskManagerAgent on the offline fake LLM backend"""
+    previous = get_default_registry()
+    set_default_registry(ClientRegistry(factory=make_fake_factory(latency_mean=0.001)))
+    
     manager = TaskManagerAgent()
     
     # Create and register test agents
-    research_agent = ResearchAgent(name="TestResearchAgent")
-    planning_agent = PlanningAgent(name="TestPlanningAgent")
+    research_agent = ResearchAgent(name="TestResearchAgent", cache=LLMCache())
+    planning_agent = PlanningAgent(name="TestPlanningAgent", cache=LLMCache())
     
     manager.register_agent(research_agent)
     manager.register_agent(planning_agent)
     
-    return manager
+    yield manager
+    set_default_registry(previous)
 
 @pytest.mark.asyncio
 async def test_task_manager_initialization(task_manager):
@@ -60,7 +67,7 @@ async def test_error_handling(task_manager):
     """Test error handling for invalid tasks"""
     invalid_task = {}  # Empty task should cause an error
     
-    with pytest.raises(Exception):
+    with pytest.raises(ValueError):
         await task_manager.process(invalid_task)
 
 @pytest.mark.asyncio
@@ -0,0 +1,71 @@
+import sys
+import os
+import pytest # type: ignore [import-untyped]
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.helpers import make_manager
+
+class BatchRecordingLLM:
+    """Stand-in chat model that records batch sizes and fails on 'FAIL' prompts"""
+
+    def __init__(self):
+        self.model = "test-model"
+        self.temperature = 0.7
+        self.batch_sizes = []
+
+    async def agenerate(self, messages_list):
+        self.batch_sizes.append(len(messages_list))
+        generations = []
+        for messages in messages_list:
+            content = messages[0].content
+            if "FAIL" in content:
+                raise RuntimeError("provider rejected prompt")
+            generations.append([SimpleNamespace(text=f"line one\nline two {hash(content)}")])
+        return SimpleNamespace(generations=generations)
+
+@pytest.mark.asyncio
+async def test_process_many_batches_llm_calls():
+    """Test that each agent stage issues one agenerate call per batch"""
+    llm = BatchRecordingLLM()
+    manager = make_manager(llm)
+    tasks = [{"description": f"task {i}"} for i in range(10)]
+
+    results = await manager.process_many(tasks, max_concurrency=2, batch_size=5)
+
+    assert len(results) == 10
+    assert all(result["status"] == "completed" for result in results)
+    # 2 batches x (gather + analyze + plan)
+    assert len(llm.batch_sizes) == 6
+    assert all(size == 5 for size in llm.batch_sizes)
+
+    # Results come back in input order
+    for i, result in enumerate(results):
+        assert result["research_results"]["research_query"].endswith(f"task {i}")
+
+@pytest.mark.asyncio
+async def test_process_many_isolates_task_errors():
+    """Test that a failing task reports an error without failing its batch"""
+    manager = make_manager(BatchRecordingLLM())
+    tasks = [{"description": "ok one"}, {"description": "FAIL"}, {"description": "ok two"}]
+
+    results = await manager.process_many(tasks, batch_size=3)
+
+    assert [result["status"] for result in results] == ["completed", "error", "completed"]
+    assert "provider rejected prompt" in results[1]["message"]
+
+@pytest.mark.asyncio
+async def test_process_many_rejects_invalid_tasks_without_running_them():
+    """Test that tasks failing validation get error results and stay out of the batches"""
+    llm = BatchRecordingLLM()
+    manager = make_manager(llm)
+    tasks = [{"description": "ok one"}, {"type": "research"}, "not a task", {"description": "ok two"}]
+
+    results = await manager.process_many(tasks, batch_size=4)
+
+    assert [result["status"] for result in results] == ["completed", "error", "error", "completed"]
+    assert results[1]["message"] == "Task must have a description"
+    # Only the two valid tasks went to the model, in one batch per stage
+    assert llm.batch_sizes == [2, 2, 2]
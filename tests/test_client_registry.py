@@ -0,0 +1,99 @@
+import sys
+import os
+import asyncio
+import pytest # type: ignore [import-untyped]
+from typing import Any, List, Tuple, Optional
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.clients import ClientRegistry, build_gemini_client, get_default_registry, set_default_registry
+from src.agents.research_agent import ResearchAgent
+from src.agents.planning_agent import PlanningAgent
+
+class FakeClient:
+    """Records warm-up and close calls instead of opening connections"""
+
+    def __init__(self, model: str, temperature: float, api_key: Optional[str], options: List[Tuple[str, Any]]):
+        self.model = model
+        self.temperature = temperature
+        self.api_key = api_key
+        self.options = dict(options)
+        self.warmed = False
+        self.closed = False
+
+    async def warm_up(self, timeout: float) -> None:
+        if self.api_key == "unreachable":
+            raise ConnectionError("endpoint unreachable")
+        self.warmed = True
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+@pytest.fixture
+def registry():
+    """Install a registry of fake clients as the process default"""
+    previous = get_default_registry()
+    registry = ClientRegistry(pool_size=2, factory=FakeClient)
+    set_default_registry(registry)
+    yield registry
+    set_default_registry(previous)
+
+def test_clients_are_pooled_per_key(registry):
+    """Test that the same key reuses a bounded pool and other keys get their own"""
+    first = registry.get("models/gemini-2.5-pro", 0.7, "key-a")
+    second = registry.get("models/gemini-2.5-pro", 0.7, "key-a")
+    third = registry.get("models/gemini-2.5-pro", 0.7, "key-a")
+
+    assert first is not second
+    assert third is first
+    assert registry.get("models/gemini-2.5-pro", 0.2, "key-a") not in (first, second)
+    assert registry.get("models/gemini-2.5-pro", 0.7, "key-b") not in (first, second)
+    assert registry.get_stats()["clients"] == 4
+    assert registry.get_stats()["reused"] == 1
+    assert first.options["grpc.keepalive_permit_without_calls"] == 1
+
+def test_agents_share_clients_from_config(registry):
+    """Test that agents take their client from the registry using GOOGLE_CONFIG defaults"""
+    from config.settings import GOOGLE_CONFIG
+
+    research = ResearchAgent(google_api_key="test-key")
+    planning = PlanningAgent(google_api_key="test-key")
+    research.llm
+    planning.llm
+    ResearchAgent(google_api_key="test-key").llm
+
+    assert research.llm.model == GOOGLE_CONFIG["model_name"]
+    assert research.llm.temperature == GOOGLE_CONFIG["temperature"]
+    assert registry.get_stats()["created"] == 2
+
+@pytest.mark.asyncio
+async def test_warm_up_and_close(registry):
+    """Test that warm-up fills the pool, tolerates failures and close releases clients"""
+    result = await registry.warm_up([(None, None, "key-a"), (None, None, "unreachable")])
+
+    assert result["clients"] == 4
+    assert result["ready"] == 2
+    assert result["errors"] == ["endpoint unreachable", "endpoint unreachable"]
+
+    clients = [registry.get(None, None, "key-a") for _ in range(2)]
+    assert all(client.warmed for client in clients)
+
+    await registry.close()
+    assert all(client.closed for client in clients)
+    assert registry.get_stats()["clients"] == 0
+
+@pytest.mark.asyncio
+async def test_gemini_client_reuses_async_channel():
+    """Test that the Gemini client builds its async channel once and rebuilds it after close"""
+    client = build_gemini_client("models/gemini-2.5-pro", 0.7, "test-key", [("grpc.keepalive_time_ms", 1234)])
+
+    first = client.async_client
+    assert client.async_client is first
+
+    await client.aclose()
+    assert client.async_client_running is None
+
+    second = client.async_client
+    assert second is not first
+    await client.aclose()
@@ -0,0 +1,93 @@
+import sys
+import os
+import asyncio
+import pytest # type: ignore [import-untyped]
+from typing import Dict, Any, Optional
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.base_agent import BaseAgent
+from src.agents.task_manager import TaskManagerAgent
+
+class ScriptedAgent(BaseAgent):
+    """Agent that returns a fixed result after a delay, or raises"""
+
+    def __init__(self, name: str, result: Dict[str, Any], delay: float = 0.0, error: Optional[str] = None):
+        super().__init__(name)
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.cancelled = False
+
+    async def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        async with self.task_context(task):
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            if self.error:
+                raise RuntimeError(self.error)
+            return self.result
+
+def make_manager(research_delay=0.0, plan_delay=0.0, plan_error=None):
+    """Create a TaskManager with scripted research and planning agents"""
+    manager = TaskManagerAgent()
+    research = ScriptedAgent("ResearchAgent", {"status": "completed", "research_query": "q"}, delay=research_delay)
+    planning = ScriptedAgent("PlanningAgent", {"status": "completed", "plan": {"steps": ["a"]}},
+                             delay=plan_delay, error=plan_error)
+    manager.register_agent(research)
+    manager.register_agent(planning)
+    return manager, research, planning
+
+@pytest.mark.asyncio
+async def test_slow_agent_keeps_finished_results():
+    """Test that a per-agent deadline returns partial results instead of an error"""
+    manager, _, planning = make_manager(plan_delay=5)
+
+    result = await manager.process({"description": "t"}, agent_timeouts={"PlanningAgent": 0.05})
+
+    assert result["status"] == "partial"
+    assert result["research_results"]["research_query"] == "q"
+    assert result["agent_status"]["ResearchAgent"]["status"] == "completed"
+    assert result["agent_status"]["PlanningAgent"]["status"] == "timed_out"
+    assert planning.cancelled
+    assert planning.get_stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_failed_agent_does_not_fail_task():
+    """Test that one agent's exception is reported per agent"""
+    manager, _, _ = make_manager(plan_error="model overloaded")
+
+    result = await manager.process({"description": "t"})
+
+    assert result["status"] == "partial"
+    assert result["agent_status"]["PlanningAgent"] == {
+        "status": "failed",
+        "error": "model overloaded",
+        "elapsed": result["agent_status"]["PlanningAgent"]["elapsed"]
+    }
+
+@pytest.mark.asyncio
+async def test_first_k_returns_early_and_cancels_stragglers():
+    """Test that first_k returns after K agents and cancels the rest"""
+    manager, _, planning = make_manager(plan_delay=5)
+    independent = [{"id": "research", "type": "research"}, {"id": "planning", "type": "planning"}]
+
+    result = await manager.process({"description": "t", "subtasks": independent}, first_k=1)
+
+    assert result["status"] == "partial"
+    assert result["agent_status"]["PlanningAgent"]["status"] == "cancelled"
+    assert planning.cancelled
+
+@pytest.mark.asyncio
+async def test_all_agents_failing_is_an_error():
+    """Test that the task errors only when no agent completes"""
+    manager, _, _ = make_manager(research_delay=5, plan_delay=5)
+
+    result = await manager.process({"description": "t"}, timeout=0.05)
+
+    assert result["status"] == "error"
+    assert {status["status"] for status in result["agent_status"].values()} == {"timed_out"}
+    assert manager.get_status() == "error"
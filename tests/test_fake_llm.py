@@ -0,0 +1,64 @@
+import sys
+import os
+import pytest # type: ignore [import-untyped]
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.fake import FakeChatModel, FakeLLMError, fake_response
+from src.llm.rate_limiter import AdaptiveRateLimiter, classify_error
+from src.llm.cache import LLMCache
+from src.agents.research_agent import ResearchAgent
+
+def message(text: str) -> SimpleNamespace:
+    return SimpleNamespace(content=text)
+
+def test_responses_are_deterministic():
+    """Test that the same prompt always gets the same response, in the layout agents parse"""
+    assert fake_response("weather APIs", 100) == fake_response("weather APIs", 100)
+    assert fake_response("weather APIs", 100) != fake_response("payment APIs", 100)
+    assert "## Key Insights" in fake_response("weather APIs", 100)
+    assert len(fake_response("weather APIs", 400)) // 4 >= 400
+
+def test_latency_distributions():
+    """Test that sampled latencies follow the configured distribution's centre"""
+    fixed = FakeChatModel(latency="fixed", latency_mean=0.2)
+    assert fixed.sample_latency() == 0.2
+
+    for latency in ("uniform", "exponential", "lognormal"):
+        model = FakeChatModel(latency=latency, latency_mean=0.2, seed=1)
+        samples = sorted(model.sample_latency() for _ in range(2000))
+        centre = samples[1000] if latency == "lognormal" else sum(samples) / len(samples)
+        assert centre == pytest.approx(0.2, rel=0.15)
+
+    with pytest.raises(ValueError):
+        FakeChatModel(latency="bimodal")
+
+@pytest.mark.asyncio
+async def test_streams_and_batches_same_text():
+    """Test that streaming and batched generation return the same deterministic text"""
+    model = FakeChatModel(latency_mean=0, tokens_per_second=100_000)
+
+    batch = await model.agenerate([[message("a")], [message("b")]])
+    chunks = [chunk.content async for chunk in model.astream([message("a")])]
+
+    assert [gen[0].text for gen in batch.generations] == [fake_response("a", 200), fake_response("b", 200)]
+    assert "".join(chunks) == fake_response("a", 200)
+    assert model.get_stats()["prompts"] == 3
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retried_by_the_limiter():
+    """Test that injected throttling looks like a 429 to the rate limiter"""
+    assert classify_error(FakeLLMError("throttled")) == "throttled"
+    assert classify_error(FakeLLMError("fatal")) is None
+
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache())
+    agent.limiter = AdaptiveRateLimiter(max_retries=10, base_delay=0)
+    agent.llm = FakeChatModel(latency_mean=0, error_rate=0.5, seed=3)
+
+    result = await agent.process({"description": "weather APIs"})
+
+    assert result["status"] == "completed"
+    assert agent.llm.get_stats()["errors"] > 0
+    assert agent.limiter.get_stats()["retries"] == agent.llm.get_stats()["errors"]
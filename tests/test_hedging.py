@@ -0,0 +1,159 @@
+import sys
+import os
+import asyncio
+import time
+import pytest # type: ignore [import-untyped]
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.llm.hedging import Hedger
+from src.llm.rate_limiter import AdaptiveRateLimiter
+from src.agents.planning_agent import PlanningAgent
+
+def warmed(key: str = "k", latency: float = 0.01, **options) -> Hedger:
+    """A hedger with enough history on ``key`` to hedge, and budget to spare"""
+    hedger = Hedger(min_samples=5, min_delay=0.01, **{"budget": 1.0, **options})
+    for _ in range(5):
+        hedger.observe(key, latency)
+    return hedger
+
+class SlowFirstLLM:
+    """Stand-in chat model whose first request hangs and later requests answer at once"""
+
+    def __init__(self):
+        self.model = "test-model"
+        self.temperature = 0.7
+        self.started = 0
+        self.cancelled = 0
+
+    async def agenerate(self, messages_list):
+        self.started += 1
+        try:
+            if self.started == 1:
+                await asyncio.sleep(10)
+            return SimpleNamespace(generations=[[SimpleNamespace(text=f"1. plan from request {self.started}")]])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled():
+    """Test that a call past the hedge delay gets a backup whose answer wins"""
+    hedger = warmed()
+    attempts = []
+
+    async def call():
+        attempts.append(time.perf_counter())
+        await asyncio.sleep(10 if len(attempts) == 1 else 0.01)
+        return len(attempts)
+
+    start = time.perf_counter()
+    assert await hedger.run("k", call) == 2
+    assert time.perf_counter() - start < 1
+    stats = hedger.get_stats()
+    assert (stats["hedged"], stats["keys"]["k"]["won"], stats["win_rate"]) == (1, 1, 1.0)
+
+    async def fast():
+        return "fast"
+
+    # Calls answering before the delay are never duplicated
+    assert await hedger.run("k", fast) == "fast"
+    assert hedger.get_stats()["hedged"] == 1
+
+def test_cancelled_requests_count_as_censored_latencies():
+    """Test that requests cut short by a hedge keep the percentile up instead of dragging it down"""
+    hedger = Hedger(percentile=0.5, min_samples=5, min_delay=0.0)
+    for latency in (0.01, 0.01):
+        hedger.observe("k", latency)
+    for latency in (0.02, 0.02, 0.02):
+        hedger.observe("k", latency, censored=True)
+    # Fewer than half the requests answered by 0.02s, so the median is at least that
+    assert hedger.delay("k") == 0.02
+
+@pytest.mark.asyncio
+async def test_budget_caps_hedges():
+    """Test that hedges stop once the budget's credits are spent"""
+    hedger = warmed(budget=0.5, burst=1)
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    await asyncio.gather(*(hedger.run("k", slow) for _ in range(8)))
+    stats = hedger.get_stats()
+    assert stats["hedged"] == 1  # credits earned by 8 concurrent calls, capped at a burst of 1
+    assert stats["denied"] == 7
+    assert len(calls) == 9
+
+@pytest.mark.asyncio
+async def test_saturated_limiter_skips_hedge_without_spending_budget():
+    """Test that no backup is sent (or paid for) while the limiter could not start it"""
+    hedger = warmed()
+    limiter = AdaptiveRateLimiter(max_concurrency=1)
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    async with limiter.slot():
+        assert not limiter.has_capacity()
+        credits = hedger.get_stats()["credits"]
+        assert await hedger.run("k", slow, ready=limiter.has_capacity) == "primary"
+    assert limiter.has_capacity()
+
+    stats = hedger.get_stats()
+    assert len(calls) == 1
+    assert (stats["hedged"], stats["saturated"]) == (0, 1)
+    assert stats["credits"] == round(credits + hedger.budget, 3)
+
+@pytest.mark.asyncio
+async def test_failure_surfaces_only_when_both_requests_fail():
+    """Test that a failed primary is covered by its backup, and both failing raises the primary's error"""
+    hedger = warmed()
+    attempts = []
+
+    async def primary_fails_late():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("primary")
+        await asyncio.sleep(0.1)
+        return "backup"
+
+    assert await hedger.run("k", primary_fails_late) == "backup"
+
+    count = []
+
+    async def always_fails():
+        count.append(1)
+        attempt = len(count)
+        await asyncio.sleep(0.05)
+        raise RuntimeError(f"attempt {attempt}")
+
+    with pytest.raises(RuntimeError, match="attempt 1"):
+        await hedger.run("k", always_fails)
+    assert len(count) == 2
+
+@pytest.mark.asyncio
+async def test_agent_calls_are_hedged_per_model_and_stage():
+    """Test that a hanging planning call is answered by the backup request"""
+    agent = PlanningAgent(google_api_key="test-key", cache=LLMCache())
+    agent.limiter = AdaptiveRateLimiter()
+    agent.llm = llm = SlowFirstLLM()
+    agent.hedger = warmed("test-model/planning.plan")
+
+    start = time.perf_counter()
+    result = await agent.process({"description": "weather app"})
+    assert time.perf_counter() - start < 1
+    assert result["plan"]["steps"] == ["1. plan from request 2"]
+    assert (llm.started, llm.cancelled) == (2, 1)
+    assert agent.hedger.get_stats()["keys"]["test-model/planning.plan"]["won"] == 1
+    # The backup took its own limiter slot and request capacity
+    assert agent.limiter.get_stats()["requests"] == 2
@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+import pytest # type: ignore [import-untyped]
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.agents.research_agent import ResearchAgent
+
+class CountingLLM:
+    """Minimal stand-in for a chat model that counts agenerate calls"""
+
+    def __init__(self, model: str = "test-model", temperature: float = 0.7):
+        self.model = model
+        self.temperature = temperature
+        self.calls = 0
+
+    async def agenerate(self, messages_list):
+        self.calls += 1
+        generations = [[SimpleNamespace(text=f"answer: {messages[0].content[-20:]}")] for messages in messages_list]
+        return SimpleNamespace(generations=generations)
+
+def test_lru_eviction():
+    """Test that the memory tier evicts least recently used entries"""
+    cache = LLMCache(max_entries=2, ttl=None)
+    cache.set("m", 0.7, "a", "A")
+    cache.set("m", 0.7, "b", "B")
+    assert cache.get("m", 0.7, "a") == "A"  # a becomes most recent
+    cache.set("m", 0.7, "c", "C")
+
+    assert cache.get("m", 0.7, "b") is None
+    assert cache.get("m", 0.7, "a") == "A"
+    assert cache.get_stats()["evictions"] == 1
+
+def test_key_includes_model_and_temperature():
+    """Test that the same prompt on a different model or temperature misses"""
+    cache = LLMCache(ttl=None)
+    cache.set("m", 0.7, "prompt", "text")
+    assert cache.get("other", 0.7, "prompt") is None
+    assert cache.get("m", 0.2, "prompt") is None
+    assert cache.get("m", 0.7, "prompt") == "text"
+
+def test_ttl_expiry():
+    """Test that expired entries are treated as misses"""
+    cache = LLMCache(ttl=0.01)
+    cache.set("m", 0.7, "prompt", "text")
+    time.sleep(0.02)
+    assert cache.get("m", 0.7, "prompt") is None
+    assert cache.get_stats()["expirations"] == 1
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    """Test that the SQLite tier serves entries to a fresh process-level cache"""
+    db_path = str(tmp_path / "cache.sqlite3")
+    first = LLMCache(db_path=db_path)
+    first.set("m", 0.7, "prompt", "text", latency=1.5)
+    first.close()
+
+    second = LLMCache(db_path=db_path)
+    assert second.get("m", 0.7, "prompt") == "text"
+    stats = second.get_stats()
+    assert stats["disk_hits"] == 1
+    assert stats["saved_seconds"] == pytest.approx(1.5)
+
+    # Promoted to memory, so the next lookup is a memory hit
+    assert second.get("m", 0.7, "prompt") == "text"
+    assert second.get_stats()["memory_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_agents_share_cache():
+    """Test that repeated prompts across agent instances hit the shared cache"""
+    cache = LLMCache(ttl=None)
+    llm = CountingLLM()
+
+    first = ResearchAgent(google_api_key="test-key", cache=cache)
+    second = ResearchAgent(google_api_key="test-key", cache=cache)
+    first.llm = llm
+    second.llm = llm
+
+    task = {"description": "Recommend a weather API"}
+    result_one = await first.process(task)
+    result_two = await second.process(task)
+
+    assert result_one == result_two
+    assert llm.calls == 2  # gather + analyze, only once
+    assert cache.get_stats()["hits"] == 2
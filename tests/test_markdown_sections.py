@@ -0,0 +1,84 @@
+import sys
+import os
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.utils.markdown import SectionParser, parse_sections, find_section
+from src.agents.planning_agent import PlanningAgent
+from tests.helpers import TextLLM
+
+PLAN = """Here is the plan:
+
+## 1. Technical Requirements
+- Python 3.11
+  - asyncio
+- aiohttp
+
+## 2. Implementation Steps
+1. Set up the project
+   with a virtualenv
+2. Build the API
+   - endpoints
+3. Write tests
+
+### Notes
+Keep it small.
+
+## Risk Assessment
+- Rate limits
+"""
+
+def test_parses_section_tree():
+    """Test that headings, numbered steps, bullets and nesting become a typed tree"""
+    preamble, requirements, steps, risks = parse_sections(PLAN)
+    assert preamble.paragraphs == ["Here is the plan:"]
+    assert (requirements.title, requirements.number, requirements.level) == ("Technical Requirements", 1, 2)
+    assert [bullet.text for bullet in requirements.bullets] == ["Python 3.11", "aiohttp"]
+    assert requirements.bullets[0].children[0].text == "asyncio"
+
+    assert [(step.number, step.text) for step in steps.steps] == [
+        (1, "Set up the project with a virtualenv"), (2, "Build the API"), (3, "Write tests")
+    ]
+    assert steps.steps[1].children[0].kind == "bullet"
+    assert steps.find("notes").paragraphs == ["Keep it small."]
+    assert find_section([requirements, steps, risks], "risk") is risks
+
+def test_numbered_lines_are_sections_or_steps_by_context():
+    """Test that plain numbered lines continue the section numbering unless they continue a step list"""
+    sections = parse_sections("1. Tech\n- Python\n2. Implementation Steps\n1. Setup\n2. Build\n3. Test\n3. Timeline\n- Q1")
+    assert [section.title for section in sections] == ["Tech", "Implementation Steps", "Timeline"]
+    assert [step.text for step in sections[1].steps] == ["Setup", "Build", "Test"]
+
+def test_sections_close_as_chunks_arrive():
+    """Test that each section is returned once the next one starts, with the same tree as a full parse"""
+    parser = SectionParser()
+    closed_at = {}
+    for i in range(0, len(PLAN), 5):
+        for section in parser.feed(PLAN[i:i + 5]):
+            closed_at[section.title] = i
+    for section in parser.close():
+        closed_at[section.title] = len(PLAN)
+
+    assert closed_at["Technical Requirements"] < PLAN.index("Write tests")
+    # Subsections close before their parent, which closes when the next sibling starts
+    assert list(closed_at) == ["Technical Requirements", "Notes", "Implementation Steps", "Risk Assessment"]
+    assert closed_at["Implementation Steps"] < len(PLAN)
+    assert [section.to_dict() for section in parser.sections] == [section.to_dict() for section in parse_sections(PLAN)]
+
+@pytest.mark.asyncio
+async def test_planning_stream_emits_structured_sections():
+    """Test that streamed plan sections carry their parsed steps and end up in the plan"""
+    agent = PlanningAgent(google_api_key="test-key", cache=LLMCache())
+    agent.llm = TextLLM(PLAN, chunk_size=3)
+
+    events = [event async for event in agent.stream({"description": "weather app"})]
+
+    sections = {event["section"]["title"]: event["section"] for event in events if event["type"] == "plan_section"}
+    assert [item["text"] for item in sections["Implementation Steps"]["items"]][:2] == [
+        "Set up the project with a virtualenv", "Build the API"
+    ]
+    plan = events[-1]["result"]["plan"]
+    assert [section["title"] for section in plan["sections"]] == ["", "Technical Requirements", "Implementation Steps", "Risk Assessment"]
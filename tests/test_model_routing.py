@@ -0,0 +1,77 @@
+import sys
+import os
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.llm.clients import ClientRegistry
+from src.llm.fake import FakeChatModel
+from src.llm.rate_limiter import estimate_tokens
+from src.llm.router import ModelRouter
+from src.llm.scheduler import Schedule
+from src.agents.research_agent import ResearchAgent
+
+TIERS = {"fast": "models/fast", "strong": None}
+RULES = [
+    {"stages": ["research.gather"], "priorities": ["low"], "tier": "fast"},
+    {"stages": ["research.gather"], "tier": "fast", "cascade_only": True}
+]
+PRICES = {"fast": {"input": 0.3, "output": 2.5}, "strong": {"input": 1.25, "output": 10.0}}
+
+@pytest.fixture
+def fake_registry(monkeypatch):
+    """Registry whose clients are fake models: the fast one gives short answers"""
+    created = []
+
+    def factory(model, temperature, api_key, options):
+        created.append(model)
+        return FakeChatModel(model=model, latency_mean=0, response_tokens=10 if model == "models/fast" else 400)
+
+    registry = ClientRegistry(pool_size=1, factory=factory)
+    monkeypatch.setattr("src.llm.clients._default_registry", registry)
+    return created
+
+def make_agent(router: ModelRouter) -> ResearchAgent:
+    agent = ResearchAgent(google_api_key="test-key", model_name="models/strong", cache=LLMCache(), strategy="two-pass")
+    agent.router = router
+    return agent
+
+def test_rules_pick_tier_by_stage_and_priority():
+    """Test that the first matching rule picks the tier and cascade-only rules wait for the cascade"""
+    router = ModelRouter(TIERS, rules=RULES)
+    assert router.route("research.gather", 100, Schedule("low")).tier == "fast"
+    assert router.route("research.gather", 100, Schedule("high")).tier == "strong"
+    assert router.route("research.analyze", 100, Schedule("low")).tier == "strong"
+
+    cascading = ModelRouter(TIERS, rules=RULES, cascade=True, refusals=[r"\bI cannot\b"])
+    route = cascading.route("research.gather", 100, Schedule("high"))
+    assert (route.tier, route.escalate_to) == ("fast", "strong")
+    assert not cascading.accept("research.gather", "I cannot help with that request.", 100)
+
+@pytest.mark.asyncio
+async def test_low_priority_gather_runs_on_fast_model(fake_registry):
+    """Test that routed calls use the fast model and the router reports the saving"""
+    router = ModelRouter(TIERS, rules=RULES, prices=PRICES)
+    result = await make_agent(router).process({"description": "weather app", "priority": "low"})
+
+    assert result["status"] == "completed"
+    assert sorted(fake_registry) == ["models/fast", "models/strong"]
+    stats = router.get_stats()
+    assert set(stats["routes"]) == {"research.gather/fast", "research.analyze/strong"}
+    assert stats["saved_cost"] > 0
+
+@pytest.mark.asyncio
+async def test_cascade_escalates_answers_failing_quality_check(fake_registry):
+    """Test that a too-short fast answer is regenerated on the default tier"""
+    router = ModelRouter(TIERS, rules=RULES, cascade=True, min_tokens=200, prices=PRICES)
+    agent = make_agent(router)
+    text = await agent.generate(agent._build_gather_prompt("weather app"), "research.gather")
+
+    assert estimate_tokens(text) >= 200  # the strong model's answer
+    stats = router.get_stats()
+    assert stats["escalations"] == 1
+    assert stats["routes"]["research.gather/fast"]["escalated"] == 1
+    assert stats["routes"]["research.gather/strong"]["calls"] == 1
+    assert stats["saved_cost"] < 0  # the rejected fast call was paid for on top
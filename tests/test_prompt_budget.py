@@ -0,0 +1,102 @@
+import sys
+import os
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.planning_agent import PlanningAgent
+from src.agents.research_agent import ResearchAgent
+from src.llm.budget import PromptBudget, dedup_lines, truncate, split_by_tokens
+from src.llm.cache import LLMCache
+from src.llm.fake import FakeChatModel
+from src.llm.rate_limiter import estimate_tokens
+from src.utils.tracing import Tracer
+
+def test_dedup_and_truncation_strategies():
+    """Test that repeated lines are dropped and each truncation keeps the right end"""
+    assert dedup_lines("- Use caching\n\n\n-  use CACHING\nKeep it") == "- Use caching\n\nKeep it"
+
+    text = "\n".join(f"line {i:03d} " + "x" * 30 for i in range(100))
+    for strategy in ("head", "tail", "head-tail"):
+        assert estimate_tokens(truncate(text, 200, strategy)) <= 210
+    assert truncate(text, 200, "head").startswith("line 000")
+    assert truncate(text, 200, "tail").endswith(text[-20:])
+    both = truncate(text, 200, "head-tail")
+    assert both.startswith("line 000") and both.endswith(text[-20:]) and "tokens omitted" in both
+    assert truncate("short", 200) == "short"
+    with pytest.raises(ValueError):
+        truncate(text, 200, "middle")
+
+    pieces = split_by_tokens(text, 100)
+    assert all(estimate_tokens(piece) <= 100 for piece in pieces)
+    assert "".join(pieces).replace("\n", "") == text.replace("\n", "")
+
+def test_budget_records_savings_per_stage():
+    """Test that fit enforces a stage budget and accounts the tokens it saved"""
+    budget = PromptBudget(budgets={"analyze": 100})
+    text = "\n".join(["repeated line"] * 50 + [f"fact {i} " + "y" * 40 for i in range(50)])
+
+    compacted = budget.fit("analyze", text)
+    budget.fit("other", "no budget here")
+
+    assert estimate_tokens(compacted) <= 110
+    stats = budget.get_stats()
+    analyze = stats["stages"]["analyze"]
+    assert analyze["calls"] == 1 and analyze["compacted"] == 1
+    assert analyze["saved_tokens"] == estimate_tokens(text) - estimate_tokens(compacted)
+    assert stats["stages"]["other"]["saved_tokens"] == 0
+    assert stats["saved_tokens"] == analyze["saved_tokens"]
+
+@pytest.mark.asyncio
+async def test_research_summarize_first_pass():
+    """Test that oversized gathered content is condensed before the analysis call"""
+    budget = PromptBudget(budgets={"research.analyze": 200}, overflow="summarize")
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache(), strategy="two-pass")
+    agent.budget = budget
+    agent.tracer = Tracer()
+    agent.llm = FakeChatModel(latency_mean=0, response_tokens=150)
+    gathered = "\n".join(f"finding {i} " + "z" * 60 for i in range(100))
+
+    with agent.tracer.span("agent") as span:
+        analysis = await agent._analyze_information(agent._package_gathered(gathered))
+
+    stats = budget.get_stats()["stages"]["research.analyze"]
+    assert analysis["key_insights"]
+    assert stats["summarized"] == 1
+    assert stats["output_tokens"] <= 210
+    # One summary call per budget-sized chunk, plus the analysis itself
+    assert agent.llm.get_stats()["calls"] == len(split_by_tokens(gathered, 200)) + 1
+    assert span.attributes["prompt_tokens_saved"] == stats["saved_tokens"]
+
+@pytest.mark.asyncio
+async def test_summarize_first_covers_batched_and_streamed_analysis():
+    """Test that the batch, streaming and map-reduce paths summarize oversized input too"""
+    for strategy in ("two-pass", "map-reduce"):
+        budget = PromptBudget(budgets={"research.analyze": 50}, overflow="summarize")
+        agent = ResearchAgent(google_api_key="test-key", cache=LLMCache(), strategy=strategy, chunk_chars=2000)
+        agent.budget = budget
+        agent.llm = FakeChatModel(latency_mean=0, response_tokens=150)
+
+        results = await agent.process_batch([{"description": "weather APIs"}, {"description": "map APIs"}])
+        assert all(result["status"] == "completed" for result in results)
+        assert budget.get_stats()["stages"]["research.analyze"]["summarized"] == 2
+
+        events = [event async for event in agent.stream({"description": "tide APIs"})]
+        assert events[-1]["result"]["status"] == "completed"
+        assert budget.get_stats()["stages"]["research.analyze"]["summarized"] == 3
+
+def test_planning_prompt_is_compacted():
+    """Test that planning inputs are held to their budgets"""
+    agent = PlanningAgent(google_api_key="test-key", cache=LLMCache())
+    agent.budget = PromptBudget(budgets={"planning.task": 50, "planning.findings": 50})
+    insights = [f"- insight {i} " + "w" * 40 for i in range(30)] * 2
+    task = {
+        "description": "Build a weather dashboard. " * 100,
+        "upstream_results": {"research": {"analysis": {"key_insights": insights}}}
+    }
+
+    prompt = agent._build_planning_prompt(task)
+
+    assert estimate_tokens(prompt) < 450
+    assert agent.budget.get_stats()["saved_tokens"] > 1000
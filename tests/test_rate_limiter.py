@@ -0,0 +1,88 @@
+import sys
+import os
+import asyncio
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.rate_limiter import AdaptiveRateLimiter, TokenBucket, classify_error
+
+class ResourceExhausted(Exception):
+    """Mimics google.api_core.exceptions.ResourceExhausted"""
+
+class HTTPError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def test_classify_error():
+    """Test that throttling, server errors and timeouts are recognised"""
+    assert classify_error(ResourceExhausted("quota")) == "throttled"
+    assert classify_error(HTTPError(429)) == "throttled"
+    assert classify_error(HTTPError(503)) == "server"
+    assert classify_error(asyncio.TimeoutError()) == "timeout"
+    assert classify_error(ValueError("bad prompt")) is None
+
+def test_token_bucket_reports_wait():
+    """Test that an empty bucket reports how long until enough tokens refill"""
+    bucket = TokenBucket(per_minute=60, capacity=1)
+    assert bucket.try_acquire(1) == 0.0
+    assert bucket.try_acquire(1) == pytest.approx(1.0, abs=0.05)
+
+@pytest.mark.asyncio
+async def test_retries_throttling_and_backs_off_concurrency():
+    """Test that 429s are retried and cut the AIMD concurrency limit"""
+    limiter = AdaptiveRateLimiter(max_concurrency=8, max_retries=3, base_delay=0)
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ResourceExhausted("quota exceeded")
+        return "ok"
+
+    assert await limiter.call(flaky) == "ok"
+    stats = limiter.get_stats()
+    assert stats["retries"] == 2
+    assert stats["throttled"] == 2
+    assert 2.0 <= stats["concurrency_limit"] < 8.0
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_raise_immediately():
+    """Test that errors that are not provider pushback are not retried"""
+    limiter = AdaptiveRateLimiter(base_delay=0)
+    attempts = 0
+
+    async def broken():
+        nonlocal attempts
+        attempts += 1
+        raise ValueError("invalid prompt")
+
+    with pytest.raises(ValueError):
+        await limiter.call(broken)
+    assert attempts == 1
+    assert limiter.get_stats()["failures"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_queue_wait():
+    """Test that in-flight calls never exceed the limit and waits are measured"""
+    limiter = AdaptiveRateLimiter(max_concurrency=2)
+    active = 0
+    peak = 0
+
+    async def work():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "done"
+
+    await asyncio.gather(*(limiter.call(work) for _ in range(6)))
+    assert peak == 2
+    stats = limiter.get_stats()
+    assert stats["requests"] == 6
+    assert stats["queue_wait_max"] > 0
+    assert stats["in_flight"] == 0
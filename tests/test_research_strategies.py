@@ -0,0 +1,138 @@
+import sys
+import os
+import asyncio
+import pytest # type: ignore [import-untyped]
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.agents.research_agent import ResearchAgent
+
+SINGLE_PASS_RESPONSE = "## Findings\nOpenWeather has a free tier.\n\n## Key Insights\n- Use OpenWeather\n- Cache responses"
+
+class ScriptedLLM:
+    """Stand-in chat model that answers by prompt kind and tracks concurrency"""
+
+    def __init__(self, gathered: str):
+        self.model = "test-model"
+        self.temperature = 0.7
+        self.gathered = gathered
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+
+    async def agenerate(self, messages_list):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+
+        generations = []
+        for messages in messages_list:
+            prompt = messages[0].content
+            self.prompts.append(prompt)
+            if "single response" in prompt:
+                text = SINGLE_PASS_RESPONSE
+            elif "extracting key insights" in prompt:
+                text = "- Shared insight\n- Insight about " + prompt.split("Research Results:\n")[1][:6]
+            else:
+                text = self.gathered
+            generations.append([SimpleNamespace(text=text)])
+        return SimpleNamespace(generations=generations)
+
+def make_agent(strategy: str, gathered: str = "short", chunk_chars: int = 100):
+    """Create a research agent with a scripted LLM"""
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache(), strategy=strategy, chunk_chars=chunk_chars)
+    agent.llm = ScriptedLLM(gathered)
+    return agent
+
+@pytest.mark.asyncio
+async def test_single_pass_uses_one_call():
+    """Test that single-pass mode gathers and analyzes in one round-trip"""
+    agent = make_agent("single-pass")
+
+    result = await agent.process({"description": "weather APIs"})
+
+    assert len(agent.llm.prompts) == 1
+    assert result["strategy"] == "single-pass"
+    assert result["raw_results"][0]["content"] == "OpenWeather has a free tier."
+    assert result["analysis"]["key_insights"] == ["- Use OpenWeather", "- Cache responses"]
+
+@pytest.mark.asyncio
+async def test_map_reduce_analyzes_chunks_concurrently():
+    """Test that large gathered content is analyzed in concurrent chunks and merged"""
+    gathered = "\n\n".join(f"Paragraph {i} " + "x" * 60 for i in range(4))
+    agent = make_agent("map-reduce", gathered=gathered)
+
+    result = await agent.process({"description": "weather APIs"})
+
+    analysis_prompts = [p for p in agent.llm.prompts if "extracting key insights" in p]
+    assert len(analysis_prompts) == 4
+    assert agent.llm.peak == 4
+    # The insight shared by every chunk appears once after merging
+    assert result["analysis"]["key_insights"].count("- Shared insight") == 1
+    assert "4 chunks" in result["analysis"]["analysis_method"]
+
+def test_split_content_respects_chunk_size():
+    """Test that chunks stay within chunk_chars and keep all content"""
+    agent = make_agent("map-reduce", chunk_chars=50)
+    content = "a" * 30 + "\n\n" + "b" * 30 + "\n\n" + "c" * 120
+    chunks = agent._split_content(agent._package_gathered(content))
+
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == content.replace("\n", "")
+
+@pytest.mark.asyncio
+async def test_batch_honours_per_task_strategy():
+    """Test that process_batch groups tasks by strategy"""
+    agent = make_agent("two-pass")
+
+    results = await agent.process_batch([
+        {"description": "a"},
+        {"description": "b", "research_strategy": "single-pass"}
+    ])
+
+    assert [r["strategy"] for r in results] == ["two-pass", "single-pass"]
+    assert results[1]["analysis"]["key_insights"] == ["- Use OpenWeather", "- Cache responses"]
+
+def test_unknown_strategy_is_rejected():
+    """Test that an unknown strategy fails fast"""
+    with pytest.raises(ValueError):
+        ResearchAgent(google_api_key="test-key", strategy="three-pass")
+
+@pytest.mark.asyncio
+async def test_abandoned_map_reduce_stream_cancels_chunk_calls():
+    """Test that a consumer leaving a map-reduce stream early cancels the chunk analyses still running"""
+    class SlowChunksLLM(ScriptedLLM):
+        """Answers the first chunk at once; the other chunks hang until cancelled"""
+
+        def __init__(self, gathered: str):
+            super().__init__(gathered)
+            self.cancelled = 0
+
+        async def agenerate(self, messages_list):
+            prompt = messages_list[0][0].content
+            if "extracting key insights" in prompt and "Paragraph 0" not in prompt:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    self.cancelled += 1
+                    raise
+            return await super().agenerate(messages_list)
+
+        async def astream(self, messages):
+            yield SimpleNamespace(content=self.gathered)
+
+    gathered = "\n\n".join(f"Paragraph {i} " + "x" * 60 for i in range(4))
+    agent = make_agent("map-reduce", gathered=gathered)
+    agent.llm = SlowChunksLLM(gathered)
+
+    stream = agent.stream({"description": "weather APIs"})
+    async for event in stream:
+        if event.get("chunk") is not None:
+            break
+    await stream.aclose()
+
+    assert agent.llm.cancelled == 3
@@ -0,0 +1,123 @@
+import sys
+import os
+import json
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.result_store import ResultStore, migrate_json_results
+from src.utils.helpers import save_task_result
+from tests.helpers import make_manager
+
+def make_result(task_id: str, status: str = "completed") -> dict:
+    """Build a task result shaped like TaskManagerAgent.process output"""
+    return {
+        "task_id": task_id,
+        "status": status,
+        "subtask_results": [{"agent": "ResearchAgent", "status": status, "findings": ["api latency"] * 20}]
+    }
+
+def test_put_get_and_content_lookup(tmp_path):
+    """Test lookups by task id and task content, and that rewrites replace the old result"""
+    store = ResultStore(str(tmp_path / "store"))
+    task = {"id": "t-1", "description": "Research weather APIs", "priority": "high"}
+
+    store.put(make_result("t-1", "error"), task=task)
+    store.put(make_result("t-1"), task=task)
+    store.put(make_result("t-2"))
+
+    assert len(store) == 2
+    assert "t-1" in store and "t-3" not in store
+    assert store.get("t-1")["status"] == "completed"
+    assert store.get("t-3") is None
+    # The same task under another id finds the stored result
+    assert store.find_by_task({**task, "id": "other"})["task_id"] == "t-1"
+    assert store.find_by_task({"description": "something else"}) is None
+    with pytest.raises(ValueError):
+        store.put({"status": "completed"})
+
+    stats = store.get_stats()
+    # Results compress well below their JSON size
+    assert stats["disk_bytes"] < 3 * len(json.dumps(make_result("t-1")))
+    store.close()
+
+def test_segments_roll_over_and_iterate_in_order(tmp_path):
+    """Test that small segments roll over and iteration streams the latest results"""
+    store = ResultStore(str(tmp_path / "store"), segment_bytes=512)
+    for i in range(40):
+        store.put(make_result(f"t-{i}", "completed" if i % 4 else "error"))
+    store.put(make_result("t-0"))
+
+    assert store.get_stats()["segments"] > 1
+    ids = [task_id for task_id, _ in store.iter_results(batch_size=7)]
+    assert ids == [f"t-{i}" for i in range(1, 40)] + ["t-0"]
+    assert len(list(store.iter_results(status="error"))) == 9
+    assert store.get("t-5")["task_id"] == "t-5"
+    store.close()
+
+def test_reopen_recovers_unindexed_and_torn_frames(tmp_path):
+    """Test that frames written after the last index commit are recovered and torn tails dropped"""
+    path = str(tmp_path / "store")
+    store = ResultStore(path)
+    store.put(make_result("t-1"))
+    committed = store._db.execute("SELECT end FROM position").fetchone()[0]
+    store.put(make_result("t-2"))
+    store.close()
+
+    # Simulate a crash after writing t-2's frame but before its index commit, plus a torn write
+    store = ResultStore(path)
+    store._db.execute("DELETE FROM results WHERE task_id = 't-2'")
+    store._db.execute("UPDATE position SET end = ?", (committed,))
+    store._db.commit()
+    store.close()
+    segment = os.path.join(path, "segment-000001.log")
+    with open(segment, "ab") as f:
+        f.write(b"RSF1\xff\x00")
+    size = os.path.getsize(segment)
+
+    store = ResultStore(path)
+    assert store.get("t-2")["task_id"] == "t-2"
+    assert store.get_stats()["truncated_bytes"] == 6
+    assert os.path.getsize(segment) == size - 6
+    store.put(make_result("t-3"))
+    assert [task_id for task_id, _ in store.iter_results()] == ["t-1", "t-2", "t-3"]
+    store.close()
+
+def test_migrate_json_results(tmp_path):
+    """Test importing results saved as individual JSON files, and that reruns skip them"""
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    save_task_result(make_result("t-1"), str(legacy / "first.json"))
+    save_task_result({"status": "completed", "subtask_results": []}, str(legacy / "no-id.json"))
+    (legacy / "broken.json").write_text("{not json")
+
+    store = ResultStore(str(tmp_path / "store"))
+    assert migrate_json_results(str(legacy), store) == {"imported": 2, "skipped": 0, "failed": 1}
+    assert store.get("t-1") == make_result("t-1")
+    assert store.get("no-id")["status"] == "completed"
+    assert migrate_json_results(str(legacy), store) == {"imported": 0, "skipped": 2, "failed": 1}
+    store.close()
+
+@pytest.mark.asyncio
+async def test_task_manager_saves_results(tmp_path, monkeypatch):
+    """Test that finished tasks land in the store, and that JSON exports migrate with their content hash"""
+    json_dir = tmp_path / "json"
+    monkeypatch.setitem(sys.modules["src.agents.task_manager"].RESULT_STORE_CONFIG, "json_dir", str(json_dir))
+    store = ResultStore(str(tmp_path / "store"))
+    manager = make_manager()
+    manager.result_store = store
+    task = {"id": "t-1", "description": "Research weather APIs"}
+
+    result = await manager.process(task)
+    batch = await manager.process_many([{"id": "t-2", "description": "Plan a mobile app"}])
+    assert store.get("t-1")["status"] == result["status"] == "completed"
+    assert store.get("t-2")["status"] == batch[0]["status"]
+    assert store.find_by_task(task)["task_id"] == "t-1"
+    store.close()
+
+    migrated = ResultStore(str(tmp_path / "migrated"))
+    assert migrate_json_results(str(json_dir), migrated)["imported"] == 2
+    assert migrated.find_by_task({**task, "id": "other"})["task_id"] == "t-1"
+    assert "task" not in migrated.get("t-1")
+    migrated.close()
@@ -0,0 +1,72 @@
+import sys
+import os
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.llm.fake import FakeChatModel
+from src.agents.task_manager import TaskManagerAgent
+from src.agents.research_agent import ResearchAgent
+from src.agents.planning_agent import PlanningAgent
+from src.agents.results import TaskResult, ResearchResult, Plan, SubtaskResult
+from src.storage import codec
+from src.utils.helpers import save_task_result, load_task_result
+
+async def run_task() -> dict:
+    """A real combined result from research and planning agents on a fake model"""
+    manager = TaskManagerAgent()
+    for agent in (ResearchAgent(google_api_key="test-key", cache=LLMCache()),
+                  PlanningAgent(google_api_key="test-key", cache=LLMCache())):
+        agent.llm = FakeChatModel(latency_mean=0)
+        manager.register_agent(agent)
+    return await manager.process({"description": "weather app"})
+
+def test_plain_values_use_standard_msgpack_bytes():
+    """Test that plain values encode as standard MessagePack and round-trip"""
+    assert codec.encode({"compact": True, "schema": 0}) == bytes.fromhex("82a7636f6d70616374c3a6736368656d6100")
+    assert codec.encode([None, -1, 1.5, b"\x00"]) == bytes.fromhex("94c0ffcb3ff8000000000000c40100")
+    assert codec.encode(-33) == bytes.fromhex("d0df") and codec.encode(2 ** 32) == bytes.fromhex("cf0000000100000000")
+
+    values = [0, 127, 128, -32, -129, 65536, -2 ** 63, 2 ** 64 - 1, "é" * 40, "x" * 70000, list(range(20)),
+              {str(i): i for i in range(20)}, {1: [True, False]}, b"y" * 300]
+    assert codec.decode(codec.encode(values)) == values
+    with pytest.raises(ValueError):
+        codec.decode(codec.encode(values)[:-1])
+
+@pytest.mark.asyncio
+async def test_models_round_trip_agent_results():
+    """Test that real results convert to typed models and back unchanged, in JSON and the codec"""
+    result = await run_task()
+    result["reused"] = {"task_id": "abc", "similarity": 0.97}  # keys without a field are kept
+
+    model = TaskResult.from_dict(result)
+    assert isinstance(model.research_results, ResearchResult) and isinstance(model.plan, Plan)
+    assert isinstance(model.subtask_results[0], SubtaskResult)
+    assert model.to_dict() == result
+
+    encoded = codec.encode(model)
+    assert len(encoded) < len(codec.encode(result))  # field names are not repeated
+    decoded = codec.decode(encoded)
+    assert decoded == model and decoded.to_dict() == result
+
+    error = {"status": "error", "message": "No agents registered", "task_id": "t-1"}
+    assert TaskResult.from_dict(error).to_dict() == error
+
+def test_records_from_older_writers_decode_with_defaults():
+    """Test that a model record missing trailing fields decodes with those fields at their defaults"""
+    short = codec.encode([5, "s-1", "research"])  # a SubtaskResult written with three fields
+    record = bytes([0xc7, len(short), codec.MODEL_EXT]) + short
+    assert codec.decode(record) == SubtaskResult(id="s-1", type="research")
+
+@pytest.mark.asyncio
+async def test_save_and_load_by_extension(tmp_path):
+    """Test that task results save as MessagePack or compact JSON by file extension"""
+    result = await run_task()
+    for name in ("result.msgpack", "result.json"):
+        path = str(tmp_path / name)
+        save_task_result(result, path)
+        assert load_task_result(path) == result
+    assert os.path.getsize(tmp_path / "result.msgpack") < os.path.getsize(tmp_path / "result.json")
+    assert load_task_result(str(tmp_path / "missing.msgpack")) is None
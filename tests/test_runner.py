@@ -0,0 +1,141 @@
+import sys
+import os
+import json
+import asyncio
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.llm.clients import ClientRegistry
+from src.llm.fake import make_fake_factory
+from src.runner import Checkpoint, load_tasks, run, run_worker
+
+@pytest.fixture
+def offline_env(monkeypatch):
+    """Point the runner (and the worker processes it spawns) at the fake backend"""
+    # Settings are already imported here, so in-process runs need the defaults swapped;
+    # spawned workers read the environment afresh
+    monkeypatch.setattr("src.llm.clients._default_registry", ClientRegistry(factory=make_fake_factory(latency_mean=0.001)))
+    monkeypatch.setattr("src.llm.cache._default_cache", LLMCache())
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("FAKE_LLM_LATENCY_MEAN", "0.001")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("TRACING_ENABLED", "false")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+def write_tasks(path, count: int) -> str:
+    """Write ``count`` request-style records to a JSONL file"""
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({"request_id": f"req-{i}", "title": f"Task {i}", "body": "Research weather APIs"}) + "\n")
+    return str(path)
+
+def test_load_tasks_from_directory(tmp_path):
+    """Test that tasks load from a directory, get stable ids and lose duplicates"""
+    write_tasks(tmp_path / "a.jsonl", 3)
+    with open(tmp_path / "b.jsonl", "w") as f:
+        f.write(json.dumps({"request_id": "req-0", "title": "duplicate"}) + "\n\n")
+        f.write(json.dumps({"description": "no id", "priority": "high"}) + "\n")
+
+    jobs = load_tasks(str(tmp_path))
+
+    assert [task_id for task_id, _ in jobs][:3] == ["req-0", "req-1", "req-2"]
+    assert len(jobs) == 4
+    assert jobs[0][1]["description"] == "Task 0\n\nResearch weather APIs"
+    assert jobs[0][1]["id"] == "req-0"
+    assert load_tasks(str(tmp_path))[3][0] == jobs[3][0]
+
+    with open(tmp_path / "c.jsonl", "w") as f:
+        f.write("{not json\n")
+    with pytest.raises(ValueError, match="c.jsonl:1"):
+        load_tasks(str(tmp_path))
+
+def test_checkpoint_restart_drops_torn_line(tmp_path):
+    """Test that a record written after a crash mid-line is not glued onto the torn fragment"""
+    checkpoint = Checkpoint(str(tmp_path), 0)
+    checkpoint.record("req-0", {"status": "completed"})
+    checkpoint.close()
+    with open(checkpoint.path, "a") as f:
+        f.write('{"task_id": "req-1", "sta')
+
+    checkpoint = Checkpoint(str(tmp_path), 0)
+    checkpoint.record("req-2", {"status": "completed"})
+    checkpoint.close()
+
+    assert Checkpoint.completed_ids(str(tmp_path)) == {"req-0", "req-2"}
+    with open(checkpoint.path) as f:
+        assert [json.loads(line)["task_id"] for line in f] == ["req-0", "req-2"]
+
+def test_in_process_run_resumes_from_checkpoint(tmp_path, offline_env):
+    """Test that a rerun skips completed tasks and retries the rest"""
+    input_path = write_tasks(tmp_path / "tasks.jsonl", 6)
+    output_dir = str(tmp_path / "out")
+
+    # An earlier run that completed two tasks, failed one and crashed mid-write
+    checkpoint = Checkpoint(output_dir, 7)
+    checkpoint.record("req-0", {"status": "completed"})
+    checkpoint.record("req-1", {"status": "completed"})
+    checkpoint.record("req-2", {"status": "error", "message": "boom"})
+    checkpoint.close()
+    with open(checkpoint.path, "a") as f:
+        f.write('{"task_id": "req-3", "sta')
+
+    summary = run(input_path, output_dir=output_dir, workers=0, concurrency=4)
+
+    assert summary["skipped"] == 2
+    assert summary["processed"] == 4
+    assert summary["statuses"] == {"completed": 4}
+    assert Checkpoint.completed_ids(output_dir) == {f"req-{i}" for i in range(6)}
+
+def test_worker_pool_processes_each_task_once(tmp_path, offline_env):
+    """Test that tasks spread across worker processes and a rerun has nothing left to do"""
+    input_path = write_tasks(tmp_path / "tasks.jsonl", 20)
+    output_dir = str(tmp_path / "out")
+
+    summary = run(input_path, output_dir=output_dir, workers=2, concurrency=8)
+
+    assert summary["failed_workers"] == 0
+    assert summary["statuses"] == {"completed": 20}
+    entries = []
+    for name in os.listdir(output_dir):
+        with open(os.path.join(output_dir, name)) as f:
+            entries.extend(json.loads(line) for line in f)
+    assert sorted(entry["task_id"] for entry in entries) == sorted(f"req-{i}" for i in range(20))
+    assert all(entry["result"]["task_id"] == entry["task_id"] for entry in entries)
+
+    rerun = run(input_path, output_dir=output_dir, workers=2)
+    assert rerun["skipped"] == 20
+    assert rerun["processed"] == 0
+
+@pytest.mark.asyncio
+async def test_worker_pulls_jobs_only_when_a_slot_is_free(tmp_path, offline_env, monkeypatch):
+    """Test that a worker never takes a job off the queue while all its slots are busy"""
+    finished = []
+    pulled_while_full = []
+
+    class SlowManager:
+        async def process(self, task, timeout=None):
+            await asyncio.sleep(0.01)
+            finished.append(task["id"])
+            return {"status": "completed"}
+
+    async def setup():
+        return SlowManager()
+
+    async def jobs():
+        for i in range(6):
+            # Jobs pulled earlier and not finished yet each hold a slot
+            pulled_while_full.append(i - len(finished) >= 2)
+            yield f"req-{i}", {"id": f"req-{i}"}
+
+    monkeypatch.setattr("src.runner.load_setup", lambda spec: setup)
+    checkpoint = Checkpoint(str(tmp_path), 0)
+    try:
+        counts = await run_worker(jobs(), checkpoint, "unused:setup", concurrency=2, timeout=1)
+    finally:
+        checkpoint.close()
+
+    assert counts == {"completed": 6}
+    assert not any(pulled_while_full)
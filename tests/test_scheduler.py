@@ -0,0 +1,88 @@
+import sys
+import os
+import asyncio
+import time
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.rate_limiter import AdaptiveRateLimiter
+from src.llm.scheduler import PriorityScheduler, Schedule, parse_deadline, schedule_for, use_schedule
+
+async def run_in_order(scheduler: PriorityScheduler, schedules, gap: float = 0.0):
+    """Queue one waiter per schedule behind a held slot; return the order they were granted"""
+    holder = await scheduler.acquire(Schedule())
+    order = []
+
+    async def wait(name, schedule):
+        waiter = await scheduler.acquire(schedule)
+        order.append(name)
+        scheduler.release(waiter)
+
+    tasks = []
+    for name, schedule in schedules:
+        tasks.append(asyncio.create_task(wait(name, schedule)))
+        await asyncio.sleep(gap)
+    scheduler.release(holder)
+    await asyncio.gather(*tasks)
+    return order
+
+def test_schedule_for_reads_priority_and_deadline():
+    """Test that task fields become a schedule, with date-only deadlines at end of day"""
+    schedule = schedule_for({"priority": "HIGH", "deadline": "2024-12-31"})
+    assert schedule.priority == "high"
+    assert parse_deadline("2024-12-31") > parse_deadline("2024-12-31T12:00:00")
+    assert schedule_for({"priority": "whenever", "deadline": "soon"}) == Schedule("medium", None)
+
+@pytest.mark.asyncio
+async def test_priority_order_and_deadlines():
+    """Test that waiters run by priority, and by earliest deadline within the aging window"""
+    scheduler = PriorityScheduler(capacity=lambda: 1, aging=30)
+    order = await run_in_order(scheduler, [
+        ("low", Schedule("low")),
+        ("medium", Schedule("medium")),
+        ("high", Schedule("high"))
+    ])
+    assert order == ["high", "medium", "low"]
+
+    now = time.time()
+    order = await run_in_order(scheduler, [
+        ("later", Schedule("medium", deadline=now + 20)),
+        ("sooner", Schedule("low", deadline=now + 5)),
+        ("none", Schedule("medium"))
+    ])
+    assert order == ["sooner", "later", "none"]
+    assert scheduler.get_stats()["priorities"]["low"]["calls"] == 2
+
+@pytest.mark.asyncio
+async def test_aging_prevents_starvation():
+    """Test that a low-priority waiter overtakes high-priority work that arrived much later"""
+    scheduler = PriorityScheduler(capacity=lambda: 1, aging=0.02)
+    order = await run_in_order(scheduler, [
+        ("low", Schedule("low")),
+        ("high", Schedule("high"))
+    ], gap=0.06)
+    assert order == ["low", "high"]
+
+@pytest.mark.asyncio
+async def test_urgent_call_preempts_call_waiting_on_rate_limit():
+    """Test that a queued low-priority call yields its slot to a high-priority arrival"""
+    limiter = AdaptiveRateLimiter(requests_per_minute=600, max_concurrency=1)
+    limiter.request_bucket.try_acquire(limiter.request_bucket.capacity)
+    finished = []
+
+    async def call(priority: str):
+        with use_schedule(Schedule(priority)):
+            async with limiter.slot():
+                finished.append(priority)
+
+    low = asyncio.create_task(call("low"))
+    await asyncio.sleep(0.02)
+    assert limiter.scheduler.in_flight == 1  # holding the slot, waiting for a request token
+    await asyncio.gather(call("high"), low)
+
+    assert finished == ["high", "low"]
+    scheduling = limiter.get_stats()["scheduling"]
+    assert scheduling["low"]["preempted"] == 1
+    assert scheduling["high"]["calls"] == 1
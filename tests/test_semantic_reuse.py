@@ -0,0 +1,84 @@
+import sys
+import os
+import time
+import random
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.memory.semantic import SemanticIndex, embed
+from tests.helpers import make_manager
+
+def test_embedding_similarity():
+    """Test that rewordings score high and unrelated tasks low"""
+    base = embed("Recommend a weather API for a mobile app")
+    assert float(base @ embed("recommend a weather api for a mobile application")) > 0.85
+    assert float(base @ embed("Build a payment processing service in Go")) < 0.3
+    assert not embed("").any()
+
+def test_lsh_search_and_persistence(tmp_path):
+    """Test that LSH finds near duplicates in a large index and survives save/load"""
+    rng = random.Random(0)
+    vocab = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9))) for _ in range(2000)]
+    texts = [" ".join(rng.choices(vocab, k=10)) for _ in range(6000)]
+    index = SemanticIndex(flat_below=1000)
+    for i, text in enumerate(texts):
+        index.add(text, {"i": i}, key=f"t-{i}")
+
+    query = texts[42] + " please"
+    similarity, entry = index.lookup(query)
+    assert entry["key"] == "t-42" and similarity >= 0.85
+    assert index.lookup("an entirely different request about databases") is None
+    # LSH narrows the search to a fraction of the index
+    assert index.get_stats()["candidates"] < len(texts)
+
+    index.save(str(tmp_path / "semantic"))
+    loaded = SemanticIndex(flat_below=1000)
+    loaded.load(str(tmp_path / "semantic"))
+    assert len(loaded) == len(texts)
+    assert loaded.lookup(query)[1]["value"] == {"i": 42}
+    with pytest.raises(ValueError):
+        SemanticIndex(dim=128).load(str(tmp_path / "semantic"))
+
+@pytest.mark.asyncio
+async def test_task_manager_reuses_paraphrased_task():
+    """Test that a near-duplicate task returns the earlier result without running agents"""
+    manager = make_manager(semantic_index=SemanticIndex(threshold=0.85))
+
+    first = await manager.process({"description": "Recommend a weather API for a mobile app"})
+    calls = sum(agent.llm.get_stats()["calls"] for agent in manager.agents)
+    second = await manager.process({"description": "recommend a weather api for a mobile application"})
+
+    assert first["status"] == second["status"] == "completed"
+    assert sum(agent.llm.get_stats()["calls"] for agent in manager.agents) == calls
+    assert second["reused"]["task_id"] == first["task_id"]
+    assert second["task_id"] != first["task_id"]
+    assert second["plan"] == first["plan"]
+    assert "reused" not in first
+
+    # Unrelated tasks, and tasks that opt out, run the pipeline
+    third = await manager.process({"description": "Design a payment processing service"})
+    fourth = await manager.process({"description": "Recommend a weather API for a mobile app", "reuse": False})
+    assert "reused" not in third and "reused" not in fourth
+    assert manager.semantic_index.get_stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_reuse_requires_matching_fields_and_negations():
+    """Test that tasks differing outside the description, or only by a negation, are not reused"""
+    manager = make_manager(semantic_index=SemanticIndex(threshold=0.85))
+    description = "Recommend a weather API for a mobile app"
+    negated = "Do not recommend a weather API for a mobile app"
+    assert float(embed(description) @ embed(negated)) >= 0.85
+
+    await manager.process({"description": description, "requirements": ["free tier"]})
+    other_requirements = await manager.process({"description": description, "requirements": ["offline support"]})
+    without_requirements = await manager.process({"description": description})
+    negation = await manager.process({"description": negated, "requirements": ["free tier"]})
+    same = await manager.process({"description": description.lower(), "requirements": ["free tier"]})
+
+    assert "reused" not in other_requirements
+    assert "reused" not in without_requirements
+    assert "reused" not in negation
+    assert "reused" in same
+    assert manager.semantic_index.get_stats()["hits"] == 1
@@ -0,0 +1,118 @@
+import sys
+import os
+import asyncio
+import json
+import pytest # type: ignore [import-untyped]
+from aiohttp import ClientError
+from aiohttp.test_utils import TestServer, TestClient
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.server import create_app, ADMISSION
+from tests.helpers import make_manager
+
+@pytest.fixture
+def no_warmup(monkeypatch):
+    """Keep app startup offline"""
+    monkeypatch.setitem(sys.modules["src.server"].CLIENT_CONFIG, "warmup_on_start", False)
+    monkeypatch.setitem(sys.modules["src.server"].TRACING_CONFIG, "metrics_path", None)
+
+def parse_sse(body: str):
+    """Decode a Server-Sent Events body into (event, data) pairs"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+@pytest.mark.asyncio
+async def test_task_returns_json_result(no_warmup):
+    """Test that a posted task is processed and its result returned"""
+    async with TestClient(TestServer(create_app(make_manager(response_tokens=100)))) as client:
+        response = await client.post("/tasks", json={"description": "weather app"})
+        assert response.status == 200
+        result = await response.json()
+        assert result["status"] == "completed"
+
+        response = await client.post("/tasks", data="not json")
+        assert response.status == 400
+        response = await client.post("/tasks", json={"type": "research"})
+        assert response.status == 400
+
+        health = await (await client.get("/healthz")).json()
+        assert health["status"] == "ok"
+        stats = await (await client.get("/stats")).json()
+        assert stats["admission"]["completed"] == 1
+
+@pytest.mark.asyncio
+async def test_task_streams_sse_events(no_warmup):
+    """Test that ?stream=1 emits agent events ending with the task result"""
+    async with TestClient(TestServer(create_app(make_manager(response_tokens=100)))) as client:
+        response = await client.post("/tasks?stream=1", json={"description": "weather app"})
+        assert response.status == 200
+        assert response.headers["Content-Type"].startswith("text/event-stream")
+        events = parse_sse(await response.text())
+        assert events[-1][0] == "task_done"
+        assert events[-1][1]["result"]["status"] == "completed"
+
+@pytest.mark.asyncio
+async def test_saturated_server_rejects_with_429(no_warmup):
+    """Test that requests beyond the active and queued limits get 429 with Retry-After"""
+    app = create_app(make_manager(response_tokens=100, latency_mean=0.2), max_active=1, max_queue=1)
+    async with TestClient(TestServer(app)) as client:
+        first = asyncio.create_task(client.post("/tasks", json={"description": "task one"}))
+        second = asyncio.create_task(client.post("/tasks", json={"description": "task two"}))
+        while app[ADMISSION].active + app[ADMISSION].waiting < 2:
+            await asyncio.sleep(0.01)
+
+        rejected = await client.post("/tasks", json={"description": "task three"})
+        assert rejected.status == 429
+        assert "Retry-After" in rejected.headers
+
+        assert [(await response).status for response in (first, second)] == [200, 200]
+        assert app[ADMISSION].get_stats()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_tasks(no_warmup):
+    """Test that draining refuses new tasks but lets admitted ones finish"""
+    app = create_app(make_manager(response_tokens=100, latency_mean=0.1))
+    async with TestClient(TestServer(app)) as client:
+        pending = asyncio.create_task(client.post("/tasks", json={"description": "weather app"}))
+        while not app[ADMISSION].active:
+            await asyncio.sleep(0.01)
+
+        drain = asyncio.create_task(app[ADMISSION].drain(timeout=5))
+        await asyncio.sleep(0)
+        refused = await client.post("/tasks", json={"description": "another"})
+        assert refused.status == 503
+
+        assert await drain is True
+        response = await pending
+        assert response.status == 200
+        assert (await response.json())["status"] == "completed"
+
+@pytest.mark.asyncio
+async def test_disconnect_before_slot_returns_reservation(no_warmup, monkeypatch):
+    """Test that a stream whose client goes away before it takes a slot frees its place in line"""
+    async def disconnected(self, request):
+        raise ConnectionResetError("client went away")
+
+    app = create_app(make_manager(response_tokens=100), max_active=1, max_queue=0)
+    async with TestClient(TestServer(app)) as client:
+        with monkeypatch.context() as patch, pytest.raises(ClientError):
+            patch.setattr("src.server.web.StreamResponse.prepare", disconnected)
+            await client.post("/tasks?stream=1", json={"description": "weather app"})
+        assert (app[ADMISSION].active, app[ADMISSION].waiting) == (0, 0)
+
+        response = await client.post("/tasks", json={"description": "weather app"})
+        assert response.status == 200
+        assert await app[ADMISSION].drain(timeout=1) is True
+
+@pytest.mark.asyncio
+async def test_timeout_must_be_positive_and_finite(no_warmup):
+    """Test that zero, negative, non-finite and non-numeric timeouts are rejected"""
+    async with TestClient(TestServer(create_app(make_manager(response_tokens=100)))) as client:
+        for value in ("0", "-1", "nan", "inf", "soon"):
+            response = await client.post(f"/tasks?timeout={value}", json={"description": "weather app"})
+            assert response.status == 400
@@ -0,0 +1,147 @@
+import sys
+import os
+import asyncio
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.task_manager import TaskManagerAgent
+from src.agents.research_agent import ResearchAgent
+from src.agents.planning_agent import PlanningAgent
+from src.llm.cache import LLMCache
+from src.llm.fake import FakeChatModel
+from src.llm.scheduler import Schedule, use_schedule
+from src.utils.singleflight import SingleFlight
+from src.utils.tracing import Tracer
+
+class Work:
+    """Counts executions of a slow computation"""
+
+    def __init__(self, result="done", error=None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_result_and_error():
+    """Test that concurrent calls run once and all receive the result or the error"""
+    group = SingleFlight()
+    work = Work()
+    outcomes = await asyncio.gather(*(group.do("key", work) for _ in range(5)))
+
+    assert work.runs == 1
+    assert [result for result, _ in outcomes] == ["done"] * 5
+    assert [joined for _, joined in outcomes] == [False] + [True] * 4
+
+    failing = Work(error=RuntimeError("boom"))
+    errors = await asyncio.gather(*(group.do("key", failing) for _ in range(3)), return_exceptions=True)
+    assert failing.runs == 1
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+    # Nothing is kept once the computation is over
+    await group.do("key", work)
+    assert work.runs == 2
+    assert group.get_stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_cancellation_only_abandons_when_no_waiters_remain():
+    """Test that a cancelled waiter leaves the computation to the others, and the last one stops it"""
+    group = SingleFlight()
+    work = Work()
+    first = asyncio.create_task(group.do("key", work))
+    second = asyncio.create_task(group.do("key", work))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == ("done", True)
+    assert first.cancelled()
+    assert not work.cancelled
+
+    abandoned = Work()
+    waiters = [asyncio.create_task(group.do("other", abandoned)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert abandoned.cancelled
+    assert group.get_stats()["abandoned"] == 1
+
+    # A caller arriving after abandonment starts a fresh run
+    assert await group.do("other", abandoned) == ("done", False)
+
+@pytest.mark.asyncio
+async def test_identical_llm_calls_are_coalesced():
+    """Test that identical prompts in flight at once make one LLM request"""
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache())
+    agent.single_flight = SingleFlight()
+    agent.llm = FakeChatModel(latency_mean=0.02)
+    spans = []
+    agent.tracer = Tracer(sinks=[type("Sink", (), {"export": lambda self, span: spans.append(span)})()])
+
+    texts = await asyncio.gather(*(agent.generate("same prompt") for _ in range(4)))
+
+    assert len(set(texts)) == 1
+    assert agent.llm.get_stats()["calls"] == 1
+    assert sum(1 for span in spans if span.attributes.get("coalesced")) == 3
+
+@pytest.mark.asyncio
+async def test_llm_calls_only_coalesce_on_same_client_and_priority():
+    """Test that identical prompts are not shared across clients (API keys) or priority classes"""
+    group = SingleFlight()
+    agents = [ResearchAgent(google_api_key=key, cache=LLMCache()) for key in ("key-a", "key-b")]
+    for agent in agents:
+        agent.single_flight = group
+        agent.llm = FakeChatModel(latency_mean=0.02)
+
+    async def generate(agent, priority):
+        with use_schedule(Schedule(priority)):
+            return await agent.generate("same prompt")
+
+    await asyncio.gather(
+        generate(agents[0], "low"), generate(agents[0], "low"),
+        generate(agents[0], "high"), generate(agents[1], "low")
+    )
+
+    # The two low-priority calls on the first client share one request
+    assert agents[0].llm.get_stats()["calls"] == 2
+    assert agents[1].llm.get_stats()["calls"] == 1
+
+@pytest.mark.asyncio
+async def test_identical_tasks_share_one_pipeline_run():
+    """Test that identical concurrent tasks run the agents once and each get a result"""
+    manager = TaskManagerAgent()
+    manager.single_flight = SingleFlight()
+    for agent in (ResearchAgent(google_api_key="test-key", cache=LLMCache()),
+                  PlanningAgent(google_api_key="test-key", cache=LLMCache())):
+        agent.llm = FakeChatModel(latency_mean=0.01)
+        agent.single_flight = None
+        manager.register_agent(agent)
+    task = {"description": "Recommend a weather API", "priority": "high"}
+
+    results = await asyncio.gather(
+        *(manager.process({**task, "id": f"job-{i}"}) for i in range(3)),
+        manager.process({**task, "coalesce": False})
+    )
+
+    # Two pipeline runs: one shared by the three jobs, one for the opt-out
+    assert sum(agent.llm.get_stats()["calls"] for agent in manager.agents) == 6
+    assert [result["status"] for result in results] == ["completed"] * 4
+    assert [result["task_id"] for result in results[:3]] == ["job-0", "job-1", "job-2"]
+    assert [result.get("coalesced") for result in results[1:3]] == [{"task_id": "job-0"}] * 2
+    assert "coalesced" not in results[0] and "coalesced" not in results[3]
+    results[1]["plan"]["steps"].clear()
+    assert results[0]["plan"]["steps"]
@@ -0,0 +1,36 @@
+import sys
+import os
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add project root to Python path
+sys.path.append(PROJECT_ROOT)
+
+from benchmarks.startup import HEAVY_MODULES
+
+def test_entry_points_do_not_import_llm_stack():
+    """Test that importing the entry points leaves LangChain/Gemini/pydantic unloaded"""
+    code = (
+        "import sys; import src.main; from src.agents import ResearchAgent, PlanningAgent; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert completed.stdout.strip() == ""
+
+def test_client_is_created_on_first_use():
+    """Test that the Gemini client is only built when the llm is first accessed"""
+    from src.agents.research_agent import ResearchAgent
+
+    agent = ResearchAgent(google_api_key="test-key")
+    assert agent._llm is None
+
+    stub = object()
+    agent.llm = stub
+    assert agent.llm is stub
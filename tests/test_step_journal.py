@@ -0,0 +1,101 @@
+import sys
+import os
+import time
+import pytest # type: ignore [import-untyped]
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.storage.journal import StepJournal
+from src.agents.research_agent import ResearchAgent
+from tests.helpers import make_manager
+
+STAGES = {"gathering": "gather", "extracting key insights": "analyze", "plan": "plan"}
+
+class FlakyLLM:
+    """Stand-in chat model that logs the stage of each prompt and fails the stage named in ``fail``"""
+
+    def __init__(self, fail: str = ""):
+        self.model = "test-model"
+        self.temperature = 0.7
+        self.fail = fail
+        self.calls = []
+
+    async def agenerate(self, messages_list):
+        generations = []
+        for messages in messages_list:
+            content = messages[0].content
+            stage = next(stage for marker, stage in STAGES.items() if marker in content)
+            self.calls.append(stage)
+            if stage == self.fail:
+                raise RuntimeError(f"{stage} failed")
+            generations.append([SimpleNamespace(text=f"1. {stage} output\n2. more {stage} output")])
+        return SimpleNamespace(generations=generations)
+
+def test_journal_persists_steps_by_task_and_stage(tmp_path):
+    """Test that recorded steps survive reopening and are cleared per task or by TTL"""
+    journal = StepJournal(str(tmp_path))
+    journal.record("t-1", "research.gather", [{"source": "LLM", "content": "notes", "confidence": 0.8}])
+    journal.record("t-1", "planning.plan", "1. Build")
+    journal.record("t-2", "planning.plan", "1. Other")
+    journal.close()
+
+    journal = StepJournal(str(tmp_path), ttl=3600)
+    assert journal.get("t-1", "research.gather")[0]["content"] == "notes"
+    assert journal.get("t-1", "research.analyze") is None
+    assert list(journal.steps("t-1")) == ["research.gather", "planning.plan"]
+    assert journal.clear("t-1") == 2 and len(journal) == 1
+
+    journal._db.execute("UPDATE steps SET recorded_at = ?", (time.time() - 7200,))
+    assert journal.prune() == 1 and len(journal) == 0
+
+@pytest.mark.asyncio
+async def test_research_retry_reruns_only_the_failed_stage():
+    """Test that a retried research task reuses the journaled gather output"""
+    journal = StepJournal()
+    task = {"id": "t-1", "description": "weather app", "journal_key": "t-1"}
+
+    failing = FlakyLLM(fail="analyze")
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache(), strategy="two-pass")
+    agent.llm, agent.journal = failing, journal
+    with pytest.raises(RuntimeError):
+        await agent.process(task)
+    assert failing.calls == ["gather", "analyze"]
+
+    retry = FlakyLLM()
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache(), strategy="two-pass")
+    agent.llm, agent.journal = retry, journal
+    result = await agent.process(task)
+    assert retry.calls == ["analyze"]
+    assert result["raw_results"][0]["content"] == "1. gather output\n2. more gather output"
+
+@pytest.mark.asyncio
+async def test_direct_agent_call_leaves_no_steps():
+    """Test that an agent called without a journal key does not journal its stages"""
+    journal = StepJournal()
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache(), strategy="two-pass")
+    agent.llm, agent.journal = FlakyLLM(), journal
+
+    await agent.process({"id": "t-1", "description": "weather app"})
+    assert len(journal) == 0
+
+@pytest.mark.asyncio
+async def test_task_retry_resumes_completed_subtasks(tmp_path):
+    """Test that a retried task skips subtasks finished by the failed attempt and clears the journal when done"""
+    journal = StepJournal(str(tmp_path))
+    task = {"description": "weather app"}
+
+    failing = FlakyLLM(fail="plan")
+    result = await make_manager(failing, journal=journal).process(task)
+    assert result["status"] == "partial"
+    assert sorted(failing.calls) == ["analyze", "gather", "plan"]
+
+    retry = FlakyLLM()
+    result = await make_manager(retry, journal=journal).process(task)
+    assert result["status"] == "completed"
+    assert retry.calls == ["plan"]
+    assert result["resumed"] == ["subtask.research"]
+    assert result["research_results"]["analysis"]["key_insights"][0] == "1. analyze output"
+    assert len(journal) == 0
@@ -0,0 +1,47 @@
+import sys
+import os
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.agents.planning_agent import PlanningAgent
+from tests.helpers import TextLLM, make_manager
+
+PLAN_TEXT = "1. Technical Requirements\n- Python\n2. Implementation Steps\n- Build it\n3. Risk Assessment\n- None"
+
+@pytest.mark.asyncio
+async def test_planning_agent_streams_sections():
+    """Test that plan sections are emitted as each one closes"""
+    agent = PlanningAgent(google_api_key="test-key", cache=LLMCache())
+    agent.llm = TextLLM(PLAN_TEXT)
+
+    events = [event async for event in agent.stream({"description": "weather app"})]
+
+    sections = [event["text"] for event in events if event["type"] == "plan_section"]
+    assert sections == [
+        "1. Technical Requirements\n- Python",
+        "2. Implementation Steps\n- Build it",
+        "3. Risk Assessment\n- None"
+    ]
+    assert events[-1]["type"] == "agent_done"
+    assert events[-1]["result"]["plan"]["steps"][0] == "1. Technical Requirements"
+
+@pytest.mark.asyncio
+async def test_process_stream_yields_incremental_events():
+    """Test that the task manager forwards agent events before the task completes"""
+    manager = make_manager(TextLLM("Weather APIs:\n- OpenWeather\n- WeatherAPI"), TextLLM(PLAN_TEXT))
+
+    events = [event async for event in manager.process_stream({"description": "weather app"})]
+    types = [event["type"] for event in events]
+
+    assert types[0] in ("research_chunk", "plan_section")
+    assert types.count("agent_done") == 2
+    assert types[-1] == "task_done"
+
+    result = events[-1]["result"]
+    assert result["status"] == "completed"
+    assert result["research_results"]["raw_results"][0]["content"].startswith("Weather APIs")
+    assert result["plan"]["steps"]
+    assert manager.get_status() == "idle"
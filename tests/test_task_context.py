@@ -0,0 +1,87 @@
+import sys
+import os
+import asyncio
+import pytest # type: ignore [import-untyped]
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.cache import LLMCache
+from src.llm.fake import FakeChatModel
+from src.agents.research_agent import ResearchAgent
+from src.agents.context import current_context
+
+class SlowEchoLLM:
+    """Stand-in chat model that yields to the loop and echoes the prompt tail"""
+
+    def __init__(self):
+        self.model = "test-model"
+        self.temperature = 0.7
+
+    async def agenerate(self, messages_list):
+        await asyncio.sleep(0.01)
+        generations = [[SimpleNamespace(text=messages[0].content[-40:])] for messages in messages_list]
+        return SimpleNamespace(generations=generations)
+
+@pytest.mark.asyncio
+async def test_one_agent_serves_concurrent_tasks():
+    """Test that concurrent process calls on one instance keep their own state"""
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache())
+    agent.llm = SlowEchoLLM()
+
+    tasks = [{"description": f"topic {i}"} for i in range(10)]
+    results = await asyncio.gather(*(agent.process(task) for task in tasks))
+
+    for i, result in enumerate(results):
+        assert result["research_query"] == f"Research and analyze: topic {i}"
+    stats = agent.get_stats()
+    assert stats["completed"] == 10
+    assert stats["in_flight"] == 0
+    assert agent.get_status() == "idle"
+    assert agent.get_current_task() is None
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_reports_queue_depth():
+    """Test that invocations beyond max_concurrency queue and are reported"""
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache(), max_concurrency=2)
+    agent.llm = SlowEchoLLM()
+
+    running = [asyncio.create_task(agent.process({"description": f"topic {i}"})) for i in range(5)]
+    await asyncio.sleep(0)
+
+    stats = agent.get_stats()
+    assert stats["in_flight"] == 2
+    assert stats["queue_depth"] == 3
+    assert agent.get_status() == "working"
+
+    await asyncio.gather(*running)
+    assert agent.get_stats()["queue_depth"] == 0
+
+@pytest.mark.asyncio
+async def test_task_context_is_scoped_per_invocation():
+    """Test that each invocation sees its own context and memory"""
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache())
+    seen = {}
+
+    async def run(task_id: str):
+        async with agent.task_context({"id": task_id}) as ctx:
+            ctx.add_to_memory("owner", task_id)
+            await asyncio.sleep(0)
+            seen[task_id] = (current_context().task_id, ctx.get_from_memory("owner"))
+
+    await asyncio.gather(run("a"), run("b"))
+    assert seen == {"a": ("a", "a"), "b": ("b", "b")}
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_releases_its_slot():
+    """Test that breaking out of a stream frees the agent's slot for the next invocation"""
+    agent = ResearchAgent(google_api_key="test-key", cache=LLMCache(), max_concurrency=1)
+    agent.llm = FakeChatModel(model="test-model", latency_mean=0.0)
+
+    async for event in agent.stream({"description": "weather app"}):
+        break
+
+    result = await asyncio.wait_for(agent.process({"description": "mobile app"}), timeout=2)
+    assert result["research_query"] == "Research and analyze: mobile app"
+    assert agent.get_stats()["in_flight"] == 0
@@ -0,0 +1,100 @@
+import sys
+import os
+import json
+import urllib.request
+import pytest # type: ignore [import-untyped]
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.fake import FakeChatModel
+from src.utils.helpers import calculate_task_metrics
+from src.utils.tracing import Tracer, JsonlSink
+from tests.helpers import make_manager
+
+class ListSink:
+    """Collects finished spans"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+@pytest.mark.asyncio
+async def test_task_spans_share_trace_and_feed_metrics():
+    """Test that agent and LLM spans are tied to the task and its result carries real timings"""
+    sink = ListSink()
+    manager = make_manager(tracer=Tracer(sinks=[sink]), latency_mean=0.01, tokens_per_second=100_000)
+
+    result = await manager.process({"description": "weather APIs"})
+
+    root = next(span for span in sink.spans if span.attributes.get("agent") == "TaskManager")
+    assert {span.trace_id for span in sink.spans} == {root.trace_id}
+    assert root.trace_id == result["task_id"] == result["trace"]["trace_id"]
+
+    llm_spans = [span for span in sink.spans if span.name == "llm.generate"]
+    assert len(llm_spans) == 3
+    for span in llm_spans:
+        assert span.attributes["llm_latency"] >= 0.01
+        assert span.attributes["queue_wait"] >= 0
+        assert span.attributes["prompt_tokens"] > 0
+        assert span.attributes["completion_tokens"] > 0
+        assert "ttft" in span.attributes
+
+    agent_spans = [span for span in sink.spans if span.name == "agent" and span.parent is root]
+    assert {span.attributes["agent"] for span in agent_spans} == {"ResearchAgent", "PlanningAgent"}
+    assert all(span.attributes["post_processing"] >= 0 for span in agent_spans)
+
+    metrics = calculate_task_metrics(result)
+    assert metrics["duration_seconds"] > 0
+    assert metrics["llm_calls"] == 3
+    assert metrics["completion_tokens"] == sum(span.attributes["completion_tokens"] for span in llm_spans)
+    assert set(metrics["agent_seconds"]) == {"ResearchAgent", "PlanningAgent"}
+
+@pytest.mark.asyncio
+async def test_streaming_records_time_to_first_token():
+    """Test that streamed calls record time to first token separately from latency"""
+    sink = ListSink()
+    manager = make_manager(tracer=Tracer(sinks=[sink]), latency_mean=0.01, tokens_per_second=100_000)
+    for agent in manager.agents:
+        agent.llm = FakeChatModel(latency_mean=0.01, tokens_per_second=2000)
+
+    [event async for event in manager.process_stream({"description": "weather APIs"})]
+
+    streams = [span for span in sink.spans if span.name == "llm.stream"]
+    assert streams
+    for span in streams:
+        assert 0.01 <= span.attributes["ttft"] < span.attributes["llm_latency"]
+
+@pytest.mark.asyncio
+async def test_jsonl_and_prometheus_export(tmp_path):
+    """Test that spans reach the JSONL file and the Prometheus text output and endpoint"""
+    jsonl_path = str(tmp_path / "spans.jsonl")
+    tracer = Tracer(sinks=[JsonlSink(jsonl_path)])
+    manager = make_manager(tracer=tracer, latency_mean=0.01, tokens_per_second=100_000)
+
+    await manager.process({"description": "weather APIs"})
+    tracer.close()
+
+    with open(jsonl_path) as f:
+        records = [json.loads(line) for line in f]
+    assert {record["name"] for record in records} == {"agent", "llm.generate"}
+    assert all(record["trace_id"] == records[0]["trace_id"] for record in records)
+
+    text = tracer.metrics.render()
+    assert 'llm_calls_total{agent="PlanningAgent",cached="false",kind="generate",model="fake-model"} 1' in text
+    assert 'agent_tasks_total{agent="TaskManager",status="completed"} 1' in text
+    assert "llm_latency_seconds_bucket" in text
+
+    metrics_path = str(tmp_path / "metrics.prom")
+    tracer.metrics.write(metrics_path)
+    with open(metrics_path) as f:
+        assert f.read() == text
+
+    server = tracer.metrics.serve(0, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert response.read().decode() == text
+    finally:
+        server.shutdown()